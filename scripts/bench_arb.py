@@ -0,0 +1,72 @@
+"""
+Benchmark of the structured arbitrage solver against enumerating every
+scenario, on "all of" structures like the deep blue states markets: n - 1
+state markets and one market on all of them.
+
+    python -m scripts.bench_arb -n 4 16 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.arb.solver import AllOf, ExactlyOne, Leg, solve, solve_brute_force
+
+parser = argparse.ArgumentParser(description="Benchmark the arbitrage solvers")
+parser.add_argument("-n", "--num_markets", type=int, nargs="+", default=[4, 16, 50])
+parser.add_argument("-r", "--repeats", type=int, default=3)
+parser.add_argument("-s", "--seed", type=int, default=0)
+
+
+def random_leg(rng: np.random.Generator, name: str, prob: float) -> Leg:
+    spread = rng.uniform(0.0, 0.03)
+    yes_bid = np.clip(prob - spread / 2, 0.01, 0.99)
+    yes_ask = np.clip(prob + spread / 2, 0.01, 0.99)
+    return Leg.from_quotes(name, yes_bid=yes_bid, yes_ask=yes_ask)
+
+
+def all_of(rng: np.random.Generator, n: int) -> list:
+    probs = rng.uniform(0.95, 0.999, size=n - 1)
+    legs = [random_leg(rng, f"STATE{i}", p) for i, p in enumerate(probs)]
+    # Around the price where buying it and every state's no costs $1, so
+    # some draws have an arbitrage
+    fair = 1 - np.sum(1 - probs)
+    combined = random_leg(rng, "ALL", fair * rng.uniform(0.9, 1.05))
+    return [AllOf(legs, combined)]
+
+
+def exactly_one(rng: np.random.Generator, n: int) -> list:
+    probs = rng.dirichlet(np.ones(n)) * rng.uniform(0.9, 1.1)
+    return [ExactlyOne([random_leg(rng, f"B{i}", p) for i, p in enumerate(probs)])]
+
+
+def timed(fn, components, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn(components)
+    return result, (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"{'structure':12} {'n':>4} {'rows':>8} {'structured s':>13} "
+        f"{'brute rows':>11} {'brute s':>10} {'profit':>10} {'match':>6}"
+    )
+    for name, make in [("all of", all_of), ("exactly one", exactly_one)]:
+        for n in args.num_markets:
+            components = make(rng, n)
+            result, elapsed = timed(solve, components, args.repeats)
+            try:
+                brute, brute_elapsed = timed(solve_brute_force, components, 1)
+                match = abs(brute.guaranteed_profit - result.guaranteed_profit) < 1e-7
+                brute_cols = f"{brute.num_constraints:11d} {brute_elapsed:10.4f}"
+            except ValueError:
+                match = "-"
+                brute_cols = f"{'2^' + str(n - 1):>11} {'skipped':>10}"
+            print(
+                f"{name:12} {n:4d} {result.num_constraints:8d} {elapsed:13.4f} "
+                f"{brute_cols} {result.guaranteed_profit:10.5f} {str(match):>6}"
+            )
@@ -0,0 +1,104 @@
+"""
+Benchmark of the arbitrage monitor against building and solving every
+touched structure from scratch on each tick, with synthetic one cent price
+moves on bracket events and "all of" structures.
+
+    python -m scripts.bench_arb_monitor -t 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.arb.monitor import ArbMonitor
+from src.arb.solver import AllOf, ExactlyOne, Leg, solve
+
+parser = argparse.ArgumentParser(description="Benchmark the arbitrage monitor")
+parser.add_argument("-t", "--num_ticks", type=int, default=2000)
+parser.add_argument("-e", "--num_events", type=int, default=40)
+parser.add_argument("-a", "--num_all_of", type=int, default=10)
+parser.add_argument("-s", "--seed", type=int, default=0)
+
+
+def cents(values) -> np.ndarray:
+    return np.clip(np.round(np.asarray(values) * 100), 1, 99) / 100
+
+
+def make_structures(rng: np.random.Generator, num_events: int, num_all_of: int):
+    structures = {}
+    for e in range(num_events):
+        probs = rng.dirichlet(np.ones(6))
+        legs = [
+            Leg(f"EV{e}-B{k}", *cents([p + 0.01 + 0.005 * e / num_events, 1.01 - p]))
+            for k, p in enumerate(probs)
+        ]
+        structures[f"EV{e}"] = [ExactlyOne(legs)]
+    for a in range(num_all_of):
+        probs = rng.uniform(0.95, 0.99, size=9)
+        legs = [
+            Leg(f"AL{a}-S{i}", *cents([p + 0.01, 1.01 - p]))
+            for i, p in enumerate(probs)
+        ]
+        fair = 1 - np.sum(1 - probs)
+        combined = Leg(f"AL{a}-ALL", *cents([fair + 0.02, 1.02 - fair]))
+        structures[f"AL{a}"] = [AllOf(legs, combined)]
+    return structures
+
+
+def legs_of(components):
+    for component in components:
+        yield from component.legs
+        if isinstance(component, AllOf):
+            yield component.combined
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    structures = make_structures(rng, args.num_events, args.num_all_of)
+    legs = {
+        leg.name: (name, leg) for name, c in structures.items() for leg in legs_of(c)
+    }
+    names = sorted(legs)
+
+    monitor = ArbMonitor()
+    for name, components in structures.items():
+        monitor.watch(name, components)
+
+    cold_times, warm_times, arbs = [], [], 0
+    for _ in range(args.num_ticks):
+        leg_name = names[rng.integers(len(names))]
+        structure, leg = legs[leg_name]
+        move = rng.choice([-0.01, 0.01])
+        leg.yes_ask, leg.no_ask = cents([leg.yes_ask + move, leg.no_ask - move])
+
+        start = time.perf_counter()
+        cold = solve(structures[structure])
+        cold_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        warm = monitor.tick({leg_name: (leg.yes_ask, leg.no_ask)})[structure]
+        warm_times.append(time.perf_counter() - start)
+
+        assert abs(cold.guaranteed_profit - warm.guaranteed_profit) < 1e-6, (
+            leg_name,
+            cold.guaranteed_profit,
+            warm.guaranteed_profit,
+        )
+        arbs += warm.guaranteed_profit > 1e-9
+
+    stats = monitor.stats()
+    ticks = sum(s["ticks"] for s in stats.values())
+    solves = sum(s["solves"] for s in stats.values())
+    print(
+        f"{len(structures)} structures, {len(names)} legs, {args.num_ticks} ticks, "
+        f"{arbs} with an arbitrage"
+    )
+    print(f"solves skipped {1 - solves / ticks:.1%}")
+    for label, times in (("cold", cold_times), ("monitor", warm_times)):
+        times = np.array(times) * 1e3
+        print(
+            f"{label:8} mean {times.mean():7.3f} ms  p50 {np.median(times):7.3f} ms  "
+            f"p99 {np.percentile(times, 99):7.3f} ms"
+        )
@@ -0,0 +1,105 @@
+"""
+Benchmark of the vectorized bracket arbitrage scan against a loop over
+orderbook dicts, on synthetic events.
+
+    python -m scripts.bench_bracket_scanner -e 1000 -k 6 -l 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.arb.bracket_scanner import BracketBooks, scan
+from src.kalshi.fees import trading_fee
+
+parser = argparse.ArgumentParser(description="Benchmark the bracket scanner")
+parser.add_argument("-e", "--num_events", type=int, default=1000)
+parser.add_argument("-k", "--num_brackets", type=int, default=6)
+parser.add_argument("-l", "--num_levels", type=int, default=5)
+parser.add_argument("-s", "--seed", type=int, default=0)
+
+
+def synthetic_events(num_events: int, num_brackets: int, num_levels: int) -> dict:
+    rng = np.random.default_rng(0)
+    events = {}
+    for e in range(num_events):
+        probs = rng.dirichlet(np.ones(num_brackets)) * 100
+        # Yes asks sum to 100 + skew + k and no asks to 100 * (k - 1) - skew + k,
+        # so some events are mispriced on either side
+        skew = rng.uniform(-2.5, 2.5) * num_brackets
+        books = {}
+        for k, prob in enumerate(probs):
+            mid = np.clip(prob + skew / num_brackets, num_levels + 2, 98 - num_levels)
+            yes_bids = np.clip(mid - 1 - np.arange(num_levels), 1, 99)
+            no_bids = np.clip(100 - mid - 1 - np.arange(num_levels), 1, 99)
+            sizes = rng.integers(1, 200, size=(2, num_levels))
+            books[f"EV{e}-B{k}"] = {
+                "orderbook": {
+                    "yes": np.stack([yes_bids.round()[::-1], sizes[0]], 1).tolist(),
+                    "no": np.stack([no_bids.round()[::-1], sizes[1]], 1).tolist(),
+                }
+            }
+        events[f"EV{e}"] = books
+    return events
+
+
+def loop_scan(events: dict, fee_bps: int = 700) -> dict:
+    """The same search with dicts and Python loops, by (event, side)."""
+    best = {}
+    for event_ticker, books in events.items():
+        for side, other in (("yes", "no"), ("no", "yes")):
+            ladders = [
+                sorted(((100 - p, q) for p, q in book["orderbook"][other]))
+                for book in books.values()
+            ]
+            payout = 100 if side == "yes" else (len(ladders) - 1) * 100
+            depth = min(sum(q for _, q in ladder) for ladder in ladders)
+            points = {
+                min(depth, c)
+                for ladder in ladders
+                for c in np.cumsum([q for _, q in ladder])
+            }
+            top = None
+            for sets in sorted(points):
+                cost = fees = 0
+                for ladder in ladders:
+                    left = sets
+                    for price, quantity in ladder:
+                        take = min(left, quantity)
+                        cost += take * price
+                        fees += int(trading_fee(take, price, fee_bps))
+                        left -= take
+                edge = sets * payout - cost - fees
+                if top is None or edge > top:
+                    top = edge
+            if top is not None and top >= 1:
+                best[(event_ticker, side)] = top
+    return best
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    events = synthetic_events(args.num_events, args.num_brackets, args.num_levels)
+
+    start = time.perf_counter()
+    books = BracketBooks(events)
+    packed = time.perf_counter() - start
+    start = time.perf_counter()
+    arbs = scan(books)
+    scanned = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = loop_scan(events)
+    looped = time.perf_counter() - start
+    assert {(a.event_ticker, a.side): a.edge for a in arbs} == reference
+
+    print(f"{len(events)} events, {books.num_markets} markets, {len(arbs)} arbitrages")
+    print(f"pack {packed * 1e3:8.1f} ms")
+    print(f"scan {scanned * 1e3:8.1f} ms")
+    print(f"loop {looped * 1e3:8.1f} ms")
+    for arb in arbs[:5]:
+        print(
+            f"  {arb.event_ticker:8} {arb.side:3} sets={arb.sets:4d} "
+            f"edge={arb.edge:5d}c fees={arb.fees:4d}c return={arb.return_rate:.3f}"
+        )
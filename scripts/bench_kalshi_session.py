@@ -0,0 +1,94 @@
+"""
+Benchmarks the pooled keep-alive session in `KalshiClient` against the old
+one-connection-per-request behaviour (module level `requests.get`).
+
+Both run against a local stub HTTP server so the numbers only reflect
+connection handling, not the exchange. Rate limiting and coalescing of
+identical GETs are disabled for the run.
+
+    python -m scripts.bench_kalshi_session -n 2000 -w 8
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.kalshi.api_client import ExchangeClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    num_requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        # Handler instances are per connection, so count on the class
+        with StubHandler.lock:
+            StubHandler.num_requests += 1
+        body = json.dumps({"orderbook": {"yes": [[40, 10]], "no": [[55, 5]]}})
+        body_bytes = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body_bytes)))
+        self.end_headers()
+        self.wfile.write(body_bytes)
+
+    def log_message(self, format, *args):
+        pass
+
+
+parser = argparse.ArgumentParser(description="Benchmark Kalshi HTTP transport")
+parser.add_argument("-n", "--num_requests", type=int, default=1000)
+parser.add_argument("-w", "--workers", type=int, default=8)
+
+
+def run(fn, num_requests: int, workers: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda i: fn(), range(num_requests)))
+    return num_requests / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}"
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    # Coalescing would answer most of the identical GETs without a request
+    client = ExchangeClient(
+        host, "bench", private_key, pool_size=args.workers, coalescer=None
+    )
+    client.rate_limit = lambda *args, **kwargs: 0.0  # type: ignore[method-assign]
+
+    path = client.get_market_url("BENCH") + "/orderbook"
+
+    def unpooled():
+        response = requests.get(
+            host + path, headers=client.request_headers("GET", path)
+        )
+        client.raise_if_bad_response(response)
+        return response.json()
+
+    def pooled():
+        return client.get(path)
+
+    before = run(unpooled, args.num_requests, args.workers)
+    after = run(pooled, args.num_requests, args.workers)
+    assert StubHandler.num_requests == 2 * args.num_requests
+
+    print(f"requests/s without session: {before:.1f}")
+    print(f"requests/s with session:    {after:.1f}")
+    print(f"speedup: {after / before:.2f}x")
+
+    client.close()
+    server.shutdown()
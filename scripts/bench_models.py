@@ -0,0 +1,114 @@
+"""
+Benchmark of decoding trade pages into dicts versus numpy columns.
+
+Uses the `get_trades` responses in a recording made with `RecordingSession`
+when one is given, and synthetic pages otherwise.
+
+    python -m scripts.bench_models -p 200
+    python -m scripts.bench_models -r ../recordings/kalshi.jsonl.gz
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+import tracemalloc
+
+from dateutil import parser as date_parser
+
+from src.kalshi.models import concat_columns, trades_to_columns
+
+parser = argparse.ArgumentParser(description="Benchmark typed trade decoding")
+parser.add_argument("-r", "--recording", type=str, help="A .jsonl.gz recording")
+parser.add_argument("-p", "--num_pages", type=int, default=100)
+parser.add_argument("-s", "--page_size", type=int, default=1000)
+
+
+def synthetic_pages(num_pages: int, page_size: int) -> list[str]:
+    rng = random.Random(0)
+    pages = []
+    for p in range(num_pages):
+        trades = []
+        for i in range(page_size):
+            yes_price = rng.randint(1, 99)
+            trades.append(
+                {
+                    "trade_id": f"{p:08x}-{i:04x}-4a1b-9c2d-3e4f5a6b7c8d",
+                    "ticker": f"HIGHNY-24NOV{rng.randint(10, 30)}-B{rng.randint(40, 80)}.5",
+                    "count": rng.randint(1, 500),
+                    "yes_price": yes_price,
+                    "no_price": 100 - yes_price,
+                    "taker_side": rng.choice(["yes", "no"]),
+                    "created_time": f"2024-11-{rng.randint(10, 30)}T"
+                    f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+                    f"{rng.randint(0, 59):02d}.{rng.randint(0, 999999):06d}Z",
+                }
+            )
+        pages.append(json.dumps({"trades": trades, "cursor": ""}))
+    return pages
+
+
+def recorded_pages(path: str) -> list[str]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [
+        r["content"]
+        for r in records
+        if "/trades" in r["url"] and r["status"] == 200 and r["content"]
+    ]
+
+
+def decode_dicts(pages: list[str]) -> list[dict]:
+    trades = []
+    for page in pages:
+        for trade in json.loads(page)["trades"]:
+            trade["created_time"] = date_parser.isoparse(trade["created_time"])
+            trades.append(trade)
+    return trades
+
+
+def decode_columns(pages: list[str]) -> dict:
+    return concat_columns(trades_to_columns(json.loads(page)) for page in pages)
+
+
+def measure(decode, pages):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = decode(pages)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained, peak
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    if args.recording is not None:
+        pages = recorded_pages(args.recording)
+    else:
+        pages = synthetic_pages(args.num_pages, args.page_size)
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / 1e6:.1f} MB of JSON")
+
+    trades, dict_time, dict_retained, dict_peak = measure(decode_dicts, pages)
+    start = time.perf_counter()
+    dict_vwap = sum(t["yes_price"] * t["count"] for t in trades) / sum(
+        t["count"] for t in trades
+    )
+    dict_scan = time.perf_counter() - start
+    del trades
+
+    columns, col_time, col_retained, col_peak = measure(decode_columns, pages)
+    start = time.perf_counter()
+    col_vwap = (columns["yes_price"] * columns["count"]).sum() / columns["count"].sum()
+    col_scan = time.perf_counter() - start
+    assert abs(dict_vwap - col_vwap) < 1e-9
+
+    print(f"{'':8} {'decode s':>10} {'retained MB':>12} {'peak MB':>10} {'scan s':>10}")
+    for name, t, retained, peak, scan in [
+        ("dicts", dict_time, dict_retained, dict_peak, dict_scan),
+        ("columns", col_time, col_retained, col_peak, col_scan),
+    ]:
+        print(
+            f"{name:8} {t:10.3f} {retained / 1e6:12.1f} {peak / 1e6:10.1f} {scan:10.4f}"
+        )
@@ -0,0 +1,79 @@
+"""
+Benchmark of integer cent payoff matrices against the deep blue notebook's
+float16 `make_bound_matrix`, on every outcome of n independent legs.
+
+    python -m scripts.bench_payoffs -n 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.arb.payoffs import (
+    contract_costs,
+    payoff_matrix,
+    scenario_profits,
+    worst_case_profit,
+)
+from src.np_utils import enumerate_binary_inputs
+
+parser = argparse.ArgumentParser(description="Benchmark payoff matrices")
+parser.add_argument("-n", "--num_legs", type=int, default=20)
+parser.add_argument("-l", "--lot_size", type=int, default=10)
+parser.add_argument("-s", "--seed", type=int, default=0)
+
+
+def make_bound_matrix(event_matrix: np.ndarray, cost_weights: np.ndarray):
+    """The notebook's version, in the dtype of `cost_weights`."""
+    n = event_matrix.shape[1]
+    bound_matrix = np.empty((event_matrix.shape[0], 2 * n), dtype=cost_weights.dtype)
+    bound_matrix[:, :n] = event_matrix - cost_weights[None, :n]
+    bound_matrix[:, n:] = 1 - event_matrix - cost_weights[None, n:]
+    return bound_matrix
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    n, lot_size = args.num_legs, args.lot_size
+    yes = rng.integers(1, 99, n)
+    no = rng.integers(1, 99, n)
+    scenarios = enumerate_binary_inputs(n)
+    lots = rng.integers(0, 20, 2 * n)
+    print(f"{len(scenarios)} scenarios x {2 * n} contracts, lots of {lot_size}")
+
+    weights = (np.concatenate([yes, no]) / 100).astype(np.float16)
+    bound, float_build = timed(make_bound_matrix, scenarios, weights)
+    costs = contract_costs(yes, no, fee_bps=0, lot_size=lot_size)
+    payoffs, int_build = timed(payoff_matrix, scenarios, costs, lot_size)
+    fee_costs = contract_costs(yes, no, lot_size=lot_size)
+
+    # Profits of the same allocation in cents, exact against float16
+    exact, int_bound = timed(scenario_profits, lots, scenarios, costs, lot_size)
+    approx, float_bound = timed(lambda: bound @ (lots * lot_size).astype(np.float16))
+    upcast, upcast_bound = timed(
+        lambda: bound.astype(np.float64) @ (lots * lot_size) * 100
+    )
+    assert np.array_equal(exact, payoffs.astype(np.int64) @ lots)
+    assert worst_case_profit(lots, costs, lot_size=lot_size) == exact.min()
+
+    price_error = np.abs(weights.astype(np.float64) * 100 - np.concatenate([yes, no]))
+    profit_error = np.abs(approx.astype(np.float64) * 100 - exact)
+    with_fees = worst_case_profit(lots, fee_costs, lot_size=lot_size)
+    print(f"float16 price error     max {price_error.max():.4f} cents")
+    print(
+        f"float16 profit error    max {profit_error.max():.1f} cents, "
+        f"upcast {np.abs(upcast - exact).max():.3f} cents"
+    )
+    print(f"worst case              {exact.min()} cents, {with_fees} after taker fees")
+    print(f"{'':24}{'build ms':>10}{'profits ms':>12}")
+    print(f"{'float16':24}{float_build * 1e3:10.1f}{float_bound * 1e3:12.1f}")
+    print(f"{'float16 upcast':24}{'':10}{upcast_bound * 1e3:12.1f}")
+    print(f"{'int cents':24}{int_build * 1e3:10.1f}{int_bound * 1e3:12.1f}")
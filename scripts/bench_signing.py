@@ -0,0 +1,52 @@
+"""
+Micro-benchmark of request signing throughput with 1, 4 and 8 workers.
+
+    python -m scripts.bench_signing -n 2000 -e process
+    python -m scripts.bench_signing -k ../keys/kalshi_key.key
+"""
+
+import argparse
+import time
+from concurrent.futures import wait
+from pprint import pprint
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.kalshi.signing import RequestSigner
+
+parser = argparse.ArgumentParser(description="Benchmark RSA-PSS request signing")
+parser.add_argument("-n", "--num_signatures", type=int, default=2000)
+parser.add_argument("-e", "--executor", choices=["thread", "process"], default="thread")
+parser.add_argument(
+    "-k", "--key_path", type=str, help="PEM key to sign with. Defaults to a new key."
+)
+parser.add_argument("-w", "--workers", type=int, nargs="+", default=[1, 4, 8])
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if args.key_path is not None:
+        private_key = RequestSigner.from_file(args.key_path).private_key
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    messages = [
+        f"{1700000000000 + i}GET/trade-api/v2/markets"
+        for i in range(args.num_signatures)
+    ]
+
+    for workers in args.workers:
+        signer = RequestSigner(private_key, workers=workers, executor=args.executor)
+        signer.sign(messages[0])  # warm up the pool
+
+        start = time.perf_counter()
+        wait([signer.submit(message) for message in messages])
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{workers} {args.executor} workers: "
+            f"{args.num_signatures / elapsed:.1f} signatures/s"
+        )
+        pprint(signer.metrics())
+        signer.close()
@@ -0,0 +1,100 @@
+"""
+Benchmark of the chunked and parallel modes of `@vectorized` on a large
+batch payoff computation: the profit of k candidate allocations over n
+legs in every one of 2^n scenarios. The computation is a matrix product,
+which BLAS already spreads over every core, so the opt-in thread pool is
+shown only to compare: it is slower here. Also measures the decorator's
+overhead per call.
+
+    python -m scripts.bench_vectorized -n 20 -k 64
+"""
+
+import argparse
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.np_utils import enumerate_binary_inputs, vectorized
+
+parser = argparse.ArgumentParser(description="Benchmark @vectorized modes")
+parser.add_argument("-n", "--num_legs", type=int, default=20)
+parser.add_argument("-k", "--num_allocations", type=int, default=64)
+parser.add_argument("-w", "--workers", type=int, default=4)
+parser.add_argument("-c", "--calls", type=int, default=100_000)
+
+
+def scenario_profit(scenarios: np.ndarray, yes: np.ndarray, no: np.ndarray, costs):
+    """
+    Profit of each (n, k) yes/no allocation in each scenario, and the
+    scenario's worst one.
+    """
+    payoff = scenarios @ yes + (1 - scenarios) @ no
+    profit = payoff - costs
+    return {"profit": profit, "worst": profit.min(axis=1)}
+
+
+MODES = {
+    "whole batch": {},
+    "chunk_size=2^14": {"chunk_size": 2**14},
+    "max_bytes=1MB": {"max_bytes": 2**20},
+}
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    res = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return res, elapsed, peak
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    n, k = args.num_legs, args.num_allocations
+    scenarios = enumerate_binary_inputs(n, dtype=np.float32)
+    yes = rng.uniform(0, 1, size=(n, k)).astype(np.float32)
+    no = rng.uniform(0, 1, size=(n, k)).astype(np.float32)
+    costs = (yes * 0.5 + no * 0.5).sum(axis=0)
+    print(f"{len(scenarios)} scenarios x {k} allocations")
+
+    pool = ThreadPoolExecutor(args.workers)
+    modes = {
+        **MODES,
+        f"chunk_size=2^14, {args.workers} threads (opt-in)": {
+            "chunk_size": 2**14,
+            "workers": pool,
+        },
+    }
+    expected = None
+    print(f"{'mode':40} {'seconds':>8} {'peak MB':>8}")
+    for name, options in modes.items():
+        fn = vectorized(
+            "scenarios", row_ndim=1, output_names=["profit", "worst"], **options
+        )(scenario_profit)
+        res, elapsed, peak = measure(fn, scenarios, yes, no, costs)
+        if expected is None:
+            expected = res
+        assert np.allclose(res["worst"], expected["worst"])
+        print(f"{name:40} {elapsed:8.3f} {peak / 1e6:8.1f}")
+    pool.shutdown()
+
+    # Per call overhead on a single scenario
+    fn = vectorized("scenarios", row_ndim=1, output_names=["profit", "worst"])(
+        scenario_profit
+    )
+    one = scenarios[:1]
+    for label, call in [
+        ("raw function", lambda: scenario_profit(one, yes, no, costs)),
+        ("decorated, positional", lambda: fn(one, yes, no, costs)),
+        ("decorated, keywords", lambda: fn(scenarios=one, yes=yes, no=no, costs=costs)),
+    ]:
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            call()
+        per_call = (time.perf_counter() - start) / args.calls
+        print(f"{label:40} {per_call * 1e6:8.2f} us/call")
@@ -0,0 +1,75 @@
+import argparse
+from pprint import pprint
+
+from src.kalshi.api_client import ExchangeClient
+from src.kalshi.history import HISTORY, TRADES, HistoryDownloader
+from src.kalshi.rate_limiter import RateLimiter, RateLimitTier
+from src.kalshi.signing import RequestSigner
+from src.params import *
+
+parser = argparse.ArgumentParser(description="Download Kalshi trade history")
+
+parser.add_argument(
+    "series_tickers",
+    nargs="+",
+    type=str,
+    help="Series to download every market of, e.g. HIGHNY",
+)
+parser.add_argument(
+    "-k",
+    "--kinds",
+    nargs="+",
+    choices=[TRADES, HISTORY],
+    default=[TRADES, HISTORY],
+    help="Download trades, minute price history or both",
+)
+parser.add_argument(
+    "-o",
+    "--output_dir",
+    type=Path,
+    default=KALSHI_HISTORY,
+    help="Root of the partitioned store",
+)
+parser.add_argument(
+    "-w",
+    "--workers",
+    type=int,
+    default=4,
+    help="Tickers downloaded concurrently",
+)
+parser.add_argument(
+    "-t",
+    "--tier",
+    type=str,
+    choices=[tier.name for tier in RateLimitTier],
+    default=RateLimitTier.BASIC.name,
+    help="API rate limit tier to stay within",
+)
+parser.add_argument("--key_path", type=Path, default=KALSHI_KEY)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    pprint(args)
+
+    signer = RequestSigner.from_file(args.key_path)
+    client = ExchangeClient(
+        str(PROD_API_BASE),
+        API_ID,
+        signer.private_key,
+        signer=signer,
+        pool_size=args.workers * 2,
+        rate_limiter=RateLimiter.from_tier(RateLimitTier[args.tier]),
+    )
+    downloader = HistoryDownloader(client, args.output_dir, workers=args.workers)
+
+    for series_ticker in args.series_tickers:
+        print(f"Downloading {', '.join(args.kinds)} for series {series_ticker}")
+        for res in downloader.download_series(series_ticker, kinds=args.kinds):
+            print(
+                f"Downloaded {res.num_rows} {res.kind} rows for {res.num_tickers} "
+                f"markets of {series_ticker}, skipped {res.num_skipped} closed markets"
+            )
+            print(f"Wrote {len(res.written_filepaths)} files to {args.output_dir}")
+
+    client.close()
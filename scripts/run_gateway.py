@@ -0,0 +1,89 @@
+"""
+Runs the local gateway that strategy processes connect to with
+`src.gateway.GatewayClient`.
+
+    python -m scripts.run_gateway -t ADVANCED
+    python -m scripts.run_gateway --stub  # against an in-memory exchange
+"""
+
+import argparse
+from pprint import pprint
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.gateway import GatewayServer
+from src.gateway.protocol import DEFAULT_ADDRESS
+from src.gateway.stub_exchange import StubExchange
+from src.kalshi.api_client import ExchangeClient
+from src.kalshi.cache import MetadataCache
+from src.kalshi.rate_limiter import RateLimiter, RateLimitTier
+from src.kalshi.signing import RequestSigner
+from src.params import *
+
+parser = argparse.ArgumentParser(description="Run the Kalshi gateway")
+parser.add_argument("--host", type=str, default=DEFAULT_ADDRESS[0])
+parser.add_argument("-p", "--port", type=int, default=DEFAULT_ADDRESS[1])
+parser.add_argument(
+    "-w", "--workers", type=int, default=8, help="Requests executed concurrently"
+)
+parser.add_argument(
+    "-t",
+    "--tier",
+    type=str,
+    choices=[tier.name for tier in RateLimitTier],
+    default=RateLimitTier.BASIC.name,
+    help="API rate limit tier to stay within",
+)
+parser.add_argument("--key_path", type=Path, default=KALSHI_KEY)
+parser.add_argument(
+    "--authkey_path",
+    type=Path,
+    default=GATEWAY_AUTHKEY,
+    help="Where to write the key clients authenticate with",
+)
+parser.add_argument(
+    "--stub", action="store_true", help="Serve a local stub exchange instead"
+)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    pprint(args)
+
+    client_kwargs = dict(
+        pool_size=args.workers,
+        rate_limiter=RateLimiter.from_tier(RateLimitTier[args.tier]),
+    )
+    if args.stub:
+        # Keep stub markets out of the on-disk cache
+        client_kwargs["metadata_cache"] = MetadataCache()
+        stub = StubExchange()
+        stub.start()
+        print(f"Stub exchange listening on {stub.url}")
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = ExchangeClient(stub.url, "stub", private_key, **client_kwargs)
+    else:
+        client_kwargs["metadata_cache"] = MetadataCache(path=KALSHI_METADATA_CACHE)
+        signer = RequestSigner.from_file(args.key_path)
+        client = ExchangeClient(
+            str(PROD_API_BASE),
+            API_ID,
+            signer.private_key,
+            signer=signer,
+            **client_kwargs,
+        )
+
+    server = GatewayServer(
+        client,
+        (args.host, args.port),
+        authkey_path=args.authkey_path,
+        workers=args.workers,
+    )
+    print(f"Gateway listening on {server.address}, authkey in {args.authkey_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pprint(server.stats())
+    finally:
+        server.close()
+        client.close()
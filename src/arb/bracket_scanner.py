@@ -0,0 +1,306 @@
+"""
+Scanning mutually exclusive bracket events for risk-free trades.
+
+Exactly one bracket of a temperature event resolves yes, so for an event
+with k brackets:
+
+- a yes in every bracket pays 100 cents, which is an arbitrage when the
+  yes asks sum to less than 100,
+- a no in every bracket pays (k - 1) * 100 cents, which is an arbitrage
+  when the no asks sum to less than that.
+
+Orderbooks of every event are packed into padded (event, bracket, level)
+arrays, and the best number of sets to buy per event, after walking the
+ask ladders and paying fees, is found for all events at once.
+"""
+
+import time
+from itertools import chain
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional
+
+import numpy as np
+
+from ..kalshi.api_client import ExchangeClient
+from ..kalshi.fees import TAKER_FEE_BPS, trading_fee
+from ..kalshi.market_index import MarketIndex
+from ..kalshi.models import OrderBookLevels
+
+SIDES = ("yes", "no")
+
+# Bounds the (event, candidate, bracket, level) temporaries of a scan
+MAX_SCAN_ELEMENTS = 2**22
+
+
+def _bid_levels(book: OrderBookLevels | dict, side: str) -> list:
+    if isinstance(book, OrderBookLevels):
+        return getattr(book, side).tolist()
+    return book.get("orderbook", book).get(side) or []
+
+
+@dataclass(slots=True)
+class BracketArb:
+    """
+    Buying `sets` contracts of `side` in every bracket of an event. Amounts
+    are in cents, `limit_prices` are the worst ask reached per bracket.
+    """
+
+    event_ticker: str
+    side: str
+    tickers: list[str]
+    sets: int
+    cost: int
+    fees: int
+    payout: int
+    limit_prices: np.ndarray
+
+    @property
+    def edge(self) -> int:
+        return self.payout - self.cost - self.fees
+
+    @property
+    def return_rate(self) -> float:
+        return self.edge / (self.cost + self.fees)
+
+
+class BracketBooks:
+    """
+    Ask ladders of every bracket of many events, padded to
+    (events, brackets, levels) arrays per side. Padded brackets are masked
+    out by `valid`, padded levels have no quantity.
+
+    Parameters
+    ----------
+    events : Mapping[str, Mapping[str, OrderBookLevels | dict]]
+        Event ticker -> market ticker -> orderbook, with every bracket of
+        each event. Orderbooks may be `get_orderbook` responses.
+    levels : Optional[int]
+        Ask levels kept per bracket, best first. All of them by default.
+    """
+
+    def __init__(
+        self,
+        events: Mapping[str, Mapping[str, OrderBookLevels | dict]],
+        levels: Optional[int] = None,
+    ):
+        self.event_tickers = list(events)
+        self.tickers = [
+            list(events[event_ticker]) for event_ticker in self.event_tickers
+        ]
+        books = [
+            book
+            for event_ticker in self.event_tickers
+            for book in events[event_ticker].values()
+        ]
+        num_events = len(self.event_tickers)
+        num_brackets = max(map(len, self.tickers), default=0)
+        self.valid = np.zeros((num_events, num_brackets), dtype=bool)
+        for e, tickers in enumerate(self.tickers):
+            self.valid[e, : len(tickers)] = True
+        events_of, brackets_of = np.nonzero(self.valid)
+
+        # Yes asks come from no bids and vice versa: a no bid at p cents is
+        # a yes ask at 100 - p
+        ladders = {}
+        for side, other in (("yes", "no"), ("no", "yes")):
+            bids = [_bid_levels(book, other) for book in books]
+            lengths = np.fromiter(map(len, bids), dtype=np.int64, count=len(bids))
+            flat = np.array(list(chain.from_iterable(bids)), dtype=np.int64)
+            ladders[side] = (flat.reshape(-1, 2), lengths)
+        num_levels = max(
+            (int(n.max(initial=0)) for _, n in ladders.values()), default=0
+        )
+        if levels is not None:
+            num_levels = min(num_levels, levels)
+        shape = (num_events, num_brackets, max(num_levels, 1))
+
+        self.prices = {}
+        self.sizes = {}
+        for side, (flat, lengths) in ladders.items():
+            # Sort every market's bids best first in one go, then scatter
+            # each to its (event, bracket, rank) slot
+            owner = np.repeat(np.arange(len(lengths)), lengths)
+            order = np.lexsort((-flat[:, 0], owner))
+            rank = np.arange(len(order)) - np.repeat(
+                np.cumsum(lengths) - lengths, lengths
+            )
+            keep = rank < shape[2]
+            owner, rank, flat = owner[keep], rank[keep], flat[order][keep]
+            index = (events_of[owner], brackets_of[owner], rank)
+            self.prices[side] = np.zeros(shape, dtype=np.int64)
+            self.sizes[side] = np.zeros(shape, dtype=np.int64)
+            self.prices[side][index] = 100 - flat[:, 0]
+            self.sizes[side][index] = flat[:, 1]
+
+    @property
+    def num_markets(self) -> int:
+        return int(self.valid.sum())
+
+    @classmethod
+    def fetch(
+        cls,
+        client: ExchangeClient,
+        index: MarketIndex,
+        event_tickers: Iterable[str],
+        depth: Optional[int] = None,
+    ) -> "BracketBooks":
+        """
+        Fetches the orderbooks of the brackets of events in `index`. Events
+        with a bracket no longer trading (status other than "active"), or
+        with a market whose strike is not a bracket, are skipped, since the
+        rest may not cover every outcome.
+        """
+        events = {}
+        for event_ticker in event_tickers:
+            brackets = index.brackets(event_ticker)
+            markets = brackets.markets
+            if not brackets.complete or any(m.status != "active" for m in markets):
+                continue
+            events[event_ticker] = {
+                m.ticker: client.get_orderbook(m.ticker, depth=depth) for m in markets
+            }
+        return cls(events, levels=depth)
+
+
+def _scan_side(
+    prices: np.ndarray,
+    sizes: np.ndarray,
+    valid: np.ndarray,
+    payout_per_set: np.ndarray,
+    fee_bps: int,
+    max_sets: Optional[int],
+) -> tuple[np.ndarray, ...]:
+    """
+    The best (sets, cost, fees, limit prices) per event for one side.
+
+    The edge is piecewise linear in the number of sets between the points
+    where some bracket's ladder moves to its next level, apart from fee
+    rounding, so only those points are evaluated.
+    """
+    num_events, num_brackets, num_levels = prices.shape
+    cum = np.cumsum(sizes, axis=2)
+    prev = cum - sizes
+
+    # Every bracket must be filled, so the depth is the shallowest one's
+    depth = np.where(valid, cum[..., -1], np.iinfo(np.int64).max).min(axis=1)
+    depth = np.where(valid.any(axis=1), depth, 0)
+    if max_sets is not None:
+        depth = np.minimum(depth, max_sets)
+    candidates = np.where(valid[..., None], cum, depth[:, None, None])
+    candidates = np.minimum(candidates.reshape(num_events, -1), depth[:, None])
+    candidates = np.sort(candidates, axis=1)
+
+    # The level each candidate ends in per bracket, by one search of the
+    # ladders laid end to end, each offset past the previous one's depth.
+    # Searching in (event, bracket, candidate) order keeps the needles
+    # sorted too.
+    rows = np.arange(num_events * num_brackets).reshape(num_events, -1, 1)
+    stride = cum.max(initial=0) + 1
+    keys = (cum + rows * stride).ravel()
+    ends = np.searchsorted(keys, candidates[:, None] + rows * stride)
+    ends = np.minimum(ends, (rows + 1) * num_levels - 1).transpose(0, 2, 1)
+
+    # Whole levels before it, then the part of it taken
+    whole_cost = np.cumsum(prices * sizes, axis=2) - prices * sizes
+    whole_fees = trading_fee(sizes, prices, fee_bps)
+    whole_fees = np.cumsum(whole_fees, axis=2) - whole_fees
+    price = prices.ravel()[ends]
+    partial = np.where(valid[:, None], candidates[:, :, None] - prev.ravel()[ends], 0)
+    cost = (whole_cost.ravel()[ends] + partial * price).sum(axis=2)
+    fees = whole_fees.ravel()[ends] + trading_fee(partial, price, fee_bps)
+    fees = fees.sum(axis=2)
+    edge = candidates * payout_per_set[:, None] - cost - fees
+
+    best = np.argmax(edge, axis=1)
+    rows = np.arange(num_events)
+    limits = np.where(valid, price[rows, best], 0)
+    return candidates[rows, best], cost[rows, best], fees[rows, best], limits
+
+
+def scan(
+    books: BracketBooks,
+    fee_bps: int = TAKER_FEE_BPS,
+    min_edge: int = 1,
+    max_sets: Optional[int] = None,
+) -> list[BracketArb]:
+    """
+    Every event and side with an edge of at least `min_edge` cents after
+    fees, best edge first.
+
+    Fees are charged per level filled, which overestimates them slightly
+    when one order fills at several levels, so the edges are conservative.
+
+    Parameters
+    ----------
+    books : BracketBooks
+        The orderbooks of the events.
+    fee_bps : int
+        Fee rate, `TAKER_FEE_BPS` since the asks are crossed.
+    min_edge : int
+        Smallest profit in cents worth reporting.
+    max_sets : Optional[int]
+        Caps the sets bought per event, e.g. to the capital available.
+    """
+    num_events, num_brackets, num_levels = books.prices["yes"].shape
+    num_brackets_per_event = books.valid.sum(axis=1)
+    payouts = {
+        "yes": np.full(num_events, 100, dtype=np.int64),
+        "no": (num_brackets_per_event - 1) * 100,
+    }
+    # Events whose temporaries fit in MAX_SCAN_ELEMENTS at a time
+    per_event = max(num_brackets * num_levels, 1) ** 2
+    chunk = max(1, MAX_SCAN_ELEMENTS // per_event)
+
+    results = []
+    for side in SIDES:
+        for start in range(0, num_events, chunk):
+            window = slice(start, start + chunk)
+            sets, cost, fees, limits = _scan_side(
+                books.prices[side][window],
+                books.sizes[side][window],
+                books.valid[window],
+                payouts[side][window],
+                fee_bps,
+                max_sets,
+            )
+            edge = sets * payouts[side][window] - cost - fees
+            actionable = (
+                (edge >= min_edge) & (sets > 0) & (num_brackets_per_event[window] >= 2)
+            )
+            for i in np.flatnonzero(actionable):
+                e = start + i
+                k = num_brackets_per_event[e]
+                results.append(
+                    BracketArb(
+                        event_ticker=books.event_tickers[e],
+                        side=side,
+                        tickers=books.tickers[e],
+                        sets=int(sets[i]),
+                        cost=int(cost[i]),
+                        fees=int(fees[i]),
+                        payout=int(sets[i] * payouts[side][e]),
+                        limit_prices=limits[i, :k],
+                    )
+                )
+    results.sort(key=lambda arb: arb.edge, reverse=True)
+    return results
+
+
+def scan_index(
+    client: ExchangeClient,
+    index: MarketIndex,
+    hours: float = 48,
+    depth: Optional[int] = None,
+    **kwargs,
+) -> tuple[list[BracketArb], dict[str, float]]:
+    """
+    Scans every event in `index` with a bracket closing in the next `hours`
+    hours. Returns the arbitrages and the seconds spent fetching and
+    scanning.
+    """
+    start = time.perf_counter()
+    event_tickers = {m.event_ticker for m in index.closing_within(hours)}
+    books = BracketBooks.fetch(client, index, sorted(event_tickers), depth=depth)
+    fetched = time.perf_counter()
+    arbs = scan(books, **kwargs)
+    return arbs, {"fetch": fetched - start, "scan": time.perf_counter() - fetched}
@@ -0,0 +1,252 @@
+"""
+Live re-solving of arbitrage programs as prices tick.
+
+Each watched structure keeps its `StructuredProgram` built once. On a tick
+only the price entries and bounds change, in place, and before calling the
+solver the previous optimum is checked against the new prices:
+
+Every row but `cost <= budget` is homogeneous, so the previous allocation
+scaled back onto the budget is still feasible, and its guaranteed profit at
+the new prices is read off directly. Prices only enter the reduced costs of
+the leg variables, through the profit and budget rows, so the previous
+duals give the new reduced costs with one vector operation. If those still
+satisfy the optimality conditions for the scaled allocation, it is optimal
+and the solver is skipped. Most ticks on a structure without an arbitrage
+only move prices that stay above the fair values the duals imply, and are
+answered this way.
+
+`linprog` does not take a starting basis, so when the check fails the
+program is solved again from scratch, without rebuilding it.
+"""
+
+import time
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+
+from ..kalshi.metrics import LatencyStats
+from .solver import ArbResult, Component, build_program
+
+
+class WarmProgram:
+    """
+    A structure's program and its last optimum, re-solved only when a tick
+    invalidates it.
+
+    Parameters
+    ----------
+    components : Sequence[Component]
+        The structure, as for `solve`.
+    budget : float
+        Dollars to spend at most.
+    tol : float
+        Tolerance of the optimality check, on the order of the solver's.
+    """
+
+    def __init__(
+        self, components: Sequence[Component], budget: float = 1.0, tol: float = 1e-7
+    ):
+        self.program = build_program(components, budget)
+        self.budget = budget
+        self.tol = tol
+        self.names = [leg.name for leg in self.program.legs]
+        self.leg_index = {name: i for i, name in enumerate(self.names)}
+
+        # Last optimum: primal, row duals and reduced costs
+        self.z: Optional[np.ndarray] = None
+        self.duals: Optional[np.ndarray] = None
+        self.reduced: Optional[np.ndarray] = None
+        self.result: Optional[ArbResult] = None
+
+        self.num_ticks = 0
+        self.num_solves = 0
+        self.tick_latency = LatencyStats()
+        self.solve_latency = LatencyStats()
+
+    @property
+    def num_legs(self) -> int:
+        return self.program.num_legs
+
+    def _make_result(self, z: np.ndarray, costs: np.ndarray, status: str) -> ArbResult:
+        n = self.num_legs
+        return ArbResult(
+            self.names,
+            z[:n],
+            z[n : 2 * n],
+            float(z[: 2 * n] @ costs),
+            max(0.0, float(z[self.program.t])),
+            status,
+            num_constraints=len(self.program.b_ub),
+        )
+
+    def _solve(self) -> ArbResult:
+        start = time.perf_counter()
+        solution = self.program.solve()
+        self.solve_latency.record(time.perf_counter() - start)
+        self.num_solves += 1
+        if solution.status != 0:
+            self.z = self.duals = self.reduced = None
+            zeros = np.zeros(self.program.A_ub.shape[1])
+            return self._make_result(zeros, self.program.costs, solution.message)
+        self.z = solution.x
+        self.duals = solution.ineqlin.marginals
+        self.reduced = self.program.c - self.program.A_ub.T @ self.duals
+        return self._make_result(self.z, self.program.costs, solution.message)
+
+    def _check(self, costs: np.ndarray, upper: np.ndarray) -> Optional[np.ndarray]:
+        """
+        The previous optimum adjusted to the new prices and bounds, if it is
+        still optimal, else None.
+        """
+        program, tol = self.program, self.tol
+        m = 2 * self.num_legs
+        xy = self.z[:m]
+        profit_dual = self.duals[program.profit_row]
+        budget_dual = self.duals[program.budget_row]
+
+        # Scale back onto the budget if it was binding
+        cost = float(xy @ costs)
+        scale = 1.0
+        if budget_dual < -tol:
+            if cost <= tol:
+                return None
+            scale = self.budget / cost
+        z = self.z * scale
+        z[program.t] = z[program.worst].sum() - cost * scale
+        if cost * scale > self.budget + tol or np.any(z[:m] > upper + tol):
+            return None
+
+        # Only the price coefficients of the two rows changed
+        reduced = self.reduced[:m] - (costs - program.costs) * (
+            profit_dual + budget_dual
+        )
+        at_lower = z[:m] <= tol
+        at_upper = z[:m] >= upper - tol
+        interior = ~at_lower & ~at_upper
+        if (
+            np.any(reduced[at_lower & ~at_upper] < -tol)
+            or np.any(reduced[at_upper & ~at_lower] > tol)
+            or np.any(np.abs(reduced[interior]) > tol)
+        ):
+            return None
+        self.reduced = self.reduced.copy()
+        self.reduced[:m] = reduced
+        return z
+
+    def update(
+        self,
+        yes_ask: Optional[np.ndarray] = None,
+        no_ask: Optional[np.ndarray] = None,
+        max_yes: Optional[np.ndarray] = None,
+        max_no: Optional[np.ndarray] = None,
+    ) -> ArbResult:
+        """
+        Applies new asks and contract limits, per leg in `names` order, and
+        returns the optimum. Arguments left as None keep their values, and
+        np.inf lifts a limit.
+        """
+        start = time.perf_counter()
+        program = self.program
+        n = self.num_legs
+        costs = program.costs.copy()
+        upper = program.upper[: 2 * n].copy()
+        for values, section in ((yes_ask, costs[:n]), (no_ask, costs[n:])):
+            if values is not None:
+                section[:] = values
+        for values, section in ((max_yes, upper[:n]), (max_no, upper[n:])):
+            if values is not None:
+                section[:] = values
+
+        z = None
+        if self.z is not None and self.result is not None:
+            z = self._check(costs, upper)
+        program.set_prices(costs)
+        program.upper[: 2 * n] = upper
+        if z is None:
+            self.result = self._solve()
+        else:
+            self.z = z
+            self.result = self._make_result(z, costs, "Previous optimum still optimal")
+        self.num_ticks += 1
+        self.tick_latency.record(time.perf_counter() - start)
+        return self.result
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.num_ticks,
+            "solves": self.num_solves,
+            "skipped": self.num_ticks - self.num_solves,
+            "tick_latency": self.tick_latency.snapshot(),
+            "solve_latency": self.solve_latency.snapshot(),
+        }
+
+
+class ArbMonitor:
+    """
+    Watches many structures, re-solving only those a quote touches.
+
+    Typical use:
+
+        monitor = ArbMonitor()
+        monitor.watch("deep-blue", [AllOf(state_legs, all_states_leg)])
+        ...
+        for ticker, yes_ask, no_ask in quotes:
+            for name, result in monitor.tick({ticker: (yes_ask, no_ask)}).items():
+                if result.guaranteed_profit > 0:
+                    ...
+    """
+
+    def __init__(self, tol: float = 1e-7):
+        self.tol = tol
+        self.programs: dict[str, WarmProgram] = {}
+        # Leg name -> (structure, index of the leg in it)
+        self.legs: dict[str, list[tuple[str, int]]] = {}
+
+    def watch(
+        self, name: str, components: Sequence[Component], budget: float = 1.0
+    ) -> ArbResult:
+        """Adds a structure and solves it at its legs' current prices."""
+        program = self.programs[name] = WarmProgram(components, budget, self.tol)
+        for leg_name, i in program.leg_index.items():
+            self.legs.setdefault(leg_name, []).append((name, i))
+        return program.update()
+
+    def unwatch(self, name: str) -> None:
+        program = self.programs.pop(name)
+        for leg_name in program.names:
+            self.legs[leg_name] = [
+                entry for entry in self.legs[leg_name] if entry[0] != name
+            ]
+
+    def tick(
+        self,
+        quotes: Mapping[str, tuple[float, float]],
+        limits: Optional[Mapping[str, tuple[float, float]]] = None,
+    ) -> dict[str, ArbResult]:
+        """
+        Applies new (yes ask, no ask) quotes and optionally (max yes, max no)
+        contract limits by leg name. Returns the optimum of every structure
+        with a leg quoted.
+        """
+        limits = limits or {}
+        touched: dict[str, list] = {}
+        for leg_name in {*quotes, *limits}:
+            for name, i in self.legs.get(leg_name, ()):
+                touched.setdefault(name, []).append((i, leg_name))
+
+        results = {}
+        for name, entries in touched.items():
+            program = self.programs[name]
+            n = program.num_legs
+            costs = program.program.costs.copy()
+            upper = program.program.upper[: 2 * n].copy()
+            for i, leg_name in entries:
+                if leg_name in quotes:
+                    costs[i], costs[n + i] = quotes[leg_name]
+                if leg_name in limits:
+                    upper[i], upper[n + i] = limits[leg_name]
+            results[name] = program.update(costs[:n], costs[n:], upper[:n], upper[n:])
+        return results
+
+    def stats(self) -> dict[str, dict]:
+        return {name: program.stats() for name, program in self.programs.items()}
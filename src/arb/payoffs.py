@@ -0,0 +1,173 @@
+"""
+Payoff matrices of yes/no allocations in integer cents, fees included.
+
+The deep blue arbitrage notebook builds
+
+    bound_matrix[:, :n] = event_matrix - cost_weights[:n]
+    bound_matrix[:, n:] = 1 - event_matrix - cost_weights[n:]
+
+in float16, where most cent prices are not representable (0.33 is stored
+as 0.33008) and fees are left out. Here a variable is a lot of `lot_size`
+contracts, and its cost, fee and payout are whole cents:
+
+    payoffs[s, :n] = 100 * lot_size * scenarios[s] - costs[:n]
+    payoffs[s, n:] = 100 * lot_size * (1 - scenarios[s]) - costs[n:]
+
+with `costs` the price of a lot plus its Kalshi fee, charged as one fill.
+Integer matrices convert to float64 without loss for `linprog`, and the
+profits of integer allocations are computed exactly in int64.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from ..kalshi.fees import TAKER_FEE_BPS, trading_fee
+from ..np_utils import vectorized
+
+# Cents a winning contract pays out
+PAYOUT_CENTS = 100
+
+
+def to_cents(prices) -> np.ndarray:
+    """Dollar prices rounded to int32 cents."""
+    return np.rint(np.asarray(prices, dtype=np.float64) * 100).astype(np.int32)
+
+
+def contract_costs(
+    yes_price, no_price, fee_bps: int = TAKER_FEE_BPS, lot_size: int = 1
+) -> np.ndarray:
+    """
+    The (2n,) int64 cost in cents of a lot of each leg's yes contracts then
+    of each leg's no contracts, at `yes_price` and `no_price` cents plus the
+    fee on a fill of `lot_size`. Fees round up per fill, so costs per
+    contract fall as lots grow.
+    """
+    prices = np.concatenate(
+        [np.asarray(yes_price, dtype=np.int64), np.asarray(no_price, dtype=np.int64)]
+    )
+    assert np.all((prices >= 0) & (prices <= PAYOUT_CENTS)), "Prices are in cents"
+    return lot_size * prices + trading_fee(lot_size, prices, fee_bps)
+
+
+def _payoff_dtype(costs: np.ndarray, lot_size: int):
+    largest = PAYOUT_CENTS * lot_size + int(np.abs(costs).max(initial=0))
+    return np.int32 if largest <= np.iinfo(np.int32).max else np.int64
+
+
+def payoff_matrix(
+    scenarios: np.ndarray,
+    costs: np.ndarray,
+    lot_size: int = 1,
+    dtype=None,
+) -> np.ndarray:
+    """
+    Net payoff in cents of a lot of each yes then each no contract in each
+    scenario, the integer form of the notebook's `make_bound_matrix`.
+
+    Parameters
+    ----------
+    scenarios : np.ndarray
+        (S, n) binary outcomes, 1 for yes, e.g. from `scenario_matrix` or
+        `enumerate_binary_inputs`.
+    costs : np.ndarray
+        (2n,) cost of a lot of each contract in cents, as from
+        `contract_costs` with the same `lot_size`.
+    dtype
+        Integer dtype of the result. Defaults to int32 when every entry
+        fits, else int64.
+    """
+    costs = np.asarray(costs, dtype=np.int64)
+    n = scenarios.shape[1]
+    assert costs.shape == (2 * n,)
+    dtype = dtype or _payoff_dtype(costs, lot_size)
+    payout = PAYOUT_CENTS * lot_size
+
+    payoffs = np.empty((len(scenarios), 2 * n), dtype=dtype)
+    yes, no = payoffs[:, :n], payoffs[:, n:]
+    np.multiply(scenarios, payout, out=yes, dtype=dtype, casting="unsafe")
+    np.subtract(payout - costs[n:].astype(dtype), yes, out=no)
+    yes -= costs[:n].astype(dtype)
+    return payoffs
+
+
+def linprog_inputs(
+    payoffs: np.ndarray,
+    costs: np.ndarray,
+    budget: int,
+    max_lots: Optional[np.ndarray] = None,
+) -> dict:
+    """
+    Keyword arguments for `scipy.optimize.linprog` maximizing the worst
+    case profit in cents, over variables [lots of each contract, t]:
+
+        max t  s.t.  t <= payoffs[s] @ lots  for every scenario s,
+                     costs @ lots <= budget
+
+    as `solve_brute_force` does in dollars. The guaranteed profit is
+    `-solution.fun` cents.
+
+    Parameters
+    ----------
+    payoffs : np.ndarray
+        (S, 2n) payoffs from `payoff_matrix`.
+    costs : np.ndarray
+        (2n,) cost of a lot of each contract in cents.
+    budget : int
+        Cents to spend at most.
+    max_lots : Optional[np.ndarray]
+        (2n,) most lots of each contract, e.g. the size at the ask.
+    """
+    num_scenarios, num_vars = payoffs.shape
+    A_ub = np.empty((num_scenarios + 1, num_vars + 1))
+    np.negative(payoffs, out=A_ub[:-1, :-1], casting="unsafe")
+    A_ub[:-1, -1] = 1
+    A_ub[-1, :-1] = costs
+    A_ub[-1, -1] = 0
+    b_ub = np.zeros(num_scenarios + 1)
+    b_ub[-1] = budget
+
+    c = np.zeros(num_vars + 1)
+    c[-1] = -1
+    upper = [None] * num_vars if max_lots is None else list(max_lots)
+    bounds = [(0, u) for u in upper] + [(None, None)]
+    return {"c": c, "A_ub": A_ub, "b_ub": b_ub, "bounds": bounds, "method": "highs"}
+
+
+@vectorized(arg_name="lots", row_ndim=1)
+def scenario_profits(
+    lots: np.ndarray, scenarios: np.ndarray, costs: np.ndarray, lot_size: int = 1
+) -> np.ndarray:
+    """
+    Exact int64 profit in cents of integer allocations of (..., 2n) lots in
+    each of the (S, n) scenarios, shape (..., S), without building the
+    payoff matrix: yes lots pay in the scenarios where a leg resolves yes and
+    no lots in the rest.
+    """
+    lots = np.asarray(lots, dtype=np.int64)
+    n = scenarios.shape[1]
+    payout = PAYOUT_CENTS * lot_size
+    # Constant part: every no lot pays out unless its leg resolves yes
+    base = payout * lots[:, n:].sum(axis=1) - lots @ np.asarray(costs, dtype=np.int64)
+    swing = payout * (lots[:, :n] - lots[:, n:])
+    return base[:, None] + swing @ scenarios.T.astype(np.int64)
+
+
+def worst_case_profit(
+    lots: np.ndarray,
+    costs: np.ndarray,
+    scenarios: Optional[np.ndarray] = None,
+    lot_size: int = 1,
+) -> int:
+    """
+    Exact worst case profit in cents of an integer allocation of (2n,) lots
+    over `scenarios`. With no scenarios the n legs are independent, and the
+    worst of the 2^n outcomes resolves every leg against its larger side.
+    """
+    lots = np.asarray(lots, dtype=np.int64)
+    if scenarios is not None:
+        return int(scenario_profits(lots, scenarios, costs, lot_size).min())
+    n = len(lots) // 2
+    payout = PAYOUT_CENTS * lot_size
+    paid = payout * np.minimum(lots[:n], lots[n:]).sum()
+    return int(paid - lots @ np.asarray(costs, dtype=np.int64))
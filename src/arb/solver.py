@@ -0,0 +1,402 @@
+"""
+Guaranteed-profit allocations over structured sets of binary markets.
+
+A structure is a list of components over disjoint legs, each leg being a
+market we can buy yes or no contracts in:
+
+- `Independent(legs)`: every leg resolves on its own.
+- `ExactlyOne(legs)`: exactly one leg resolves yes (at most one with
+  `exhaustive=False`), e.g. the brackets of a temperature event.
+- `AllOf(legs, combined)`: `combined` resolves yes iff every leg does, e.g.
+  a "wins every deep blue state" market and its per-state markets.
+
+Components are independent of each other, so the worst case over all
+scenarios is the sum of each component's worst case. Each component's
+worst case is written with O(legs) linear constraints instead of one
+constraint per scenario, which is what `enumerate_binary_inputs` and the
+brute force formulation need (2^n rows).
+
+Prices are in dollars per contract, each contract paying $1.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from ..np_utils import enumerate_binary_inputs
+
+# Brute force is refused beyond this many scenarios
+MAX_BRUTE_FORCE_SCENARIOS = 2**18
+
+
+@dataclass
+class Leg:
+    """
+    A market we can buy yes or no in, at the given asks. Buying no at
+    `no_ask` is the same as selling yes at the yes bid `1 - no_ask`.
+    `max_yes`/`max_no` cap the contracts bought, e.g. at the book depth.
+    """
+
+    name: str
+    yes_ask: float
+    no_ask: float
+    max_yes: Optional[float] = None
+    max_no: Optional[float] = None
+
+    @classmethod
+    def from_quotes(cls, name: str, yes_bid: float, yes_ask: float, **kwargs):
+        return cls(name, yes_ask=yes_ask, no_ask=1 - yes_bid, **kwargs)
+
+
+@dataclass
+class Independent:
+    legs: list[Leg]
+
+
+@dataclass
+class ExactlyOne:
+    legs: list[Leg]
+    exhaustive: bool = True
+
+
+@dataclass
+class AllOf:
+    legs: list[Leg]
+    combined: Leg
+
+
+Component = Independent | ExactlyOne | AllOf
+
+
+@dataclass
+class ArbResult:
+    """
+    Contracts to buy per leg, what they cost and the profit they make in
+    the worst scenario. A profit of 0 with no contracts means there is no
+    arbitrage.
+    """
+
+    names: list[str]
+    yes: np.ndarray
+    no: np.ndarray
+    cost: float
+    guaranteed_profit: float
+    status: str
+    num_constraints: int = 0
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def profit_rate(self) -> float:
+        return self.guaranteed_profit / self.cost if self.cost > 0 else 0.0
+
+    def allocation(self, min_contracts: float = 1e-9) -> dict[str, tuple]:
+        """The legs traded, as name -> (yes contracts, no contracts)."""
+        return {
+            name: (yes, no)
+            for name, yes, no in zip(self.names, self.yes, self.no)
+            if yes > min_contracts or no > min_contracts
+        }
+
+
+def component_legs(component: Component) -> list[Leg]:
+    if isinstance(component, AllOf):
+        return [*component.legs, component.combined]
+    return list(component.legs)
+
+
+class _Program:
+    """Accumulates the sparse rows of `A_ub x <= b_ub`."""
+
+    def __init__(self):
+        self.indptr: list[int] = [0]
+        self.cols: list[int] = []
+        self.vals: list[float] = []
+        self.b: list[float] = []
+        self.num_vars = 0
+
+    def new_vars(self, count: int) -> np.ndarray:
+        start = self.num_vars
+        self.num_vars += count
+        return np.arange(start, start + count)
+
+    def add_row(self, cols: Sequence[int], vals: Sequence[float], bound: float) -> int:
+        """Returns the offset of the row's first entry in the matrix data."""
+        offset = len(self.vals)
+        self.cols.extend(cols)
+        self.vals.extend(vals)
+        self.indptr.append(len(self.vals))
+        self.b.append(bound)
+        return offset
+
+    def matrix(self) -> sparse.csr_matrix:
+        # Built directly so entries keep their offsets, zeros included
+        return sparse.csr_matrix(
+            (
+                np.array(self.vals, dtype=np.float64),
+                np.array(self.cols, dtype=np.int64),
+                np.array(self.indptr, dtype=np.int64),
+            ),
+            shape=(len(self.b), self.num_vars),
+        )
+
+
+def _min_of_pair(program: _Program, x: int, y: int) -> int:
+    # u <= x and u <= y, which the maximization pushes up to min(x, y)
+    (u,) = program.new_vars(1)
+    program.add_row([u, x], [1, -1], 0)
+    program.add_row([u, y], [1, -1], 0)
+    return u
+
+
+def _worst_case(program: _Program, component: Component, x, y) -> int:
+    """
+    Adds a variable w and rows forcing w <= the component's payoff in every
+    scenario. `x`, `y` are the yes and no variables of its legs.
+    """
+    (w,) = program.new_vars(1)
+    n = len(x)
+    if isinstance(component, Independent):
+        # Each leg pays its yes or its no: the worst case is the smaller one
+        u = [_min_of_pair(program, x[i], y[i]) for i in range(n)]
+        program.add_row([w, *u], [1] + [-1] * n, 0)
+
+    elif isinstance(component, ExactlyOne):
+        # Leg j wins: x_j + sum of the other no's
+        for j in range(n):
+            others = [y[i] for i in range(n) if i != j]
+            program.add_row([w, x[j], *others], [1, -1] + [-1] * (n - 1), 0)
+        if not component.exhaustive:
+            program.add_row([w, *y], [1] + [-1] * n, 0)
+
+    elif isinstance(component, AllOf):
+        # The last leg is the combined market
+        m = n - 1
+        # Every leg resolves yes, so does the combined market
+        program.add_row([w, *x], [1] + [-1] * n, 0)
+        # Otherwise leg j resolves no, the combined market resolves no and
+        # every other leg pays its worse side
+        u = [_min_of_pair(program, x[i], y[i]) for i in range(m)]
+        for j in range(m):
+            others = [u[i] for i in range(m) if i != j]
+            program.add_row([w, y[m], y[j], *others], [1, -1, -1] + [-1] * (m - 1), 0)
+    else:
+        raise TypeError(f"Unknown component {component!r}")
+    return w
+
+
+def _result(legs: list[Leg], solution, num_constraints: int) -> ArbResult:
+    names = [leg.name for leg in legs]
+    n = len(legs)
+    if solution.status != 0:
+        zeros = np.zeros(n)
+        return ArbResult(names, zeros, zeros, 0.0, 0.0, solution.message)
+    costs = np.array([leg.yes_ask for leg in legs] + [leg.no_ask for leg in legs])
+    return ArbResult(
+        names,
+        solution.x[:n],
+        solution.x[n : 2 * n],
+        float(solution.x[: 2 * n] @ costs),
+        # No arbitrage solves to -0.0 with nothing bought
+        max(0.0, float(-solution.fun)),
+        solution.message,
+        num_constraints=num_constraints,
+    )
+
+
+def _leg_bounds(legs: list[Leg]) -> list[tuple]:
+    return [(0, leg.max_yes) for leg in legs] + [(0, leg.max_no) for leg in legs]
+
+
+@dataclass
+class StructuredProgram:
+    """
+    The linear program `solve` builds: minimize `c @ z` subject to
+    `A_ub @ z <= b_ub` and `lower <= z <= upper`, over z = [x, y, aux, t]
+    with x and y the yes and no contracts of each leg.
+
+    Prices only appear in two rows, `t + cost - sum w <= 0` and
+    `cost <= budget`, at `price_entries` of `A_ub.data`, so they can be
+    changed in place without building the program again.
+    """
+
+    legs: list[Leg]
+    c: np.ndarray
+    A_ub: sparse.csr_matrix
+    b_ub: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    worst: np.ndarray
+    t: int
+    profit_row: int
+    budget_row: int
+    price_entries: np.ndarray
+
+    @property
+    def num_legs(self) -> int:
+        return len(self.legs)
+
+    @property
+    def costs(self) -> np.ndarray:
+        """Yes then no asks of every leg."""
+        return self.A_ub.data[self.price_entries[1]]
+
+    def set_prices(self, costs: np.ndarray) -> None:
+        self.A_ub.data[self.price_entries] = costs
+
+    def solve(self):
+        """Solves the program as is and returns the `linprog` result."""
+        return linprog(
+            self.c,
+            A_ub=self.A_ub,
+            b_ub=self.b_ub,
+            bounds=np.stack([self.lower, self.upper], axis=1),
+            method="highs",
+        )
+
+
+def build_program(
+    components: Sequence[Component], budget: float = 1.0
+) -> StructuredProgram:
+    """
+    The program maximizing t subject to t <= sum_k w_k - cost, cost <=
+    budget and, for each component k, w_k <= its payoff in each of its
+    scenario classes.
+    """
+    legs = [leg for component in components for leg in component_legs(component)]
+    n = len(legs)
+    program = _Program()
+    x = program.new_vars(n)
+    y = program.new_vars(n)
+
+    worst = []
+    offset = 0
+    for component in components:
+        size = len(component_legs(component))
+        legs_x, legs_y = x[offset : offset + size], y[offset : offset + size]
+        worst.append(_worst_case(program, component, legs_x, legs_y))
+        offset += size
+
+    (t,) = program.new_vars(1)
+    costs = [leg.yes_ask for leg in legs] + [leg.no_ask for leg in legs]
+    profit_row = len(program.b)
+    # t + cost - sum w <= 0
+    profit_offset = program.add_row(
+        [t, *x, *y, *worst], [1, *costs] + [-1] * len(worst), 0
+    )
+    budget_offset = program.add_row([*x, *y], costs, budget)
+
+    c = np.zeros(program.num_vars)
+    c[t] = -1
+    lower = np.full(program.num_vars, -np.inf)
+    upper = np.full(program.num_vars, np.inf)
+    lower[: 2 * n] = 0
+    upper[: 2 * n] = [np.inf if b is None else b for _, b in _leg_bounds(legs)]
+    return StructuredProgram(
+        legs=legs,
+        c=c,
+        A_ub=program.matrix(),
+        b_ub=np.array(program.b),
+        lower=lower,
+        upper=upper,
+        worst=np.array(worst),
+        t=t,
+        profit_row=profit_row,
+        budget_row=profit_row + 1,
+        price_entries=np.stack(
+            [
+                np.arange(profit_offset + 1, profit_offset + 1 + 2 * n),
+                np.arange(budget_offset, budget_offset + 2 * n),
+            ]
+        ),
+    )
+
+
+def solve(components: Sequence[Component], budget: float = 1.0) -> ArbResult:
+    """
+    Finds the allocation with the largest profit guaranteed in every
+    scenario, spending at most `budget` dollars. See `build_program`.
+    """
+    program = build_program(components, budget)
+    return _result(program.legs, program.solve(), len(program.b_ub))
+
+
+def scenario_matrix(components: Sequence[Component]) -> np.ndarray:
+    """
+    Every joint outcome of the structure's legs, one row per scenario and
+    one column per leg (1 for yes). Has the product of the components'
+    scenario counts as rows.
+    """
+    blocks = []
+    for component in components:
+        n = len(component.legs)
+        if isinstance(component, Independent):
+            blocks.append(enumerate_binary_inputs(n))
+        elif isinstance(component, ExactlyOne):
+            block = np.eye(n, dtype=np.int8)
+            if not component.exhaustive:
+                block = np.concatenate([block, np.zeros((1, n), dtype=np.int8)])
+            blocks.append(block)
+        elif isinstance(component, AllOf):
+            block = enumerate_binary_inputs(n)
+            combined = np.prod(block, axis=1, keepdims=True, dtype=np.int8)
+            blocks.append(np.concatenate([block, combined], axis=1))
+        else:
+            raise TypeError(f"Unknown component {component!r}")
+
+    scenarios = blocks[0]
+    for block in blocks[1:]:
+        scenarios = np.concatenate(
+            [
+                np.repeat(scenarios, len(block), axis=0),
+                np.tile(block, (len(scenarios), 1)),
+            ],
+            axis=1,
+        )
+    return scenarios
+
+
+def solve_brute_force(
+    components: Sequence[Component], budget: float = 1.0
+) -> ArbResult:
+    """
+    The same program as `solve` with one constraint per scenario, as in the
+    deep blue arbitrage notebook. Exponential in the number of legs.
+    """
+    num_scenarios = 1
+    for component in components:
+        n = len(component.legs)
+        if isinstance(component, ExactlyOne):
+            num_scenarios *= n + (not component.exhaustive)
+        else:
+            num_scenarios *= 2**n
+    if num_scenarios > MAX_BRUTE_FORCE_SCENARIOS:
+        raise ValueError(f"{num_scenarios} scenarios is too many to enumerate")
+
+    legs = [leg for component in components for leg in component_legs(component)]
+    n = len(legs)
+    scenarios = scenario_matrix(components)
+    costs = np.array([leg.yes_ask for leg in legs] + [leg.no_ask for leg in legs])
+
+    # Variables are [x, y, t]: t - (payoff - cost) <= 0 in every scenario
+    payoff = np.concatenate([scenarios, 1 - scenarios], axis=1).astype(np.float64)
+    A_ub = np.empty((len(scenarios) + 1, 2 * n + 1))
+    A_ub[:-1, : 2 * n] = costs[None] - payoff
+    A_ub[:-1, -1] = 1
+    A_ub[-1, : 2 * n] = costs
+    A_ub[-1, -1] = 0
+    b_ub = np.zeros(len(A_ub))
+    b_ub[-1] = budget
+
+    c = np.zeros(2 * n + 1)
+    c[-1] = -1
+    solution = linprog(
+        c,
+        A_ub=A_ub,
+        b_ub=b_ub,
+        bounds=_leg_bounds(legs) + [(None, None)],
+        method="highs",
+    )
+    return _result(legs, solution, len(b_ub))
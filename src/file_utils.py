@@ -53,7 +53,7 @@ def pathlike(*arg_names: str):
 def safe_open_dir(dirpath: Path) -> Path:
     if not dirpath.is_dir():
         print(f"Directory {dirpath} does not exist, creating it")
-        dirpath.mkdir(parents=True)
+        dirpath.mkdir(parents=True, exist_ok=True)
     return dirpath
 
 
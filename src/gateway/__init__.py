@@ -0,0 +1,3 @@
+from .client import GatewayClient
+from .protocol import GatewayError
+from .server import GatewayServer
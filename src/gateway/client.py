@@ -0,0 +1,143 @@
+"""
+The client library strategies use to talk to a `GatewayServer`.
+"""
+
+import threading
+from concurrent.futures import Future
+from functools import partial
+from itertools import count
+from multiprocessing.connection import Client
+from pathlib import Path
+from typing import Any, Optional
+
+from . import protocol
+
+
+class GatewayClient:
+    """
+    A connection to a `GatewayServer`.
+
+    The endpoint methods of `ExchangeClient` that the gateway allows are
+    available under the same names and signatures, e.g.
+    `gateway.get_orderbook("HIGHNY-24NOV10-B74.5", depth=5)`. Calls block
+    until the gateway answers; `submit` sends a call without waiting and
+    returns a future, so one client can have many requests in flight.
+    Exchange errors are re-raised as `HttpError`.
+
+    Parameters
+    ----------
+    address : tuple | str
+        The gateway's address.
+    authkey : Optional[bytes]
+        The gateway's shared secret. None reads it from `authkey_path`.
+    authkey_path : Path | str
+        Where the gateway wrote its authkey.
+    name : Optional[str]
+        Shown in the gateway's stats.
+    weight : int
+        This client's share of the gateway's request budget relative to
+        other clients.
+    config : Optional[dict]
+        Strategy settings the gateway keeps under `name` across restarts.
+        None gets back the config last registered under `name`, as `config`.
+    timeout : Optional[float]
+        Seconds to wait for each blocking call. None waits forever.
+    """
+
+    def __init__(
+        self,
+        address: tuple | str = protocol.DEFAULT_ADDRESS,
+        authkey: Optional[bytes] = None,
+        authkey_path: Path | str = protocol.DEFAULT_AUTHKEY_PATH,
+        name: Optional[str] = None,
+        weight: int = 1,
+        config: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ):
+        if authkey is None:
+            authkey = protocol.read_authkey(authkey_path)
+        self.conn = Client(address, authkey=authkey)
+        self.timeout = timeout
+        self.ids = count()
+        self.lock = threading.Lock()
+        self.futures: dict[int, Future] = {}
+        self.closed = False
+
+        self.reader = threading.Thread(
+            target=self._read, name="gateway-client-reader", daemon=True
+        )
+        self.reader.start()
+        registration = self._call(
+            "register", (name or "client",), {"weight": weight, "config": config}
+        )
+        self.name: str = registration["name"]
+        self.config: Optional[dict] = registration["config"]
+
+    def _read(self) -> None:
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            with self.lock:
+                future = self.futures.pop(message["id"], None)
+            if future is None:
+                continue
+            if "error" in message:
+                try:
+                    protocol.raise_error(message["error"])
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future.set_result(message["result"])
+
+        # The gateway went away, fail everything still waiting
+        with self.lock:
+            futures, self.futures = self.futures, {}
+            self.closed = True
+        for future in futures.values():
+            future.set_exception(
+                protocol.GatewayError("Disconnected", "Gateway connection closed")
+            )
+
+    def _submit(self, method: str, args: tuple, kwargs: dict) -> Future:
+        future: Future = Future()
+        with self.lock:
+            if self.closed:
+                raise protocol.GatewayError("Disconnected", "Gateway connection closed")
+            id = next(self.ids)
+            self.futures[id] = future
+            self.conn.send(protocol.request(id, method, args, kwargs))
+        return future
+
+    def _call(self, method: str, args: tuple, kwargs: dict) -> Any:
+        return self._submit(method, args, kwargs).result(self.timeout)
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """Sends an endpoint call without waiting for its response."""
+        if method not in protocol.ALLOWED_METHODS:
+            raise AttributeError(method)
+        return self._submit(method, args, kwargs)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        return self.submit(method, *args, **kwargs).result(self.timeout)
+
+    def __getattr__(self, method: str):
+        if method in protocol.ALLOWED_METHODS:
+            return partial(self.call, method)
+        raise AttributeError(method)
+
+    def stats(self) -> dict[str, Any]:
+        """The gateway's per-client and deduplication stats."""
+        return self._call("stats", (), {})
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+        protocol.shutdown(self.conn)
+
+    def __enter__(self) -> "GatewayClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
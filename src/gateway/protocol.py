@@ -0,0 +1,140 @@
+"""
+Messages exchanged between the gateway and its clients.
+
+Messages are plain dicts sent over a `multiprocessing.connection` channel,
+which pickles them:
+
+    request:  {"id": int, "method": str, "args": tuple, "kwargs": dict}
+    response: {"id": int, "result": Any}
+           or {"id": int, "error": {"type": str, "message": str, ...}}
+
+The first message on a connection registers the client's strategy:
+
+    {"id": 0, "method": "register", "args": (name,),
+     "kwargs": {"weight": w, "config": dict | None}}
+
+and is answered with {"name": unique client name, "config": dict | None},
+the config last registered under `name` if none was given.
+
+Connections are authenticated with a random key the gateway generates at
+startup and writes to a file only its owner can read, since anyone holding
+it can send pickles the other side will load.
+"""
+
+import os
+import secrets
+import socket
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Optional
+
+from ..file_utils import safe_open_file
+from ..kalshi.errors import HttpError
+from ..params import GATEWAY_AUTHKEY
+
+DEFAULT_ADDRESS = ("127.0.0.1", 6010)
+DEFAULT_AUTHKEY_PATH = GATEWAY_AUTHKEY
+
+# Market data, shared by every client. Identical concurrent calls are
+# deduplicated into one exchange request.
+MARKET_DATA_METHODS = frozenset(
+    [
+        "get_exchange_status",
+        "get_markets",
+        "get_market",
+        "get_market_metadata",
+        "get_event",
+        "get_event_metadata",
+        "get_series",
+        "get_series_metadata",
+        "get_market_history",
+        "get_orderbook",
+        "get_trades",
+    ]
+)
+
+# Portfolio reads and order entry, always sent as requested
+PORTFOLIO_METHODS = frozenset(
+    [
+        "get_balance",
+        "get_fills",
+        "get_orders",
+        "get_order",
+        "get_positions",
+        "get_portfolio_settlements",
+        "create_order",
+        "batch_create_orders",
+        "decrease_order",
+        "cancel_order",
+        "batch_cancel_orders",
+    ]
+)
+
+# Answered by the gateway itself
+CONTROL_METHODS = frozenset(["register", "stats"])
+
+ALLOWED_METHODS = MARKET_DATA_METHODS | PORTFOLIO_METHODS
+
+
+class GatewayError(Exception):
+    """An error raised by the gateway, or one it could not map back."""
+
+    def __init__(self, type: str, message: str):
+        super().__init__(message)
+        self.type = type
+        self.message = message
+
+    def __str__(self) -> str:
+        return "GatewayError(%s: %s)" % (self.type, self.message)
+
+
+def write_authkey(path: Path | str = DEFAULT_AUTHKEY_PATH) -> bytes:
+    """Generates a new random authkey and writes it to `path`, owner-only."""
+    authkey = secrets.token_bytes(32)
+    fd = os.open(
+        safe_open_file(Path(path)), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+    )
+    with os.fdopen(fd, "wb") as f:
+        # The mode above only applies when the file is created
+        os.fchmod(f.fileno(), 0o600)
+        f.write(authkey)
+    return authkey
+
+
+def read_authkey(path: Path | str = DEFAULT_AUTHKEY_PATH) -> bytes:
+    return Path(path).read_bytes()
+
+
+def request(id: int, method: str, args: tuple = (), kwargs: Optional[dict] = None):
+    return {"id": id, "method": method, "args": tuple(args), "kwargs": kwargs or {}}
+
+
+def result(id: int, value: Any) -> dict:
+    return {"id": id, "result": value}
+
+
+def error(id: int, e: BaseException) -> dict:
+    payload = {"type": type(e).__name__, "message": str(e)}
+    if isinstance(e, HttpError):
+        payload.update(reason=e.reason, status=e.status, retry_after=e.retry_after)
+    return {"id": id, "error": payload}
+
+
+def raise_error(payload: dict) -> None:
+    """Re-raises an error response on the client side."""
+    if "status" in payload:
+        raise HttpError(payload["reason"], payload["status"], payload["retry_after"])
+    raise GatewayError(payload["type"], payload["message"])
+
+
+def shutdown(conn: Connection) -> None:
+    """
+    Closes a connection so a thread blocked in `recv()` on it wakes up with
+    EOFError, which closing alone does not do.
+    """
+    try:
+        with socket.socket(fileno=os.dup(conn.fileno())) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    conn.close()
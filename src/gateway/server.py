@@ -0,0 +1,322 @@
+"""
+A local gateway that lets several strategy processes share one
+authenticated `ExchangeClient`.
+"""
+
+import threading
+from collections import deque
+from itertools import count
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Connection, Listener
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from ..kalshi.api_client import ExchangeClient
+from ..kalshi.coalesce import RequestCoalescer
+from . import protocol
+
+
+class ClientState:
+    """A connected client: its queue of pending requests and counters."""
+
+    def __init__(self, name: str, conn: Connection, weight: int = 1):
+        self.name = name
+        self.conn = conn
+        self.weight = max(1, weight)
+        self.send_lock = threading.Lock()
+        self.pending: deque = deque()
+        self.credit = self.weight
+        self.active = False
+        self.connected = True
+        self.num_requests = 0
+        self.num_served = 0
+        self.num_errors = 0
+
+    def send(self, message: dict) -> None:
+        with self.send_lock:
+            if self.connected:
+                try:
+                    self.conn.send(message)
+                except (OSError, EOFError, BrokenPipeError):
+                    self.connected = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "weight": self.weight,
+            "queued": len(self.pending),
+            "requests": self.num_requests,
+            "served": self.num_served,
+            "errors": self.num_errors,
+        }
+
+
+class FairScheduler:
+    """
+    Hands queued requests to workers round robin across clients.
+
+    Each client is served up to `weight` requests per turn, so when the
+    rate limit is the bottleneck, a client flooding the gateway only delays
+    itself and every client gets a share of the budget proportional to its
+    weight.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.ready: deque[ClientState] = deque()
+        self.stopped = False
+
+    def put(self, client: ClientState, job: dict) -> None:
+        with self.condition:
+            client.pending.append(job)
+            if not client.active:
+                client.active = True
+                self.ready.append(client)
+            self.condition.notify()
+
+    def get(self) -> Optional[tuple[ClientState, dict]]:
+        """Blocks until a request is ready. Returns None once stopped."""
+        with self.condition:
+            while not self.ready and not self.stopped:
+                self.condition.wait()
+            if self.stopped:
+                return None
+            client = self.ready.popleft()
+            job = client.pending.popleft()
+            client.credit -= 1
+            if not client.pending:
+                client.active = False
+                client.credit = client.weight
+            elif client.credit > 0:
+                self.ready.appendleft(client)
+            else:
+                client.credit = client.weight
+                self.ready.append(client)
+            return client, job
+
+    def remove(self, client: ClientState) -> None:
+        with self.condition:
+            client.pending.clear()
+            if client.active:
+                client.active = False
+                self.ready.remove(client)
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+
+class GatewayServer:
+    """
+    Owns the `ExchangeClient`, and with it the rate limit budget, caches and
+    signing key, and serves its whitelisted endpoint methods to clients
+    connecting over a local socket (see `GatewayClient`).
+
+    Requests from all clients are queued per client and executed by
+    `workers` threads picked round robin by a `FairScheduler`. Identical
+    market data requests in flight at the same time, from any clients, are
+    sent to the exchange once and share the response.
+
+    Parameters
+    ----------
+    client : ExchangeClient
+        The client every request is sent through.
+    address : tuple | str
+        Where to listen: a (host, port) pair, port 0 for any free port, or a
+        unix socket path.
+    authkey : Optional[bytes]
+        Shared secret clients must present. None generates a random one and
+        writes it to `authkey_path` for clients to read.
+    authkey_path : Path | str
+        Where a generated authkey is written, readable only by its owner.
+    workers : int
+        Requests executed concurrently.
+    coalescer : Optional[RequestCoalescer]
+        Deduplicates market data requests across clients.
+    """
+
+    def __init__(
+        self,
+        client: ExchangeClient,
+        address: tuple | str = protocol.DEFAULT_ADDRESS,
+        authkey: Optional[bytes] = None,
+        authkey_path: Path | str = protocol.DEFAULT_AUTHKEY_PATH,
+        workers: int = 8,
+        coalescer: Optional[RequestCoalescer] = None,
+    ):
+        self.client = client
+        if authkey is None:
+            authkey = protocol.write_authkey(authkey_path)
+        self.listener = Listener(address, authkey=authkey)
+        self.coalescer = coalescer if coalescer is not None else RequestCoalescer()
+        self.scheduler = FairScheduler()
+        self.lock = threading.RLock()
+        self.clients: dict[str, ClientState] = {}
+        self.client_ids = count(1)
+        self.closed = False
+
+        # Strategy name -> {"weight", "config"}, kept across restarts
+        self.registrations: dict[str, dict] = {}
+        # Set by `Checkpointer.register` to log changes between snapshots
+        self.journal: Optional[Callable[[str, tuple], None]] = None
+
+        self.workers = [
+            threading.Thread(target=self._work, name=f"gateway-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    @property
+    def address(self) -> tuple | str:
+        return self.listener.address
+
+    def serve_forever(self) -> None:
+        """Accepts clients until `close()` is called."""
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                # A client with the wrong authkey, keep serving the rest
+                continue
+            except OSError:
+                if self.closed:
+                    return
+                continue
+            threading.Thread(
+                target=self._serve_client, args=(conn,), daemon=True
+            ).start()
+
+    def start(self) -> threading.Thread:
+        """Runs `serve_forever` on a background thread."""
+        thread = threading.Thread(
+            target=self.serve_forever, name="gateway-accept", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _register(self, conn: Connection, message: dict) -> ClientState:
+        with self.lock:
+            name = f"client-{next(self.client_ids)}"
+            weight = 1
+            if message.get("method") == "register":
+                strategy = message["args"][0] if message.get("args") else "client"
+                kwargs = message.get("kwargs", {})
+                registration = self.registrations.get(strategy, {})
+                registration = {
+                    "weight": int(kwargs.get("weight", 1)),
+                    "config": kwargs.get("config") or registration.get("config"),
+                }
+                self.registrations[strategy] = registration
+                if self.journal is not None:
+                    self.journal("register", (strategy, registration))
+                name = f"{strategy}-{name}"
+                weight = registration["weight"]
+            state = self.clients[name] = ClientState(name, conn, weight)
+        return state
+
+    def state_dict(self) -> dict[str, Any]:
+        with self.lock:
+            return {"registrations": dict(self.registrations)}
+
+    def load_state_dict(self, state: dict[str, Any]) -> None:
+        with self.lock:
+            self.registrations.update(state["registrations"])
+
+    def replay(self, op: str, args: tuple) -> None:
+        if op == "register":
+            with self.lock:
+                self.registrations[args[0]] = args[1]
+
+    def _serve_client(self, conn: Connection) -> None:
+        state = None
+        try:
+            message = conn.recv()
+            state = self._register(conn, message)
+            if message.get("method") == "register":
+                strategy = message["args"][0] if message.get("args") else "client"
+                config = self.registrations[strategy]["config"]
+                state.send(
+                    protocol.result(
+                        message["id"], {"name": state.name, "config": config}
+                    )
+                )
+            else:
+                self._dispatch(state, message)
+            while not self.closed:
+                self._dispatch(state, conn.recv())
+        except (EOFError, OSError):
+            pass
+        finally:
+            if state is not None:
+                state.connected = False
+                self.scheduler.remove(state)
+                with self.lock:
+                    self.clients.pop(state.name, None)
+            conn.close()
+
+    def _dispatch(self, state: ClientState, message: dict) -> None:
+        method = message.get("method")
+        state.num_requests += 1
+        if method == "stats":
+            state.send(protocol.result(message["id"], self.stats()))
+        elif method in protocol.ALLOWED_METHODS:
+            self.scheduler.put(state, message)
+        else:
+            state.num_errors += 1
+            state.send(
+                protocol.error(
+                    message.get("id", -1),
+                    protocol.GatewayError("NotAllowed", f"Unknown method {method}"),
+                )
+            )
+
+    def execute(self, method: str, args: tuple, kwargs: dict) -> Any:
+        fn = getattr(self.client, method)
+        if method in protocol.MARKET_DATA_METHODS:
+            key = (method, repr(args), repr(sorted(kwargs.items())))
+            return self.coalescer.run(key, lambda: fn(*args, **kwargs))
+        return fn(*args, **kwargs)
+
+    def _work(self) -> None:
+        while True:
+            item = self.scheduler.get()
+            if item is None:
+                return
+            state, message = item
+            if not state.connected:
+                continue
+            try:
+                value = self.execute(
+                    message["method"], message["args"], message["kwargs"]
+                )
+                response = protocol.result(message["id"], value)
+                state.num_served += 1
+            except Exception as e:
+                response = protocol.error(message["id"], e)
+                state.num_errors += 1
+            state.send(response)
+
+    def stats(self) -> dict[str, Any]:
+        with self.lock:
+            clients = list(self.clients.values())
+        return {
+            "clients": {client.name: client.stats() for client in clients},
+            "deduplicated": self.coalescer.stats(),
+        }
+
+    def close(self) -> None:
+        self.closed = True
+        self.scheduler.stop()
+        self.listener.close()
+        with self.lock:
+            clients = list(self.clients.values())
+        for client in clients:
+            client.connected = False
+            protocol.shutdown(client.conn)
+
+    def __enter__(self) -> "GatewayServer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,209 @@
+"""
+An in-memory stand-in for the Kalshi trade API, for running the gateway and
+its clients entirely on localhost.
+"""
+
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+def _strikes(ticker: str) -> dict:
+    # "B70.5" is the bracket [70, 71], as in the temperature series
+    strike = ticker.rsplit("-", 1)[-1]
+    if not strike.startswith("B"):
+        return {}
+    try:
+        floor = int(float(strike[1:]))
+    except ValueError:
+        return {}
+    return {"strike_type": "between", "floor_strike": floor, "cap_strike": floor + 1}
+
+
+class StubExchange(ThreadingHTTPServer):
+    """
+    Serves a handful of markets with fixed orderbooks, and accepts, lists
+    and cancels orders, singly or batched. As on Kalshi, an order reusing a
+    `client_order_id` is rejected with a 409. Signatures are not checked.
+    Every request is counted in `num_requests` by path.
+
+    Parameters
+    ----------
+    address : tuple
+        (host, port) to listen on. Port 0 picks a free port.
+    tickers : list[str]
+        Markets to serve.
+    latency : float
+        Seconds each request is held before answering.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple = ("127.0.0.1", 0),
+        tickers: Optional[list[str]] = None,
+        latency: float = 0.0,
+    ):
+        super().__init__(address, _StubHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        tickers = tickers or [f"STUB-24NOV10-B{70 + i}.5" for i in range(5)]
+        self.markets = {
+            ticker: {
+                "ticker": ticker,
+                "event_ticker": ticker.rsplit("-", 1)[0],
+                # As returned by the API, whose status filter calls it "open"
+                "status": "active",
+                "yes_bid": 40,
+                "yes_ask": 45,
+                "no_bid": 55,
+                "no_ask": 60,
+                "close_time": "2024-11-11T04:59:00Z",
+                **_strikes(ticker),
+            }
+            for ticker in tickers
+        }
+        self.orders: dict[str, dict] = {}
+        self.client_order_ids: set[str] = set()
+        self.num_requests: dict[str, int] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def route(self, method: str, path: str, query: dict, body: Any) -> tuple:
+        """Returns (status, payload) for a request."""
+        with self.lock:
+            self.num_requests[path] = self.num_requests.get(path, 0) + 1
+        parts = [part for part in path.split("/") if part]
+        if parts[:2] == ["trade-api", "v2"]:
+            parts = parts[2:]
+
+        if parts == ["exchange", "status"]:
+            return 200, {"exchange_active": True, "trading_active": True}
+        if parts == ["markets"]:
+            return 200, {"markets": list(self.markets.values()), "cursor": ""}
+        if len(parts) >= 2 and parts[0] == "markets":
+            market = self.markets.get(parts[1])
+            if market is None:
+                return 404, {"error": {"message": "market not found"}}
+            if len(parts) == 2:
+                return 200, {"market": market}
+            if parts[2] == "orderbook":
+                return 200, {"orderbook": {"yes": [[40, 100]], "no": [[55, 100]]}}
+        if parts[:1] == ["portfolio"]:
+            return self._portfolio(method, parts[1:], query, body)
+        return 404, {"error": {"message": f"no route for {method} {path}"}}
+
+    def _portfolio(self, method: str, parts: list, query: dict, body: Any) -> tuple:
+        if parts == ["balance"]:
+            return 200, {"balance": 100_000}
+        if parts == ["orders"] and method == "GET":
+            statuses = query.get("status")
+            with self.lock:
+                orders = [
+                    order
+                    for order in self.orders.values()
+                    if statuses is None or order["status"] in statuses
+                ]
+            return 200, {"orders": orders, "cursor": ""}
+        if parts == ["orders"] and method == "POST":
+            return self._create_order(body)
+        if parts == ["orders", "batched"] and method == "POST":
+            responses = []
+            for order in body.get("orders", []):
+                status, payload = self._create_order(order)
+                if status != 201:
+                    payload = {"order": None, **payload}
+                responses.append(
+                    {"client_order_id": order.get("client_order_id"), **payload}
+                )
+            return 201, {"orders": responses}
+        if parts == ["orders", "batched"] and method == "DELETE":
+            responses = []
+            for order_id in body.get("ids", []):
+                status, payload = self._cancel_order(order_id)
+                responses.append({"order_id": order_id, **payload})
+            return 200, {"orders": responses}
+        if len(parts) == 2 and parts[0] == "orders" and method == "GET":
+            with self.lock:
+                order = self.orders.get(parts[1])
+            if order is None:
+                return 404, {"error": {"message": "order not found"}}
+            return 200, {"order": order}
+        if (
+            len(parts) == 3
+            and parts[::2] == ["orders", "cancel"]
+            and method == "DELETE"
+        ):
+            return self._cancel_order(parts[1])
+        return 404, {"error": {"message": "no such portfolio route"}}
+
+    def _create_order(self, body: dict) -> tuple:
+        if body.get("ticker") not in self.markets:
+            return 400, {"error": {"message": "unknown ticker"}}
+        order = {
+            "order_id": str(uuid.uuid4()),
+            "status": "resting",
+            "remaining_count": body.get("count", 0),
+            **body,
+        }
+        client_order_id = body.get("client_order_id")
+        with self.lock:
+            if client_order_id is not None:
+                if client_order_id in self.client_order_ids:
+                    return 409, {
+                        "error": {
+                            "code": "order_already_exists",
+                            "message": "duplicate client_order_id",
+                        }
+                    }
+                self.client_order_ids.add(client_order_id)
+            self.orders[order["order_id"]] = order
+        return 201, {"order": order}
+
+    def _cancel_order(self, order_id: str) -> tuple:
+        with self.lock:
+            order = self.orders.pop(order_id, None)
+        if order is None:
+            return 404, {"error": {"message": "order not found"}}
+        reduced_by = order["remaining_count"]
+        order = {**order, "status": "canceled", "remaining_count": 0}
+        return 200, {"order": order, "reduced_by": reduced_by}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: StubExchange
+
+    def _respond(self) -> None:
+        if self.server.latency:
+            threading.Event().wait(self.server.latency)
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        status, payload = self.server.route(
+            self.command, url.path, parse_qs(url.query), body
+        )
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
@@ -1,19 +1,20 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from datetime import datetime as dt
-from urllib3.exceptions import HTTPError
-from dateutil import parser
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
-from datetime import timedelta
 
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
-from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import rsa
 import time
-import base64
+
+from .errors import HttpError, parse_retry_after
+from .rate_limiter import RateLimiter
+from .pagination import paginate
+from .signing import RequestSigner
+from .cache import MetadataCache
+from .coalesce import RequestCoalescer
+from .retry import RetryPolicy
+from .metrics import ClientMetrics
 
 
 class KalshiClient:
@@ -25,69 +26,229 @@ class KalshiClient:
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         user_id: Optional[str] = None,
+        pool_size: int = 10,
+        timeout: float | Tuple[float, float] = (3.05, 10),
+        rate_limiter: Optional[RateLimiter] = None,
+        signer: Optional[RequestSigner] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        coalescer: Optional[RequestCoalescer | bool] = True,
+        retry_policy: Optional[RetryPolicy | bool] = True,
+        metrics: Optional[ClientMetrics] = None,
+        session: Optional[requests.Session] = None,
     ):
         """Initializes the client and logs in the specified user.
         Raises an HttpError if the user could not be authenticated.
+
+        All requests go through a single keep-alive session, so connections
+        to the host are reused across endpoints and threads. `pool_size` is
+        the number of connections kept open to the host and `timeout` is the
+        (connect, read) timeout in seconds passed to every request.
+
+        `rate_limiter` may be shared between clients (and threads) that draw on
+        the same API budget. Defaults to the basic tier read/write limits.
+
+        `signer` signs each request. Pass a `RequestSigner` with workers to
+        sign off the calling thread; by default signing runs inline.
+
+        `metadata_cache` answers repeated market/event/series lookups
+        without a request. See `MetadataCache` for how entries expire. Plain
+        `get_market`, `get_event` and `get_series` responses include prices,
+        so they are only reused for the cache's `volatile_ttl` (2s by
+        default) and are cold after a restart. The `*_metadata` methods
+        return the static part, which lives until the market closes and
+        survives restarts when the cache has a `path`.
+
+        `coalescer` merges concurrent identical GETs into one request. By
+        default the client gets its own coalescer that only shares requests
+        in flight at the same time; pass a `RequestCoalescer(freshness=...)`
+        to also reuse results that just completed, or None to disable it.
+
+        `retry_policy` retries throttled, failed and dropped requests with
+        backoff and trips a per-endpoint circuit breaker. By default each
+        client gets its own `RetryPolicy()`, so a failing host does not open
+        the circuits of clients talking to another. Pass one policy to
+        clients of the same host to share breakers, or None to disable
+        retries.
+
+        `metrics` records per-endpoint latency, signing, rate-limit wait,
+        decode time, response size, errors, and the retry policy's retries,
+        backoff time and refused requests. Pass `NullMetrics()` to turn
+        instrumentation off.
+
+        `session` replaces the pooled session, e.g. with a
+        `RecordingSession` or `ReplaySession` from `src.recording`.
         """
 
         self.host = host
         self.key_id = key_id
         self.private_key = private_key
+        self.signer = signer if signer is not None else RequestSigner(private_key)
         self.user_id = user_id
-        self.last_api_call = datetime.now()
+        self.metadata_cache = metadata_cache
+        self.coalescer: Optional[RequestCoalescer] = (
+            RequestCoalescer() if coalescer is True else coalescer or None
+        )
+        self.retry_policy: Optional[RetryPolicy] = (
+            RetryPolicy() if retry_policy is True else retry_policy or None
+        )
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session = session if session is not None else self.make_session(pool_size)
+
+    @staticmethod
+    def make_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """Closes the pooled connections held by the client."""
+        self.session.close()
 
     """Built in rate-limiter. We STRONGLY encourage you to keep 
     some sort of rate limiting, just in case there is a bug in your 
     code. Feel free to adjust the threshold"""
 
-    def rate_limit(self) -> None:
-        # Adjust time between each api call
-        THRESHOLD_IN_MILLISECONDS = 100
-
-        now = datetime.now()
-        threshold_in_microseconds = 1000 * THRESHOLD_IN_MILLISECONDS
-        threshold_in_seconds = THRESHOLD_IN_MILLISECONDS / 1000
-        if now - self.last_api_call < timedelta(microseconds=threshold_in_microseconds):
-            time.sleep(threshold_in_seconds)
-        self.last_api_call = datetime.now()
+    def rate_limit(self, method: str = "GET") -> float:
+        # Reads and writes draw from separate token buckets.
+        # Returns the number of seconds this call waited.
+        return self.rate_limiter.acquire(method)
 
     def post(self, path: str, body: dict) -> Any:
         """POSTs to an authenticated Kalshi HTTP endpoint.
         Returns the response body. Raises an HttpError on non-2XX results.
         """
-        self.rate_limit()
-
-        response = requests.post(
-            self.host + path, data=body, headers=self.request_headers("POST", path)
-        )
-        self.raise_if_bad_response(response)
-        return response.json()
+        return self.request("POST", path, body=body)
 
-    def get(self, path: str, params: Dict[str, Any] = {}) -> Any:
+    def get(
+        self, path: str, params: Dict[str, Any] = {}, static_only: bool = False
+    ) -> Any:
         """GETs from an authenticated Kalshi HTTP endpoint.
+        Returns the response body. Raises an HttpError on non-2XX results.
+        `static_only` lets the metadata cache answer with a response whose
+        prices are stale, stripped of the volatile market fields."""
+        return self.request("GET", path, params=params, static_only=static_only)
+
+    def delete(
+        self, path: str, params: Dict[str, Any] = {}, body: Optional[Any] = None
+    ) -> Any:
+        """Sends a DELETE to an authenticated Kalshi HTTP endpoint.
+        Returns the response body. Raises an HttpError on non-2XX results."""
+        return self.request("DELETE", path, params=params, body=body)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = {},
+        body: Optional[Any] = None,
+        static_only: bool = False,
+    ) -> Any:
+        """Sends a signed request over the client's pooled session.
         Returns the response body. Raises an HttpError on non-2XX results."""
-        self.rate_limit()
+        cached = self.cached_response(method, path, params, static_only)
+        if cached is not None:
+            return cached
+
+        if method == "GET" and self.coalescer is not None:
+            return self.coalescer.run(
+                self.coalescer.key(path, params),
+                lambda: self.send_with_retries(method, path, params, body),
+            )
+        return self.send_with_retries(method, path, params, body)
 
-        response = requests.get(
-            self.host + path, headers=self.request_headers("GET", path), params=params
+    def send_with_retries(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = {},
+        body: Optional[Any] = None,
+    ) -> Any:
+        if self.retry_policy is None:
+            return self.send(method, path, params, body)
+        return self.retry_policy.call(
+            method,
+            path,
+            body,
+            lambda: self.send(method, path, params, body),
+            metrics=self.metrics,
         )
-        self.raise_if_bad_response(response)
-        return response.json()
 
-    def delete(self, path: str, params: Dict[str, Any] = {}) -> Any:
-        """Posts from an authenticated Kalshi HTTP endpoint.
-        Returns the response body. Raises an HttpError on non-2XX results."""
-        self.rate_limit()
+    def send(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = {},
+        body: Optional[Any] = None,
+    ) -> Any:
+        timed = self.metrics.enabled
+        rate_limit_wait = self.rate_limit(method)
+
+        sign_start = time.perf_counter() if timed else 0.0
+        headers = self.request_headers(method, path)
+        sent = time.perf_counter() if timed else 0.0
+        try:
+            response = self.session.request(
+                method,
+                self.host + path,
+                headers=headers,
+                params=params,
+                data=body,
+                timeout=self.timeout,
+            )
+            self.raise_if_bad_response(response)
+        except Exception as e:
+            self.metrics.record_error(method, path, e)
+            raise
+        received = time.perf_counter() if timed else 0.0
+        result = response.json()
+
+        if timed:
+            self.metrics.record(
+                method,
+                path,
+                latency=received - sent,
+                sign_time=sent - sign_start,
+                rate_limit_wait=rate_limit_wait,
+                decode_time=time.perf_counter() - received,
+                response_bytes=len(response.content),
+            )
+        self.cache_response(method, path, params, result)
+        return result
 
-        response = requests.delete(
-            self.host + path,
-            headers=self.request_headers("DELETE", path),
-            params=params,
+    def uses_metadata_cache(
+        self, method: str, path: str, params: Dict[str, Any]
+    ) -> bool:
+        return (
+            self.metadata_cache is not None
+            and method == "GET"
+            and not params
+            and self.metadata_cache.is_cacheable(path)
         )
-        self.raise_if_bad_response(response)
-        return response.json()
+
+    def cached_response(
+        self, method: str, path: str, params: Dict[str, Any], static_only: bool
+    ) -> Any:
+        if not self.uses_metadata_cache(method, path, params):
+            return None
+        return self.metadata_cache.get(path, static_only=static_only)  # type: ignore[union-attr]
+
+    def cache_response(
+        self, method: str, path: str, params: Dict[str, Any], result: Any
+    ) -> None:
+        if self.uses_metadata_cache(method, path, params):
+            self.metadata_cache.put(path, result)  # type: ignore[union-attr]
 
     def request_headers(self, method: str, path: str) -> Dict[str, Any]:
+        timestampt_str, msg_string = self.signing_message(method, path)
+        signature = self.sign_pss_text(msg_string)
+        return self.signed_headers(timestampt_str, signature)
+
+    def signing_message(self, method: str, path: str) -> Tuple[str, str]:
         # Get the current time
         current_time = datetime.now()
 
@@ -102,8 +263,9 @@ class KalshiClient:
         path_parts = path.split("?")
 
         msg_string = timestampt_str + method + "/trade-api/v2" + path_parts[0]
-        signature = self.sign_pss_text(msg_string)
+        return timestampt_str, msg_string
 
+    def signed_headers(self, timestampt_str: str, signature: str) -> Dict[str, Any]:
         headers = {"Content-Type": "application/json"}
 
         headers["KALSHI-ACCESS-KEY"] = self.key_id
@@ -112,29 +274,19 @@ class KalshiClient:
         return headers
 
     def sign_pss_text(self, text: str) -> str:
-        # Before signing, we need to hash our message.
-        # The hash is what we actually sign.
-        # Convert the text to bytes
-        message = text.encode("utf-8")
-        try:
-            signature = self.private_key.sign(
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.DIGEST_LENGTH,
-                ),
-                hashes.SHA256(),
-            )
-            return base64.b64encode(signature).decode("utf-8")
-        except InvalidSignature as e:
-            raise ValueError("RSA sign PSS failed") from e
+        return self.signer.sign(text)
 
     def raise_if_bad_response(self, response: requests.Response) -> None:
         if response.status_code not in range(200, 299):
-            raise HttpError(response.reason, response.status_code)
+            raise HttpError(
+                response.reason,
+                response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
 
     def query_generation(self, params: dict) -> str:
-        relevant_params = {k: v for k, v in params.items() if v != None}
+        # Endpoints pass their locals(), which includes self
+        relevant_params = {k: v for k, v in params.items() if v != None and k != "self"}
         if len(relevant_params):
             query = (
                 "?"
@@ -147,26 +299,19 @@ class KalshiClient:
         return query
 
 
-class HttpError(Exception):
-    """Represents an HTTP error with reason and status code."""
-
-    def __init__(self, reason: str, status: int):
-        super().__init__(reason)
-        self.reason = reason
-        self.status = status
-
-    def __str__(self) -> str:
-        return "HttpError(%d %s)" % (self.status, self.reason)
-
-
 class ExchangeClient(KalshiClient):
     def __init__(
-        self, exchange_api_base: str, key_id: str, private_key: rsa.RSAPrivateKey
+        self,
+        exchange_api_base: str,
+        key_id: str,
+        private_key: rsa.RSAPrivateKey,
+        **client_kwargs: Any,
     ):
         super().__init__(
             exchange_api_base,
             key_id,
             private_key,
+            **client_kwargs,
         )
         self.key_id = key_id
         self.private_key = private_key
@@ -213,6 +358,11 @@ class ExchangeClient(KalshiClient):
         dictr = self.get(market_url)
         return dictr
 
+    def get_market_metadata(self, ticker: str):
+        # Like get_market, but without prices. Served from the metadata
+        # cache until the market closes.
+        return self.get(self.get_market_url(ticker=ticker), static_only=True)
+
     def get_event(self, event_ticker: str):
         dictr = self.get(self.events_url + "/" + event_ticker)
         return dictr
@@ -221,6 +371,12 @@ class ExchangeClient(KalshiClient):
         dictr = self.get(self.series_url + "/" + series_ticker)
         return dictr
 
+    def get_event_metadata(self, event_ticker: str):
+        return self.get(self.events_url + "/" + event_ticker, static_only=True)
+
+    def get_series_metadata(self, series_ticker: str):
+        return self.get(self.series_url + "/" + series_ticker, static_only=True)
+
     def get_market_history(
         self,
         ticker: str,
@@ -292,8 +448,6 @@ class ExchangeClient(KalshiClient):
         relevant_params = {
             k: v for k, v in locals().items() if k != "self" and v != None
         }
-
-        print(relevant_params)
         order_json = json.dumps(relevant_params)
         orders_url = self.portfolio_url + "/orders"
         result = self.post(path=orders_url, body=order_json)
@@ -347,6 +501,7 @@ class ExchangeClient(KalshiClient):
         event_ticker: Optional[str] = None,
         min_ts: Optional[int] = None,
         max_ts: Optional[int] = None,
+        status: Optional[str] = None,
         limit: Optional[int] = None,
         cursor: Optional[str] = None,
     ):
@@ -383,3 +538,34 @@ class ExchangeClient(KalshiClient):
         query_string = self.query_generation(params={k: v for k, v in locals().items()})
         dictr = self.get(positions_url + query_string)
         return dictr
+
+    # paginated iterators!
+    # These stream records across pages instead of returning a single page.
+    # Each takes `page_size`, `max_records` and `prefetch` (see `paginate`)
+    # plus the filters of the corresponding get_* endpoint.
+
+    def paginate(self, fetch, key: str, **kwargs):
+        return paginate(fetch, key, **kwargs)
+
+    def iter_markets(self, **kwargs):
+        return self.paginate(self.get_markets, "markets", **kwargs)
+
+    def iter_trades(self, **kwargs):
+        return self.paginate(self.get_trades, "trades", **kwargs)
+
+    def iter_market_history(self, ticker: str, **kwargs):
+        return self.paginate(
+            self.get_market_history, "history", ticker=ticker, **kwargs
+        )
+
+    def iter_fills(self, **kwargs):
+        return self.paginate(self.get_fills, "fills", **kwargs)
+
+    def iter_orders(self, **kwargs):
+        return self.paginate(self.get_orders, "orders", **kwargs)
+
+    def iter_positions(self, **kwargs):
+        return self.paginate(self.get_positions, "market_positions", **kwargs)
+
+    def iter_portfolio_settlements(self, **kwargs):
+        return self.paginate(self.get_portfolio_settlements, "settlements", **kwargs)
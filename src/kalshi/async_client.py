@@ -0,0 +1,212 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import aiohttp
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from .api_client import ExchangeClient
+from .errors import HttpError, parse_retry_after
+from .pagination import apaginate
+
+
+class AsyncExchangeClient(ExchangeClient):
+    """
+    An asyncio counterpart to `ExchangeClient`.
+
+    Every endpoint method of `ExchangeClient` is available with the same
+    arguments, but returns an awaitable, and the iter_* methods are async
+    generators. The endpoint methods only build the path and body and hand
+    them to `get`/`post`/`delete`, so overriding `request` is enough to make
+    the whole surface async. Signing builds the same headers as
+    `request_headers`, awaiting the signer's worker pool when it has one.
+
+    The aiohttp session is created on first use inside the running event
+    loop. Close it with `await client.close()` or use the client as an async
+    context manager. A `session=` passed in must be an
+    `aiohttp.ClientSession`, which the client then owns and closes; the
+    `requests` sessions of `ExchangeClient`, such as `RecordingSession`, are
+    refused with a `TypeError`.
+    """
+
+    def __init__(
+        self,
+        exchange_api_base: str,
+        key_id: str,
+        private_key: rsa.RSAPrivateKey,
+        **client_kwargs: Any,
+    ):
+        session = client_kwargs.get("session")
+        if session is not None and not isinstance(session, aiohttp.ClientSession):
+            raise TypeError(
+                "AsyncExchangeClient needs an aiohttp.ClientSession, not %s"
+                % type(session).__name__
+            )
+        super().__init__(exchange_api_base, key_id, private_key, **client_kwargs)
+
+    @staticmethod
+    def make_session(pool_size: int) -> None:  # type: ignore[override]
+        # The aiohttp session must be created inside the event loop
+        return None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            if isinstance(self.timeout, tuple):
+                connect, read = self.timeout
+            else:
+                connect = read = self.timeout
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            )
+        return self.session
+
+    async def request(  # type: ignore[override]
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = {},
+        body: Optional[Any] = None,
+        static_only: bool = False,
+    ) -> Any:
+        """Sends a signed request over the client's aiohttp session.
+        Returns the response body. Raises an HttpError on non-2XX results."""
+        cached = self.cached_response(method, path, params, static_only)
+        if cached is not None:
+            return cached
+
+        if method == "GET" and self.coalescer is not None:
+            return await self.coalescer.run_async(
+                self.coalescer.key(path, params),
+                lambda: self.send_with_retries(method, path, params, body),
+            )
+        return await self.send_with_retries(method, path, params, body)
+
+    async def send_with_retries(  # type: ignore[override]
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = {},
+        body: Optional[Any] = None,
+    ) -> Any:
+        if self.retry_policy is None:
+            return await self.send(method, path, params, body)
+        return await self.retry_policy.call_async(
+            method,
+            path,
+            body,
+            lambda: self.send(method, path, params, body),
+            connection_errors=(aiohttp.ClientError, asyncio.TimeoutError),
+            metrics=self.metrics,
+        )
+
+    async def send(  # type: ignore[override]
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = {},
+        body: Optional[Any] = None,
+    ) -> Any:
+        timed = self.metrics.enabled
+        rate_limit_wait = await self.rate_limiter.acquire_async(method)
+
+        sign_start = time.perf_counter() if timed else 0.0
+        headers = await self.request_headers_async(method, path)
+        sent = time.perf_counter() if timed else 0.0
+        session = self.get_session()
+        try:
+            async with session.request(
+                method,
+                self.host + path,
+                headers=headers,
+                params=params,
+                data=body,
+            ) as response:
+                if response.status not in range(200, 299):
+                    raise HttpError(
+                        response.reason or "",
+                        response.status,
+                        retry_after=parse_retry_after(
+                            response.headers.get("Retry-After")
+                        ),
+                    )
+                content = await response.read()
+        except Exception as e:
+            self.metrics.record_error(method, path, e)
+            raise
+        received = time.perf_counter() if timed else 0.0
+        result = json.loads(content)
+
+        if timed:
+            self.metrics.record(
+                method,
+                path,
+                latency=received - sent,
+                sign_time=sent - sign_start,
+                rate_limit_wait=rate_limit_wait,
+                decode_time=time.perf_counter() - received,
+                response_bytes=len(content),
+            )
+        self.cache_response(method, path, params, result)
+        return result
+
+    async def request_headers_async(self, method: str, path: str) -> Dict[str, Any]:
+        # Signs on the signer's pool (if any) without blocking the event loop
+        timestampt_str, msg_string = self.signing_message(method, path)
+        signature = await self.signer.sign_async(msg_string)
+        return self.signed_headers(timestampt_str, signature)
+
+    async def close(self) -> None:  # type: ignore[override]
+        if self.session is not None:
+            await self.session.close()
+
+    def paginate(self, fetch, key: str, **kwargs):
+        # The iter_* methods become async generators
+        return apaginate(fetch, key, **kwargs)
+
+    async def __aenter__(self) -> "AsyncExchangeClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # Concurrent fan-out helpers
+
+    async def get_orderbooks(
+        self,
+        tickers: Sequence[str],
+        depth: Optional[int] = None,
+        max_in_flight: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        Fetches the orderbooks of `tickers` concurrently with at most
+        `max_in_flight` requests outstanding. Returns a dict from ticker
+        to the `get_orderbook` response.
+        """
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def fetch(ticker: str):
+            async with semaphore:
+                return await self.get_orderbook(ticker, depth=depth)
+
+        orderbooks = await asyncio.gather(*(fetch(ticker) for ticker in tickers))
+        return dict(zip(tickers, orderbooks))
+
+    async def get_series_orderbooks(
+        self,
+        series_ticker: str,
+        depth: Optional[int] = None,
+        max_in_flight: int = 10,
+        status: Optional[str] = "open",
+    ) -> Dict[str, Any]:
+        """Fetches the orderbook of every market in a series concurrently."""
+        tickers = [
+            market["ticker"]
+            async for market in self.iter_markets(
+                series_ticker=series_ticker, status=status
+            )
+        ]
+        return await self.get_orderbooks(
+            tickers, depth=depth, max_in_flight=max_in_flight
+        )
@@ -0,0 +1,274 @@
+"""
+A cache for market, event and series metadata that expires by market state.
+"""
+
+import shelve
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from cachetools import LRUCache  # type: ignore[import-untyped]
+from dateutil import parser
+
+from ..file_utils import safe_open_file
+
+# Market fields that move with trading. Everything else (strikes, bracket
+# bounds, titles, close times, ...) is fixed until the market closes.
+VOLATILE_MARKET_FIELDS = frozenset(
+    [
+        "yes_bid",
+        "yes_ask",
+        "no_bid",
+        "no_ask",
+        "last_price",
+        "previous_yes_bid",
+        "previous_yes_ask",
+        "previous_price",
+        "volume",
+        "volume_24h",
+        "liquidity",
+        "open_interest",
+        "status",
+        "result",
+        "settlement_value",
+        "expiration_value",
+    ]
+)
+
+
+# Collections under /markets that are not a market's metadata
+NON_METADATA_PATHS = frozenset(["trades", "orderbook", "history", "candlesticks"])
+
+
+def _static_market(market: dict) -> dict:
+    return {k: v for k, v in market.items() if k not in VOLATILE_MARKET_FIELDS}
+
+
+def _close_ts(market: dict) -> Optional[float]:
+    close_time = market.get("close_time")
+    if not close_time:
+        return None
+    return parser.isoparse(close_time).timestamp()
+
+
+class CacheEntry:
+    __slots__ = ("response", "static_response", "static_expires", "volatile_expires")
+
+    def __init__(
+        self,
+        response: dict,
+        static_response: dict,
+        static_expires: float,
+        volatile_expires: float,
+    ):
+        self.response = response
+        self.static_response = static_response
+        self.static_expires = static_expires
+        self.volatile_expires = volatile_expires
+
+
+class MetadataCache:
+    """
+    Caches `/markets/{ticker}`, `/events/{event_ticker}` and
+    `/series/{series_ticker}` responses by path.
+
+    Each response is kept twice: in full, which expires `volatile_ttl`
+    seconds after it was fetched, and with the volatile market fields
+    (prices, volume, status, ...) removed, which lives until the market's
+    close time. An event's static part lives until its last market closes
+    and a series' for `static_ttl` seconds.
+
+    Entries live in an in-memory LRU and, when `path` is given, in a shelve
+    file so a restarted process starts warm. Disk entries are dropped once
+    their static part expires, and the file is pruned below `disk_maxsize`
+    entries, soonest to expire first, when it outgrows it. Cached responses
+    are shared between callers and must not be mutated.
+
+    Parameters
+    ----------
+    maxsize : int
+        Number of responses kept in memory.
+    volatile_ttl : float
+        Seconds a full response (including prices) stays fresh.
+    static_ttl : float
+        Seconds static data lives when it has no close time.
+    path : Optional[Path | str]
+        Location of the on-disk store. None keeps the cache in memory only.
+    disk_maxsize : int
+        Number of responses kept on disk.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        volatile_ttl: float = 2.0,
+        static_ttl: float = 24 * 3600,
+        path: Optional[Path | str] = None,
+        disk_maxsize: int = 65536,
+    ):
+        self.memory: LRUCache = LRUCache(maxsize=maxsize)
+        self.volatile_ttl = volatile_ttl
+        self.static_ttl = static_ttl
+        self.lock = threading.RLock()
+        self.disk = shelve.open(str(safe_open_file(path))) if path is not None else None
+        self.disk_maxsize = disk_maxsize
+        self.disk_size = 0
+        if self.disk is not None:
+            self._prune_disk(time.time())
+        # Set by `Checkpointer.register` to log changes between snapshots
+        self.journal: Optional[Callable[[str, tuple], None]] = None
+
+        self.hits = 0
+        self.static_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_cacheable(path: str) -> bool:
+        # Only /markets/{ticker}, /events/{ticker} and /series/{ticker},
+        # which take no query
+        if "?" in path:
+            return False
+        parts = path.strip("/").split("/")
+        return (
+            len(parts) == 2
+            and parts[0] in ("markets", "events", "series")
+            and parts[1] not in NON_METADATA_PATHS
+        )
+
+    def _prune_disk(self, now: float) -> None:
+        # Drops expired disk entries, then the soonest to expire down to 90%
+        # of the bound, so a full store is not rescanned on every put
+        assert self.disk is not None
+        expires = {}
+        for key in list(self.disk.keys()):
+            entry = self.disk[key]
+            if entry.static_expires <= now:
+                del self.disk[key]
+            else:
+                expires[key] = entry.static_expires
+        if len(expires) > self.disk_maxsize:
+            keep = int(0.9 * self.disk_maxsize)
+            for key in sorted(expires, key=expires.__getitem__)[: len(expires) - keep]:
+                del expires[key]
+                del self.disk[key]
+        self.disk_size = len(expires)
+
+    def get(self, path: str, static_only: bool = False) -> Optional[dict]:
+        """
+        Returns the cached response for `path`, or None on a miss. With
+        `static_only` an entry whose prices are stale still hits and the
+        response is returned without the volatile market fields.
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(path)
+            if entry is None and self.disk is not None and path in self.disk:
+                entry = self.disk[path]
+                if now < entry.static_expires:
+                    self.memory[path] = entry
+                    self.disk_hits += 1
+                else:
+                    del self.disk[path]
+                    self.disk_size -= 1
+                    entry = None
+
+            if entry is not None and not static_only and now < entry.volatile_expires:
+                self.hits += 1
+                return entry.response
+            if entry is not None and static_only and now < entry.static_expires:
+                self.static_hits += 1
+                return entry.static_response
+            self.misses += 1
+            return None
+
+    def put(self, path: str, response: dict) -> None:
+        now = time.time()
+        static_response = dict(response)
+        close_ts: Optional[float] = None
+        if "market" in response:
+            static_response["market"] = _static_market(response["market"])
+            close_ts = _close_ts(response["market"])
+        if "markets" in response:
+            static_response["markets"] = [
+                _static_market(market) for market in response["markets"]
+            ]
+            close_times = [_close_ts(market) for market in response["markets"]]
+            close_times = [ts for ts in close_times if ts is not None]
+            close_ts = max(close_times) if close_times else None
+
+        entry = CacheEntry(
+            response=response,
+            static_response=static_response,
+            static_expires=close_ts if close_ts is not None else now + self.static_ttl,
+            volatile_expires=now + self.volatile_ttl,
+        )
+        with self.lock:
+            self.memory[path] = entry
+            if self.disk is not None:
+                self.disk_size += path not in self.disk
+                self.disk[path] = entry
+                if self.disk_size > self.disk_maxsize:
+                    self._prune_disk(now)
+            if self.journal is not None:
+                self.journal("put", (path, static_response, entry.static_expires))
+
+    def invalidate(self, path: str) -> None:
+        with self.lock:
+            self.memory.pop(path, None)
+            if self.disk is not None and path in self.disk:
+                del self.disk[path]
+                self.disk_size -= 1
+            if self.journal is not None:
+                self.journal("invalidate", (path,))
+
+    # Checkpointing. Only static parts are kept, prices are stale by the
+    # time a checkpoint is restored.
+
+    def _put_static(self, path: str, static_response: dict, static_expires: float):
+        self.memory[path] = CacheEntry(
+            response=static_response,
+            static_response=static_response,
+            static_expires=static_expires,
+            volatile_expires=0.0,
+        )
+
+    def state_dict(self) -> dict[str, Any]:
+        now = time.time()
+        with self.lock:
+            return {
+                "entries": [
+                    (path, entry.static_response, entry.static_expires)
+                    for path, entry in self.memory.items()
+                    if entry.static_expires > now
+                ]
+            }
+
+    def load_state_dict(self, state: dict[str, Any]) -> None:
+        with self.lock:
+            for path, static_response, static_expires in state["entries"]:
+                self._put_static(path, static_response, static_expires)
+
+    def replay(self, op: str, args: tuple) -> None:
+        with self.lock:
+            if op == "put":
+                self._put_static(*args)
+            elif op == "invalidate":
+                self.memory.pop(args[0], None)
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "static_hits": self.static_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self.memory),
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            if self.disk is not None:
+                self.disk.close()
+                self.disk = None
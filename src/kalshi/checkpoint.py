@@ -0,0 +1,246 @@
+"""
+Checkpointing client-side state to disk for fast restarts.
+
+A checkpoint directory holds one snapshot and a write-ahead log (WAL):
+
+    snapshot.bin      zlib-compressed pickle of every component's state
+    wal-<n>.log       changes made since, as length and crc32 framed pickles
+
+Components are objects with `state_dict()`, `load_state_dict(state)`,
+`replay(op, args)`, a `journal` attribute and a reentrant `lock`, e.g.
+`MetadataCache`, `PortfolioLedger` and `GatewayServer`. While registered, a
+component calls `journal(op, args)` under its lock for every change, and
+`replay` redoes that change on restore.
+"""
+
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from ..file_utils import pathlike, safe_open_dir
+
+SNAPSHOT = "snapshot.bin"
+WAL_PREFIX = "wal-"
+
+# Length and crc32 of each WAL record
+_HEADER = struct.Struct("<II")
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.stem[len(WAL_PREFIX) :])
+
+
+def read_wal(path: Path, truncate: bool = False) -> Iterator[tuple]:
+    """
+    Yields the records of a WAL segment, stopping at a torn write or a
+    record failing its crc. With `truncate` the segment is cut back to the
+    last good record, so nothing is ever appended after a bad one.
+    """
+    with open(path, "r+b" if truncate else "rb") as f:
+        while True:
+            good = f.tell()
+            header = f.read(_HEADER.size)
+            if len(header) == 0:
+                return
+            if len(header) == _HEADER.size:
+                length, crc = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) == length and zlib.crc32(payload) == crc:
+                    yield pickle.loads(payload)
+                    continue
+            if truncate:
+                f.truncate(good)
+            return
+
+
+class Checkpointer:
+    """
+    Snapshots registered components every `interval` seconds and logs
+    their changes in between, so `restore()` can rebuild their state after
+    a restart without touching the network.
+
+    Each component's WAL records are numbered. A snapshot stores the number
+    of the last record its state includes, and restore replays only the
+    records after it. Snapshots start a new WAL segment first and delete
+    the older ones once written, so the WAL only ever covers one interval.
+    Call `restore()` after registering components and before changing them.
+
+    Typical use:
+
+        checkpointer = Checkpointer(CHECKPOINT_DIR)
+        checkpointer.register("ledger", ledger)
+        checkpointer.register("metadata", client.metadata_cache)
+        checkpointer.restore()  # then a single ledger.sync()
+        checkpointer.start()
+
+    Parameters
+    ----------
+    path : Path
+        The checkpoint directory.
+    interval : float
+        Seconds between snapshots taken by the background thread.
+    fsync : bool
+        Flush every WAL record to disk, not just to the OS. Survives power
+        loss, at a large cost per record.
+    """
+
+    @pathlike("path")
+    def __init__(self, path: Path, interval: float = 60.0, fsync: bool = False):
+        self.path = safe_open_dir(path)
+        self.interval = interval
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.components: dict[str, Any] = {}
+        self.seqs: dict[str, int] = {}
+        self.segment = max(
+            (_segment_number(p) for p in self.path.glob(f"{WAL_PREFIX}*.log")),
+            default=0,
+        )
+        self.wal: Optional[Any] = None
+        self.stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+        self.num_records = 0
+        self.num_snapshots = 0
+        self.last_snapshot_time = 0.0
+
+    def register(self, name: str, component: Any) -> None:
+        self.components[name] = component
+        self.seqs.setdefault(name, 0)
+        component.journal = partial(self.append, name)
+
+    def _open_segment(self, segment: int) -> None:
+        # Must be called with the lock held
+        if self.wal is not None:
+            self.wal.close()
+        self.segment = segment
+        self.wal = open(self.path / f"{WAL_PREFIX}{segment:08d}.log", "ab")
+
+    def append(self, name: str, op: str, args: tuple) -> None:
+        """Logs a change to a component. Called through `component.journal`."""
+        with self.lock:
+            if self.wal is None:
+                self._open_segment(self.segment + 1)
+            self.seqs[name] += 1
+            payload = pickle.dumps(
+                (name, self.seqs[name], op, args), protocol=pickle.HIGHEST_PROTOCOL
+            )
+            self.wal.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self.wal.flush()
+            if self.fsync:
+                os.fsync(self.wal.fileno())
+            self.num_records += 1
+
+    def _capture(self, name: str, component: Any) -> tuple[int, Any]:
+        # Changes are journaled under the component's lock, so while it is
+        # held the seq matches the state exactly
+        with component.lock:
+            return self.seqs[name], component.state_dict()
+
+    def snapshot(self) -> Path:
+        """Writes a snapshot and drops the WAL segments it covers."""
+        with self.lock:
+            self._open_segment(self.segment + 1)
+            segment = self.segment
+        # Every record in older segments was applied before this point
+        components = {
+            name: self._capture(name, component)
+            for name, component in self.components.items()
+        }
+        data = zlib.compress(
+            pickle.dumps(
+                {"time": time.time(), "segment": segment, "components": components},
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        )
+        path = self.path / SNAPSHOT
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+        for wal in self.path.glob(f"{WAL_PREFIX}*.log"):
+            if _segment_number(wal) < segment:
+                wal.unlink()
+        self.num_snapshots += 1
+        self.last_snapshot_time = time.time()
+        return path
+
+    def restore(self) -> bool:
+        """
+        Loads the snapshot and replays the WAL into the registered
+        components. Returns whether there was anything to restore.
+        """
+        snapshot_path = self.path / SNAPSHOT
+        restored = False
+        first_segment = 0
+        journals = {name: c.journal for name, c in self.components.items()}
+        try:
+            # Replayed changes must not be logged again
+            for component in self.components.values():
+                component.journal = None
+
+            if snapshot_path.exists():
+                with open(snapshot_path, "rb") as f:
+                    snapshot = pickle.loads(zlib.decompress(f.read()))
+                first_segment = snapshot["segment"]
+                for name, (seq, state) in snapshot["components"].items():
+                    if name in self.components:
+                        self.components[name].load_state_dict(state)
+                        self.seqs[name] = seq
+                restored = True
+
+            segments = sorted(
+                (p for p in self.path.glob(f"{WAL_PREFIX}*.log")),
+                key=_segment_number,
+            )
+            for segment in segments:
+                if _segment_number(segment) < first_segment:
+                    continue
+                for name, seq, op, args in read_wal(segment, truncate=True):
+                    if name not in self.components or seq <= self.seqs.get(name, 0):
+                        continue
+                    self.components[name].replay(op, args)
+                    self.seqs[name] = seq
+                    restored = True
+        finally:
+            for name, component in self.components.items():
+                component.journal = journals[name]
+        return restored
+
+    def _run(self) -> None:
+        while not self.stop.wait(self.interval):
+            self.snapshot()
+
+    def start(self) -> threading.Thread:
+        """Takes a snapshot every `interval` seconds on a background thread."""
+        self.thread = threading.Thread(
+            target=self._run, name="kalshi-checkpointer", daemon=True
+        )
+        self.thread.start()
+        return self.thread
+
+    def close(self) -> None:
+        """Stops the background thread and writes a final snapshot."""
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.snapshot()
+        with self.lock:
+            if self.wal is not None:
+                self.wal.close()
+                self.wal = None
+
+    def __enter__(self) -> "Checkpointer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
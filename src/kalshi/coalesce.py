@@ -0,0 +1,144 @@
+"""
+Sharing one in-flight request between concurrent identical callers.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class RequestCoalescer:
+    """
+    Coalesces concurrent identical requests into one.
+
+    The first caller for a key (the leader) runs the request. Callers that
+    arrive while it is in flight wait for and share its result, or its
+    exception. With `freshness > 0`, callers arriving up to `freshness`
+    seconds after the leader finished also reuse its result.
+
+    Shared results are the same object for every caller and must not be
+    mutated. Threads and asyncio tasks are tracked separately, so a thread
+    never waits on an event loop and vice versa.
+
+    Parameters
+    ----------
+    freshness : float
+        Seconds a completed result may be reused. 0 only shares in-flight
+        requests.
+    max_recent : int
+        Number of completed results kept before expired ones are pruned.
+    """
+
+    def __init__(self, freshness: float = 0.0, max_recent: int = 4096):
+        self.freshness = freshness
+        self.max_recent = max_recent
+        self.lock = threading.Lock()
+        self.inflight: Dict[Hashable, Future] = {}
+        self.inflight_async: Dict[Hashable, asyncio.Future] = {}
+        self.recent: Dict[Hashable, Tuple[float, Any]] = {}
+
+        self.leaders = 0
+        self.followers = 0
+        self.fresh_hits = 0
+
+    @staticmethod
+    def key(path: str, params: Dict[str, Any]) -> Hashable:
+        return path, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+    def _fresh(self, key: Hashable) -> Tuple[bool, Any]:
+        # Must be called with the lock held
+        if self.freshness <= 0 or key not in self.recent:
+            return False, None
+        finished, result = self.recent[key]
+        if time.monotonic() - finished > self.freshness:
+            del self.recent[key]
+            return False, None
+        self.fresh_hits += 1
+        return True, result
+
+    def _remember(self, key: Hashable, result: Any) -> None:
+        # Must be called with the lock held
+        if self.freshness > 0:
+            now = time.monotonic()
+            if len(self.recent) >= self.max_recent:
+                self.recent = {
+                    k: v for k, v in self.recent.items() if now - v[0] <= self.freshness
+                }
+            self.recent[key] = (now, result)
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Runs `fn` unless an identical request is in flight or fresh."""
+        with self.lock:
+            is_fresh, result = self._fresh(key)
+            if is_fresh:
+                return result
+            future = self.inflight.get(key)
+            is_leader = future is None
+            if future is None:
+                future = self.inflight[key] = Future()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self.lock:
+                del self.inflight[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            del self.inflight[key]
+            self._remember(key, result)
+        future.set_result(result)
+        return result
+
+    async def run_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The asyncio counterpart to `run`. `fn` returns an awaitable, which
+        runs in a task of its own that every caller, the leader included,
+        waits on. Cancelling any caller leaves the request running for the
+        others.
+        """
+        with self.lock:
+            is_fresh, result = self._fresh(key)
+            if is_fresh:
+                return result
+            task = self.inflight_async.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._lead_async(key, fn))
+                # Avoid "exception was never retrieved" when every caller
+                # was cancelled
+                task.add_done_callback(
+                    lambda task: task.cancelled() or task.exception()
+                )
+                self.inflight_async[key] = task
+                self.leaders += 1
+            else:
+                self.followers += 1
+        return await asyncio.shield(task)
+
+    async def _lead_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]):
+        try:
+            result = await fn()
+        except BaseException:
+            with self.lock:
+                del self.inflight_async[key]
+            raise
+        with self.lock:
+            del self.inflight_async[key]
+            self._remember(key, result)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "leaders": self.leaders,
+                "followers": self.followers,
+                "fresh_hits": self.fresh_hits,
+            }
@@ -0,0 +1,46 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class HttpError(Exception):
+    """Represents an HTTP error with reason and status code."""
+
+    def __init__(self, reason: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        # Seconds the server asked us to wait before retrying, if any
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return "HttpError(%d %s)" % (self.status, self.reason)
+
+
+class CircuitOpenError(Exception):
+    """Raised without sending a request while an endpoint's circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(endpoint)
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+    def __str__(self) -> str:
+        return "CircuitOpenError(%s, retry in %.2fs)" % (self.endpoint, self.retry_in)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,29 @@
+"""
+The Kalshi trading fee schedule, in integer cents.
+
+A fill of C contracts at P cents is charged
+
+    ceil(rate * C * P * (100 - P) / 100) cents
+
+with `rate` 0.07 for takers and 0.0175 for makers on markets that charge
+them, i.e. ceil(0.07 * C * p * (1 - p)) dollars rounded up to the cent with
+p in dollars. Rates are kept in basis points so the whole computation stays
+in integers.
+"""
+
+import numpy as np
+
+TAKER_FEE_BPS = 700
+MAKER_FEE_BPS = 175
+
+
+def trading_fee(count, price, fee_bps: int = TAKER_FEE_BPS) -> np.ndarray:
+    """
+    Fees in cents for fills of `count` contracts at `price` cents. Both
+    broadcast, and the result is int64.
+    """
+    count = np.asarray(count, dtype=np.int64)
+    price = np.asarray(price, dtype=np.int64)
+    numerator = fee_bps * count * price * (100 - price)
+    # Ceiling division by 10000 bps * 100 cents
+    return -(-numerator // 1_000_000)
@@ -0,0 +1,323 @@
+"""
+Incremental download of Kalshi trade and price history into a partitioned
+parquet store.
+
+The store under `root` looks like
+
+    root/
+        watermarks.json
+        markets/series=HIGHNY/markets.parquet
+        trades/series=HIGHNY/month=2024-11/part-<ticker>-<run>-<n>.parquet
+        history/series=HIGHNY/month=2024-11/part-<ticker>-<run>-<n>.parquet
+
+and can be read back with `load_history` (or `pd.read_parquet(root / kind)`).
+"""
+
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..file_utils import pathlike, safe_open_dir, safe_open_file
+from .api_client import ExchangeClient
+from .models import (
+    market_history_to_columns,
+    markets_to_columns,
+    trades_to_columns,
+)
+
+TRADES = "trades"
+HISTORY = "history"
+MARKETS = "markets"
+
+# Markets in these states get no new trades or prices
+CLOSED_STATUSES = frozenset({"closed", "settled", "finalized", "determined"})
+
+
+@dataclass
+class DownloadResult:
+    series_ticker: str
+    kind: str
+    num_tickers: int = 0
+    num_skipped: int = 0
+    num_rows: int = 0
+    written_filepaths: list[Path] = field(default_factory=list)
+
+
+class Watermarks:
+    """
+    The last downloaded timestamp (unix seconds) per kind and ticker, and
+    whether the ticker was closed when it was downloaded. Saved atomically
+    after every ticker so an interrupted run resumes where it stopped.
+
+    Several trades can share a second, and more can land in it after a
+    download, so trades resume at the watermark second itself and the ids
+    of the trades already stored at it (`last_ids`) are skipped.
+    """
+
+    @pathlike("path")
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.marks: dict[str, dict[str, dict]] = {}
+        if path.exists():
+            with open(path) as f:
+                self.marks = json.load(f)
+
+    def get(self, kind: str, ticker: str) -> dict:
+        with self.lock:
+            return dict(self.marks.get(kind, {}).get(ticker, {}))
+
+    def min_ts(self, kind: str, ticker: str) -> Optional[int]:
+        # min_ts is inclusive. History has one point per second, so it starts
+        # one second after the watermark
+        last_ts = self.get(kind, ticker).get("last_ts")
+        if last_ts is None or kind == TRADES:
+            return last_ts
+        return last_ts + 1
+
+    def update(
+        self,
+        kind: str,
+        ticker: str,
+        last_ts: Optional[int],
+        closed: bool,
+        last_ids: Iterable[str] = (),
+    ):
+        with self.lock:
+            mark = self.marks.setdefault(kind, {}).setdefault(ticker, {})
+            if last_ts is not None:
+                previous = mark.get("last_ts")
+                if previous is None or last_ts > previous:
+                    mark["last_ts"] = last_ts
+                    mark["last_ids"] = sorted(last_ids)
+                elif last_ts == previous:
+                    mark["last_ids"] = sorted({*mark.get("last_ids", ()), *last_ids})
+            mark["closed"] = closed
+            tmp = safe_open_file(self.path.with_suffix(".json.tmp"))
+            with open(tmp, "w") as f:
+                json.dump(self.marks, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+def _months(columns: dict[str, np.ndarray], kind: str) -> np.ndarray:
+    if kind == TRADES:
+        times = columns["created_time"]
+    else:
+        times = columns["ts"].astype("datetime64[s]")
+    return times.astype("datetime64[M]").astype(str)
+
+
+def _last_ts(columns: dict[str, np.ndarray], kind: str) -> Optional[int]:
+    if kind == TRADES:
+        times = columns["created_time"]
+        times = times[~np.isnat(times)]
+        if len(times) == 0:
+            return None
+        return int(times.max().astype("datetime64[s]").astype(np.int64))
+    if len(columns["ts"]) == 0:
+        return None
+    return int(columns["ts"].max())
+
+
+def _ids_at(columns: dict[str, np.ndarray], ts: int) -> set[str]:
+    # The ids of the trades made in second `ts`
+    seconds = columns["created_time"].astype("datetime64[s]").astype(np.int64)
+    return set(columns["trade_id"][seconds == ts].tolist())
+
+
+class HistoryDownloader:
+    """
+    Downloads the trades and minute price history of every market in a
+    series, incrementally.
+
+    Each ticker starts from its watermark, so reruns only fetch what is new
+    (trades resume inside the watermark second, skipping the trade ids
+    already stored), and tickers that were already closed at their last download are skipped.
+    Tickers are downloaded concurrently by `workers` threads sharing the
+    client, so its rate limiter keeps the whole download within budget.
+    Records are written in parts of at most `flush_rows` rows as they
+    arrive. Parts stay hidden (dot-prefixed, which parquet readers skip)
+    until their ticker finishes and its watermark is saved, and hidden parts
+    left by an interrupted run are removed on the next one.
+
+    Parameters
+    ----------
+    client : ExchangeClient
+    root : Path
+        The root of the store.
+    workers : int
+        Tickers downloaded at the same time.
+    flush_rows : int
+        Records buffered per ticker before they are written out.
+    page_size : int
+        Records requested per page.
+    """
+
+    FETCHERS: dict[str, tuple[str, str, Callable]] = {
+        TRADES: ("get_trades", "trades", trades_to_columns),
+        HISTORY: ("get_market_history", "history", market_history_to_columns),
+    }
+
+    @pathlike("root")
+    def __init__(
+        self,
+        client: ExchangeClient,
+        root: Path,
+        workers: int = 4,
+        flush_rows: int = 50_000,
+        page_size: int = 1000,
+    ):
+        self.client = client
+        self.root = safe_open_dir(root)
+        self.workers = workers
+        self.flush_rows = flush_rows
+        self.page_size = page_size
+        self.run_id = uuid.uuid4().hex[:8]
+        self.watermarks = Watermarks(self.root / "watermarks.json")
+        self._remove_hidden_parts()
+
+    def _remove_hidden_parts(self) -> None:
+        for part in self.root.glob("*/series=*/month=*/.part-*.parquet"):
+            part.unlink()
+
+    def list_markets(self, series_ticker: str) -> list[dict]:
+        """Every market in the series, also saved to the markets table."""
+        markets = list(
+            self.client.iter_markets(
+                series_ticker=series_ticker, page_size=self.page_size
+            )
+        )
+        if markets:
+            path = safe_open_file(
+                self.root / MARKETS / f"series={series_ticker}" / "markets.parquet"
+            )
+            pd.DataFrame(markets_to_columns(markets)).to_parquet(path, index=False)
+        return markets
+
+    def _iter_records(self, kind: str, ticker: str, min_ts: Optional[int]) -> Iterator:
+        method, key, _ = self.FETCHERS[kind]
+        fetch = getattr(self.client, method)
+        params = {"ticker": ticker, "page_size": self.page_size}
+        if min_ts is not None:
+            params["min_ts"] = min_ts
+        return self.client.paginate(fetch, key, **params)
+
+    def _write_part(
+        self,
+        kind: str,
+        series_ticker: str,
+        ticker: str,
+        columns: dict[str, np.ndarray],
+        n: int,
+    ) -> list[Path]:
+        if kind == HISTORY:
+            columns = {"ticker": np.full(len(columns["ts"]), ticker), **columns}
+        frame = pd.DataFrame(columns)
+        months = _months(columns, kind)
+        paths = []
+        for month in np.unique(months):
+            path = safe_open_file(
+                self.root
+                / kind
+                / f"series={series_ticker}"
+                / f"month={month}"
+                / f".part-{ticker}-{self.run_id}-{n}.parquet"
+            )
+            frame[months == month].to_parquet(path, index=False)
+            paths.append(path)
+        return paths
+
+    def download_ticker(
+        self, kind: str, series_ticker: str, market: dict
+    ) -> tuple[int, list[Path]]:
+        """Downloads one ticker from its watermark and publishes its parts."""
+        ticker = market["ticker"]
+        closed = market.get("status") in CLOSED_STATUSES
+        hidden: list[Path] = []
+        last_ts: Optional[int] = None
+        last_ids: set[str] = set()
+        num_rows = 0
+        num_parts = 0
+        buffer: list[dict] = []
+
+        def flush():
+            nonlocal last_ts, last_ids, num_parts
+            columns = self.FETCHERS[kind][2](buffer)
+            ts = _last_ts(columns, kind)
+            if ts is not None and (last_ts is None or ts >= last_ts):
+                if kind == TRADES:
+                    ids = _ids_at(columns, ts)
+                    last_ids = ids if ts != last_ts else last_ids | ids
+                last_ts = ts
+            hidden.extend(
+                self._write_part(kind, series_ticker, ticker, columns, num_parts)
+            )
+            num_parts += 1
+            buffer.clear()
+
+        min_ts = self.watermarks.min_ts(kind, ticker)
+        # Trades fetched again from the watermark second
+        seen = set(self.watermarks.get(kind, ticker).get("last_ids", ()))
+        for record in self._iter_records(kind, ticker, min_ts):
+            if seen and record.get("trade_id") in seen:
+                continue
+            buffer.append(record)
+            num_rows += 1
+            if len(buffer) >= self.flush_rows:
+                flush()
+        if buffer:
+            flush()
+
+        written = []
+        for path in hidden:
+            published = path.with_name(path.name[1:])
+            os.replace(path, published)
+            written.append(published)
+        self.watermarks.update(kind, ticker, last_ts, closed, last_ids)
+        return num_rows, written
+
+    def download_series(
+        self, series_ticker: str, kinds: Iterable[str] = (TRADES, HISTORY)
+    ) -> list[DownloadResult]:
+        markets = self.list_markets(series_ticker)
+        results = []
+        for kind in kinds:
+            result = DownloadResult(series_ticker, kind)
+            todo = []
+            for market in markets:
+                if self.watermarks.get(kind, market["ticker"]).get("closed"):
+                    result.num_skipped += 1
+                else:
+                    todo.append(market)
+
+            with ThreadPoolExecutor(self.workers) as pool:
+                futures = [
+                    pool.submit(self.download_ticker, kind, series_ticker, market)
+                    for market in todo
+                ]
+                for future in as_completed(futures):
+                    num_rows, written = future.result()
+                    result.num_tickers += 1
+                    result.num_rows += num_rows
+                    result.written_filepaths.extend(written)
+            results.append(result)
+        return results
+
+
+@pathlike("root")
+def load_history(
+    root: Path, kind: str = TRADES, series_ticker: Optional[str] = None
+) -> pd.DataFrame:
+    """Reads a kind of data, optionally for one series, back from the store."""
+    path = root / kind
+    if series_ticker is not None:
+        path = path / f"series={series_ticker}"
+    return pd.read_parquet(path)
@@ -0,0 +1,253 @@
+"""
+An in-memory index of Kalshi markets by series, event date, station and
+strike.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+from ..params import HIGH_TEMP_SERIES, StationID
+from .api_client import ExchangeClient
+from .models import Market
+
+SERIES_STATION = {series: station for station, series in HIGH_TEMP_SERIES.items()}
+
+
+def series_of(event_ticker: str) -> str:
+    return event_ticker.split("-", 1)[0]
+
+
+def event_date(event_ticker: str) -> Optional[date]:
+    """The date in an event ticker like "HIGHNY-24NOV10", if it has one."""
+    parts = event_ticker.split("-")
+    if len(parts) < 2:
+        return None
+    try:
+        return datetime.strptime(parts[1], "%y%b%d").date()
+    except ValueError:
+        return None
+
+
+def strike_bounds(market: Market) -> tuple[float, float, bool, bool]:
+    """
+    The (low, high, low_inclusive, high_inclusive) interval a market's
+    strike covers. "between" brackets include both bounds, "greater" and
+    "less" exclude theirs.
+    """
+    floor = market.floor_strike if market.floor_strike is not None else -np.inf
+    cap = market.cap_strike if market.cap_strike is not None else np.inf
+    if market.strike_type == "greater":
+        return floor, np.inf, False, False
+    if market.strike_type == "less":
+        return -np.inf, cap, False, False
+    return floor, cap, True, True
+
+
+def contains(bounds: tuple[float, float, bool, bool], value: float) -> bool:
+    low, high, low_inclusive, high_inclusive = bounds
+    above = value >= low if low_inclusive else value > low
+    below = value <= high if high_inclusive else value < high
+    return above and below
+
+
+def has_bracket(market: Market) -> bool:
+    """Whether a market's strike is a bracket `strike_bounds` understands."""
+    if market.strike_type not in ("between", "greater", "less"):
+        return False
+    if market.strike_type != "less" and market.floor_strike is None:
+        return False
+    if market.strike_type != "greater" and market.cap_strike is None:
+        return False
+    return True
+
+
+class EventBrackets:
+    """
+    The strike brackets of one event, sorted by lower bound. Markets
+    without a usable bracket are kept apart in `unbracketed`; while there
+    are any, the brackets may not cover every outcome.
+    """
+
+    def __init__(self, markets: Iterable[Market]):
+        bracketed = []
+        self.unbracketed: list[Market] = []
+        for market in markets:
+            if not has_bracket(market):
+                self.unbracketed.append(market)
+                continue
+            bracketed.append((strike_bounds(market), market))
+        bracketed.sort(key=lambda item: (item[0][0], not item[0][2]))
+        self.bounds = [bounds for bounds, _ in bracketed]
+        self.markets = [market for _, market in bracketed]
+        self.lows = [bounds[0] for bounds in self.bounds]
+
+    @property
+    def complete(self) -> bool:
+        """Whether every market of the event has a bracket."""
+        return bool(self.markets) and not self.unbracketed
+
+    def find(self, value: float) -> Optional[Market]:
+        """The bracket containing `value`, in O(log n)."""
+        i = bisect_right(self.lows, value) - 1
+        # A bracket with an exclusive lower bound equal to `value` sorts
+        # after the one that actually contains it
+        for j in (i, i - 1):
+            if 0 <= j < len(self.bounds) and contains(self.bounds[j], value):
+                return self.markets[j]
+        return None
+
+
+class MarketIndex:
+    """
+    Markets from paginated `get_markets` results, indexed for lookups
+    without any requests:
+
+    - by series and event date, and by `StationID` through
+      `HIGH_TEMP_SERIES`,
+    - by strike: the bracket of an event containing a value, by bisection,
+    - by close time: markets closing in a time window, by bisection of a
+      sorted close timestamp array.
+
+    `refresh` re-fetches only the markets of a series that have not closed
+    yet, since strikes and close times of closed markets never change.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.markets: dict[str, Market] = {}
+        self.by_series: dict[str, set[str]] = {}
+        self.by_event: dict[str, set[str]] = {}
+        self.events_by_date: dict[tuple[str, date], str] = {}
+        self.loaded_series: set[str] = set()
+
+        # Derived structures, rebuilt lazily after changes
+        self._brackets: dict[str, EventBrackets] = {}
+        self._close_ts = np.empty(0)
+        self._close_tickers: list[str] = []
+        self._close_dirty = False
+
+    def add_markets(self, markets: Iterable[dict | Market]) -> int:
+        """Adds or updates markets. Returns how many were given."""
+        count = 0
+        with self.lock:
+            for market in markets:
+                if isinstance(market, dict):
+                    market = Market.from_dict(market)
+                self.markets[market.ticker] = market
+                series = series_of(market.event_ticker or market.ticker)
+                self.by_series.setdefault(series, set()).add(market.ticker)
+                self.by_event.setdefault(market.event_ticker, set()).add(market.ticker)
+                day = event_date(market.event_ticker)
+                if day is not None:
+                    self.events_by_date[(series, day)] = market.event_ticker
+                self._brackets.pop(market.event_ticker, None)
+                count += 1
+            self._close_dirty = True
+        return count
+
+    def refresh(
+        self, client: ExchangeClient, series_tickers: Iterable[str | StationID]
+    ) -> int:
+        """
+        Loads every market of new series, and the markets still open of
+        series loaded before. Returns the number of markets fetched.
+        """
+        fetched = 0
+        for series in series_tickers:
+            series = self.series_ticker(series)
+            params: dict = {"series_ticker": series}
+            if series in self.loaded_series:
+                params["min_close_ts"] = int(time.time())
+            fetched += self.add_markets(client.iter_markets(**params))
+            with self.lock:
+                self.loaded_series.add(series)
+        return fetched
+
+    @staticmethod
+    def series_ticker(series: str | StationID) -> str:
+        if isinstance(series, StationID):
+            return HIGH_TEMP_SERIES[series]
+        return series
+
+    # Lookups
+
+    def get(self, ticker: str) -> Optional[Market]:
+        return self.markets.get(ticker)
+
+    def series_markets(self, series: str | StationID) -> list[Market]:
+        tickers = self.by_series.get(self.series_ticker(series), set())
+        return [self.markets[ticker] for ticker in tickers]
+
+    def event_markets(self, event_ticker: str) -> list[Market]:
+        return [self.markets[t] for t in self.by_event.get(event_ticker, set())]
+
+    def event_for(self, series: str | StationID, day: date) -> Optional[str]:
+        """The event ticker of a series on a date, e.g. HIGHNY on 2024-11-10."""
+        return self.events_by_date.get((self.series_ticker(series), day))
+
+    def brackets(self, event_ticker: str) -> EventBrackets:
+        with self.lock:
+            brackets = self._brackets.get(event_ticker)
+            if brackets is None:
+                brackets = EventBrackets(self.event_markets(event_ticker))
+                self._brackets[event_ticker] = brackets
+            return brackets
+
+    def find_bracket(
+        self, series: str | StationID, day: date, value: float
+    ) -> Optional[Market]:
+        """
+        The market of a series on a date whose strike contains `value`, e.g.
+        the NYC high temperature bracket containing 74.
+        """
+        event_ticker = self.event_for(series, day)
+        if event_ticker is None:
+            return None
+        return self.brackets(event_ticker).find(value)
+
+    def _rebuild_close_times(self) -> None:
+        # Must be called with the lock held
+        closing = [
+            (market.close_time.timestamp(), ticker)
+            for ticker, market in self.markets.items()
+            if market.close_time is not None
+        ]
+        closing.sort()
+        self._close_ts = np.array([ts for ts, _ in closing], dtype=np.float64)
+        self._close_tickers = [ticker for _, ticker in closing]
+        self._close_dirty = False
+
+    def closing_between(
+        self, start: float, end: float, status: Optional[str] = "active"
+    ) -> list[Market]:
+        """
+        Markets closing in [start, end) (unix seconds), soonest first. Only
+        markets with `status` are kept: "active" while trading (which the
+        `get_markets` status filter calls "open"), or None for all.
+        """
+        with self.lock:
+            if self._close_dirty:
+                self._rebuild_close_times()
+            lo, hi = np.searchsorted(self._close_ts, [start, end], side="left")
+            markets = [self.markets[t] for t in self._close_tickers[lo:hi]]
+        if status is not None:
+            markets = [market for market in markets if market.status == status]
+        return markets
+
+    def closing_within(
+        self,
+        hours: float,
+        now: Optional[float] = None,
+        status: Optional[str] = "active",
+    ) -> list[Market]:
+        """Markets closing in the next `hours` hours, soonest first."""
+        now = time.time() if now is None else now
+        return self.closing_between(now, now + hours * 3600, status=status)
+
+    def station_of(self, market: Market) -> Optional[StationID]:
+        return SERIES_STATION.get(series_of(market.event_ticker))
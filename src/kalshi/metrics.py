@@ -0,0 +1,349 @@
+"""
+Lightweight in-process metrics for the Kalshi client.
+"""
+
+import json
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from ..file_utils import safe_open_file
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class LatencyStats:
+    """Thread-safe running count, total, min and max of durations in seconds."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        with self.lock:
+            return {
+                "count": self.count,
+                "total": self.total,
+                "mean": self.total / self.count if self.count else 0.0,
+                "min": self.min if self.count else 0.0,
+                "max": self.max,
+            }
+
+
+# Path segments that follow these collections are identifiers, except for the
+# literal sub-collections listed in _PATH_LITERALS.
+_PATH_IDS = {
+    "markets": "{ticker}",
+    "events": "{event_ticker}",
+    "series": "{series_ticker}",
+    "orders": "{order_id}",
+}
+_PATH_LITERALS = {"trades", "batched"}
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Replaces the identifiers in a Kalshi path with placeholders so requests
+    can be grouped by endpoint, e.g. "/markets/ABC-24/orderbook?depth=5"
+    becomes "/markets/{ticker}/orderbook".
+    """
+    parts = path.split("?")[0].split("/")
+    for i in range(1, len(parts)):
+        if parts[i - 1] in _PATH_IDS and parts[i] and parts[i] not in _PATH_LITERALS:
+            parts[i] = _PATH_IDS[parts[i - 1]]
+    return "/".join(parts)
+
+
+class Histogram:
+    """
+    Counts of observations per fixed bucket. Not locked, the owner is
+    expected to hold its own lock while recording.
+
+    Parameters
+    ----------
+    bounds : Sequence[float]
+        Increasing bucket upper bounds. A final +inf bucket is implied.
+    """
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the `q` quantile by linear interpolation inside the bucket
+        it falls in. Values in the +inf bucket are reported as the last bound.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if cumulative + count >= rank and count > 0:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-1]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+class EndpointMetrics:
+    """Everything recorded for one (method, path template) pair."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = Histogram()
+        self.sign_time = 0.0
+        self.rate_limit_wait = 0.0
+        self.decode_time = 0.0
+        self.response_bytes = 0
+        self.errors: dict[str, int] = {}
+        self.retries = 0
+        self.backoff_time = 0.0
+        self.short_circuited = 0
+
+    def record(
+        self,
+        latency: float,
+        sign_time: float,
+        rate_limit_wait: float,
+        decode_time: float,
+        response_bytes: int,
+    ) -> None:
+        with self.lock:
+            self.latency.record(latency)
+            self.sign_time += sign_time
+            self.rate_limit_wait += rate_limit_wait
+            self.decode_time += decode_time
+            self.response_bytes += response_bytes
+
+    def record_error(self, error: BaseException) -> None:
+        kind = str(getattr(error, "status", type(error).__name__))
+        with self.lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def record_retry(self, backoff: float) -> None:
+        with self.lock:
+            self.retries += 1
+            self.backoff_time += backoff
+
+    def record_short_circuit(self) -> None:
+        with self.lock:
+            self.short_circuited += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "latency": self.latency.snapshot(),
+                "sign_time": self.sign_time,
+                "rate_limit_wait": self.rate_limit_wait,
+                "decode_time": self.decode_time,
+                "response_bytes": self.response_bytes,
+                "errors": dict(self.errors),
+                "retries": self.retries,
+                "backoff_time": self.backoff_time,
+                "short_circuited": self.short_circuited,
+            }
+
+
+class ClientMetrics:
+    """
+    Per-endpoint request instrumentation for `KalshiClient`.
+
+    For every request the client records, under its method and path
+    template, the network latency (into a histogram), time spent signing,
+    time waiting on the rate limiter, JSON decode time and response size.
+    Failed requests are counted by HTTP status or exception name. A
+    `RetryPolicy` called with these metrics adds its retries, the seconds
+    spent backing off and the requests refused by an open circuit.
+    Recording takes one short lock per request.
+
+    Query in process with `snapshot()` or `endpoint(...)`, and export with
+    `dump()` or `to_prometheus()`. Use `NullMetrics` to turn recording off.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints: dict[tuple[str, str], EndpointMetrics] = {}
+
+    def endpoint(self, method: str, path: str) -> EndpointMetrics:
+        key = (method, endpoint_template(path))
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            with self.lock:
+                endpoint = self.endpoints.setdefault(key, EndpointMetrics())
+        return endpoint
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        latency: float,
+        sign_time: float = 0.0,
+        rate_limit_wait: float = 0.0,
+        decode_time: float = 0.0,
+        response_bytes: int = 0,
+    ) -> None:
+        self.endpoint(method, path).record(
+            latency, sign_time, rate_limit_wait, decode_time, response_bytes
+        )
+
+    def record_error(self, method: str, path: str, error: BaseException) -> None:
+        self.endpoint(method, path).record_error(error)
+
+    def record_retry(self, method: str, path: str, backoff: float) -> None:
+        self.endpoint(method, path).record_retry(backoff)
+
+    def record_short_circuit(self, method: str, path: str) -> None:
+        self.endpoint(method, path).record_short_circuit()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self.lock:
+            endpoints = list(self.endpoints.items())
+        return {
+            f"{method} {template}": endpoint.snapshot()
+            for (method, template), endpoint in sorted(endpoints)
+        }
+
+    def to_prometheus(self, prefix: str = "kalshi") -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+        lines = [
+            f"# TYPE {prefix}_request_latency_seconds histogram",
+        ]
+        totals: dict[str, list[str]] = {
+            "sign_seconds_total": [],
+            "rate_limit_wait_seconds_total": [],
+            "decode_seconds_total": [],
+            "response_bytes_total": [],
+            "request_errors_total": [],
+            "retries_total": [],
+            "backoff_seconds_total": [],
+            "short_circuited_total": [],
+        }
+        for (method, template), endpoint in endpoints:
+            labels = f'method="{method}",endpoint="{template}"'
+            snapshot = endpoint.snapshot()
+            latency = snapshot["latency"]
+            cumulative = 0
+            for bound, count in latency["buckets"].items():
+                cumulative += count
+                lines.append(
+                    f'{prefix}_request_latency_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(
+                f"{prefix}_request_latency_seconds_sum{{{labels}}} {latency['total']}"
+            )
+            lines.append(
+                f"{prefix}_request_latency_seconds_count{{{labels}}} {latency['count']}"
+            )
+            totals["sign_seconds_total"].append(f"{{{labels}}} {snapshot['sign_time']}")
+            totals["rate_limit_wait_seconds_total"].append(
+                f"{{{labels}}} {snapshot['rate_limit_wait']}"
+            )
+            totals["decode_seconds_total"].append(
+                f"{{{labels}}} {snapshot['decode_time']}"
+            )
+            totals["response_bytes_total"].append(
+                f"{{{labels}}} {snapshot['response_bytes']}"
+            )
+            totals["retries_total"].append(f"{{{labels}}} {snapshot['retries']}")
+            totals["backoff_seconds_total"].append(
+                f"{{{labels}}} {snapshot['backoff_time']}"
+            )
+            totals["short_circuited_total"].append(
+                f"{{{labels}}} {snapshot['short_circuited']}"
+            )
+            for status, count in snapshot["errors"].items():
+                totals["request_errors_total"].append(
+                    f'{{{labels},status="{status}"}} {count}'
+                )
+        for name, samples in totals.items():
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.extend(f"{prefix}_{name}{sample}" for sample in samples)
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Path | str) -> Path:
+        """
+        Writes the metrics to `path`, in Prometheus text format if it ends
+        in ".prom" and as JSON otherwise.
+        """
+        path = safe_open_file(path)
+        with open(path, "w") as f:
+            if path.suffix == ".prom":
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+        return path
+
+
+class NullMetrics(ClientMetrics):
+    """Metrics that record nothing. The client skips its timers entirely."""
+
+    enabled = False
+
+    def record(self, *args, **kwargs) -> None:
+        pass
+
+    def record_error(self, *args, **kwargs) -> None:
+        pass
+
+    def record_retry(self, *args, **kwargs) -> None:
+        pass
+
+    def record_short_circuit(self, *args, **kwargs) -> None:
+        pass
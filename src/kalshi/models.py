@@ -0,0 +1,253 @@
+"""
+Typed decoding of Kalshi responses.
+
+Single objects decode into slotted dataclasses. List pages (trades, markets,
+fills) decode into columns: a dict from field name to a numpy array, with
+numbers and timestamps parsed once for the whole page.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from dateutil import parser
+
+# Column dtypes per record type. Missing values become 0 for integers, NaN
+# for floats, NaT for times and "" for strings.
+TRADE_SCHEMA: dict[str, Any] = {
+    "trade_id": np.str_,
+    "ticker": np.str_,
+    "count": np.int64,
+    "yes_price": np.int16,
+    "no_price": np.int16,
+    "taker_side": np.str_,
+    "created_time": "datetime64[us]",
+}
+
+MARKET_SCHEMA: dict[str, Any] = {
+    "ticker": np.str_,
+    "event_ticker": np.str_,
+    "status": np.str_,
+    "strike_type": np.str_,
+    "floor_strike": np.float64,
+    "cap_strike": np.float64,
+    "yes_bid": np.int16,
+    "yes_ask": np.int16,
+    "no_bid": np.int16,
+    "no_ask": np.int16,
+    "last_price": np.int16,
+    "volume": np.int64,
+    "volume_24h": np.int64,
+    "open_interest": np.int64,
+    "liquidity": np.int64,
+    "open_time": "datetime64[us]",
+    "close_time": "datetime64[us]",
+}
+
+# `ts` is in unix seconds
+MARKET_HISTORY_SCHEMA: dict[str, Any] = {
+    "ts": np.int64,
+    "yes_price": np.int16,
+    "yes_bid": np.int16,
+    "yes_ask": np.int16,
+    "volume": np.int64,
+    "open_interest": np.int64,
+}
+
+FILL_SCHEMA: dict[str, Any] = {
+    "trade_id": np.str_,
+    "order_id": np.str_,
+    "ticker": np.str_,
+    "side": np.str_,
+    "action": np.str_,
+    "count": np.int64,
+    "yes_price": np.int16,
+    "no_price": np.int16,
+    "is_taker": np.bool_,
+    "created_time": "datetime64[us]",
+}
+
+
+def _strip_tz(value: Optional[str]) -> str:
+    # Kalshi times are UTC with a trailing Z, which numpy will not parse
+    if not value:
+        return "NaT"
+    return value[:-1] if value.endswith("Z") else value
+
+
+def decode_columns(
+    records: Iterable[dict], schema: dict[str, Any]
+) -> dict[str, np.ndarray]:
+    """Turns a list of record dicts into one numpy array per schema field."""
+    records = records if isinstance(records, list) else list(records)
+    columns = {}
+    for field, dtype in schema.items():
+        values = [record.get(field) for record in records]
+        if isinstance(dtype, str) and dtype.startswith("datetime64"):
+            columns[field] = np.array([_strip_tz(v) for v in values], dtype=dtype)
+        elif dtype is np.str_:
+            columns[field] = np.array(
+                [v if v is not None else "" for v in values], dtype=np.str_
+            )
+        elif np.issubdtype(dtype, np.floating):
+            columns[field] = np.array(
+                [v if v is not None else np.nan for v in values], dtype=dtype
+            )
+        else:
+            columns[field] = np.array(
+                [v if v is not None else 0 for v in values], dtype=dtype
+            )
+    return columns
+
+
+def trades_to_columns(page: dict) -> dict[str, np.ndarray]:
+    """Decodes a `get_trades` response or a list of trades."""
+    return decode_columns(
+        page["trades"] if isinstance(page, dict) else page, TRADE_SCHEMA
+    )
+
+
+def markets_to_columns(page: dict) -> dict[str, np.ndarray]:
+    """Decodes a `get_markets` response or a list of markets."""
+    return decode_columns(
+        page["markets"] if isinstance(page, dict) else page, MARKET_SCHEMA
+    )
+
+
+def fills_to_columns(page: dict) -> dict[str, np.ndarray]:
+    """Decodes a `get_fills` response or a list of fills."""
+    return decode_columns(
+        page["fills"] if isinstance(page, dict) else page, FILL_SCHEMA
+    )
+
+
+def market_history_to_columns(page: dict) -> dict[str, np.ndarray]:
+    """Decodes a `get_market_history` response or a list of history points."""
+    return decode_columns(
+        page["history"] if isinstance(page, dict) else page, MARKET_HISTORY_SCHEMA
+    )
+
+
+def concat_columns(pages: Iterable[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    """Joins the columns of several decoded pages into one set of columns."""
+    pages = list(pages)
+    if not pages:
+        return {}
+    return {
+        field: np.concatenate([page[field] for page in pages]) for field in pages[0]
+    }
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return parser.isoparse(value) if value else None
+
+
+@dataclass(slots=True)
+class Trade:
+    trade_id: str
+    ticker: str
+    count: int
+    yes_price: int
+    no_price: int
+    taker_side: str
+    created_time: Optional[datetime]
+
+    @classmethod
+    def from_dict(cls, trade: dict) -> "Trade":
+        return cls(
+            trade_id=trade["trade_id"],
+            ticker=trade["ticker"],
+            count=int(trade["count"]),
+            yes_price=int(trade["yes_price"]),
+            no_price=int(trade["no_price"]),
+            taker_side=trade.get("taker_side", ""),
+            created_time=_parse_time(trade.get("created_time")),
+        )
+
+
+@dataclass(slots=True)
+class Market:
+    ticker: str
+    event_ticker: str
+    status: str
+    strike_type: Optional[str]
+    floor_strike: Optional[float]
+    cap_strike: Optional[float]
+    yes_bid: int
+    yes_ask: int
+    no_bid: int
+    no_ask: int
+    last_price: int
+    volume: int
+    open_interest: int
+    open_time: Optional[datetime]
+    close_time: Optional[datetime]
+
+    @classmethod
+    def from_dict(cls, market: dict) -> "Market":
+        market = market.get("market", market)
+        return cls(
+            ticker=market["ticker"],
+            event_ticker=market.get("event_ticker", ""),
+            status=market.get("status", ""),
+            strike_type=market.get("strike_type"),
+            floor_strike=market.get("floor_strike"),
+            cap_strike=market.get("cap_strike"),
+            yes_bid=int(market.get("yes_bid") or 0),
+            yes_ask=int(market.get("yes_ask") or 0),
+            no_bid=int(market.get("no_bid") or 0),
+            no_ask=int(market.get("no_ask") or 0),
+            last_price=int(market.get("last_price") or 0),
+            volume=int(market.get("volume") or 0),
+            open_interest=int(market.get("open_interest") or 0),
+            open_time=_parse_time(market.get("open_time")),
+            close_time=_parse_time(market.get("close_time")),
+        )
+
+
+@dataclass(slots=True)
+class Fill:
+    trade_id: str
+    order_id: str
+    ticker: str
+    side: str
+    action: str
+    count: int
+    yes_price: int
+    no_price: int
+    is_taker: bool
+    created_time: Optional[datetime]
+
+    @classmethod
+    def from_dict(cls, fill: dict) -> "Fill":
+        return cls(
+            trade_id=fill.get("trade_id", ""),
+            order_id=fill.get("order_id", ""),
+            ticker=fill["ticker"],
+            side=fill["side"],
+            action=fill["action"],
+            count=int(fill["count"]),
+            yes_price=int(fill["yes_price"]),
+            no_price=int(fill["no_price"]),
+            is_taker=bool(fill.get("is_taker", False)),
+            created_time=_parse_time(fill.get("created_time")),
+        )
+
+
+@dataclass(slots=True)
+class OrderBookLevels:
+    """A `get_orderbook` response as (price, quantity) arrays per side."""
+
+    ticker: str
+    yes: np.ndarray
+    no: np.ndarray
+
+    @classmethod
+    def from_dict(cls, orderbook: dict, ticker: str = "") -> "OrderBookLevels":
+        orderbook = orderbook.get("orderbook", orderbook)
+        return cls(
+            ticker=ticker,
+            yes=np.array(orderbook.get("yes") or [], dtype=np.int64).reshape(-1, 2),
+            no=np.array(orderbook.get("no") or [], dtype=np.int64).reshape(-1, 2),
+        )
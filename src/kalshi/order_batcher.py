@@ -0,0 +1,196 @@
+"""
+Batching individual order intents into batched create/cancel requests.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from .api_client import ExchangeClient
+
+# Kalshi accepts at most this many orders per batched request
+MAX_BATCH_SIZE = 20
+
+_STOP = object()
+
+
+class BatchOrderError(Exception):
+    """An order inside a batched request was rejected by the exchange."""
+
+    def __init__(self, error: dict):
+        super().__init__(error.get("message", str(error)))
+        self.error = error
+
+    def __str__(self) -> str:
+        return "BatchOrderError(%s)" % self.error
+
+
+class OrderBatcher:
+    """
+    Collects `create_order` and `cancel_order` intents and sends them through
+    `batch_create_orders` and `batch_cancel_orders`.
+
+    A background thread flushes pending intents as soon as `max_batch_size`
+    of one kind are waiting, or `max_latency` seconds after the oldest
+    pending intent arrived, whichever comes first. Every intent gets a future
+    that resolves to its own entry of the batched response, matched by
+    `client_order_id` or `order_id`: the created order, or the cancel
+    result. If the exchange rejects a single order, its future raises
+    `BatchOrderError`. If the whole request fails, every future in the
+    batch raises the request's error.
+
+    Parameters
+    ----------
+    client : ExchangeClient
+        The client used to send batched requests.
+    max_batch_size : int
+        Orders per batched request, at most `MAX_BATCH_SIZE`.
+    max_latency : float
+        Longest time in seconds an intent waits before being flushed.
+    """
+
+    def __init__(
+        self,
+        client: ExchangeClient,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_latency: float = 0.05,
+    ):
+        assert 0 < max_batch_size <= MAX_BATCH_SIZE
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.intents: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.closed = False
+
+        self.num_orders = 0
+        self.num_requests = 0
+
+        self.thread = threading.Thread(
+            target=self._run, name="kalshi-order-batcher", daemon=True
+        )
+        self.thread.start()
+
+    def submit_create(self, **order: Any) -> "Future[dict]":
+        """
+        Queues an order with the same fields as `ExchangeClient.create_order`.
+        A `client_order_id` is generated if none is given.
+        """
+        order = {k: v for k, v in order.items() if v is not None}
+        order.setdefault("client_order_id", str(uuid.uuid4()))
+        return self._submit("create", order)
+
+    def submit_cancel(self, order_id: str) -> "Future[dict]":
+        return self._submit("cancel", order_id)
+
+    def _submit(self, kind: str, payload: Any) -> "Future[dict]":
+        future: Future[dict] = Future()
+        with self.lock:
+            # Nothing queued after the stop would ever be flushed
+            if self.closed:
+                raise RuntimeError("OrderBatcher is closed")
+            self.intents.put((kind, payload, future))
+        return future
+
+    def _run(self) -> None:
+        creates: list = []
+        cancels: list = []
+        deadline: Optional[float] = None
+        while True:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            try:
+                intent = self.intents.get(timeout=timeout)
+            except queue.Empty:
+                intent = None
+
+            if intent is not None and intent is not _STOP:
+                kind, payload, future = intent
+                pending = creates if kind == "create" else cancels
+                pending.append((payload, future))
+                if deadline is None:
+                    deadline = time.monotonic() + self.max_latency
+
+            if len(creates) >= self.max_batch_size:
+                self._flush_creates(creates[: self.max_batch_size])
+                del creates[: self.max_batch_size]
+            if len(cancels) >= self.max_batch_size:
+                self._flush_cancels(cancels[: self.max_batch_size])
+                del cancels[: self.max_batch_size]
+
+            expired = deadline is not None and time.monotonic() >= deadline
+            if expired or intent is _STOP:
+                for i in range(0, len(creates), self.max_batch_size):
+                    self._flush_creates(creates[i : i + self.max_batch_size])
+                for i in range(0, len(cancels), self.max_batch_size):
+                    self._flush_cancels(cancels[i : i + self.max_batch_size])
+                creates, cancels = [], []
+            if not creates and not cancels:
+                deadline = None
+            if intent is _STOP:
+                return
+
+    @staticmethod
+    def _resolve(future: Future, item: Optional[dict], key: str) -> None:
+        if item is None:
+            future.set_exception(BatchOrderError({"message": "Missing from response"}))
+        elif item.get("error"):
+            future.set_exception(BatchOrderError(item["error"]))
+        else:
+            future.set_result(item.get(key, item))
+
+    def _flush_creates(self, batch: list) -> None:
+        if not batch:
+            return
+        self.num_orders += len(batch)
+        self.num_requests += 1
+        try:
+            result = self.client.batch_create_orders([order for order, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        items = {}
+        for item in result.get("orders") or []:
+            order = item.get("order") or {}
+            items[item.get("client_order_id") or order.get("client_order_id")] = item
+        for order, future in batch:
+            self._resolve(future, items.get(order["client_order_id"]), "order")
+
+    def _flush_cancels(self, batch: list) -> None:
+        if not batch:
+            return
+        self.num_orders += len(batch)
+        self.num_requests += 1
+        try:
+            result = self.client.batch_cancel_orders(
+                [order_id for order_id, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        items = {item.get("order_id"): item for item in result.get("orders") or []}
+        for order_id, future in batch:
+            self._resolve(future, items.get(order_id), "order")
+
+    def close(self) -> None:
+        """
+        Flushes everything pending and stops the background thread. Later
+        submits raise `RuntimeError`.
+        """
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self.intents.put(_STOP)
+        self.thread.join()
+
+    def __enter__(self) -> "OrderBatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
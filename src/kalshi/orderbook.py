@@ -0,0 +1,220 @@
+"""
+Local mirrors of Kalshi orderbooks.
+
+Kalshi books only hold bids: a yes bid at p cents is the same as a no ask at
+100 - p cents. Each book is stored as a (2, 100) array of resting quantity
+indexed by [side, price in cents], with index 0 unused, alongside the best
+bid price of each side.
+"""
+
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+YES = 0
+NO = 1
+SIDES = {"yes": YES, "no": NO}
+NUM_PRICES = 100  # Prices run from 1 to 99 cents
+PRICES = np.arange(NUM_PRICES)
+
+
+def side_index(side: str | int) -> int:
+    return SIDES[side] if isinstance(side, str) else side
+
+
+class OrderBook:
+    """
+    A single market's book, updated in O(1) from delta messages.
+
+    The quantity and best-bid arrays may be views into a `BookManager`, in
+    which case updates write straight into the manager's shared arrays.
+    """
+
+    def __init__(
+        self,
+        ticker: Optional[str] = None,
+        levels: Optional[np.ndarray] = None,
+        best: Optional[np.ndarray] = None,
+    ):
+        self.ticker = ticker
+        self.levels = (
+            levels if levels is not None else np.zeros((2, NUM_PRICES), np.int64)
+        )
+        self.best = best if best is not None else np.zeros(2, np.int64)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, ticker: Optional[str] = None) -> "OrderBook":
+        book = cls(ticker=ticker)
+        book.load_snapshot(snapshot)
+        return book
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        """
+        Replaces the book with a `get_orderbook` response or a websocket
+        `orderbook_snapshot` message. Both carry "yes" and "no" lists of
+        [price, quantity] pairs, which may be missing or None when empty.
+        """
+        snapshot = snapshot.get("orderbook", snapshot)
+        self.levels[:] = 0
+        self.best[:] = 0
+        for side_name, side in SIDES.items():
+            for price, quantity in snapshot.get(side_name) or []:
+                self._check_price(price)
+                self.levels[side, price] = quantity
+                if quantity > 0 and price > self.best[side]:
+                    self.best[side] = price
+
+    def apply_delta(self, side: str | int, price: int, delta: int) -> None:
+        """Changes the resting quantity at `price` on `side` by `delta`."""
+        side = side_index(side)
+        self._check_price(price)
+        row = self.levels[side]
+        quantity = row[price] + delta
+        if quantity < 0:
+            raise ValueError(
+                f"Delta {delta} at {price} on {self.ticker} leaves negative "
+                "quantity, the book is out of sync"
+            )
+        row[price] = quantity
+
+        best = self.best[side]
+        if quantity > 0 and price > best:
+            self.best[side] = price
+        elif quantity == 0 and price == best:
+            # The best level emptied, walk down to the next resting price
+            while price > 0 and row[price] == 0:
+                price -= 1
+            self.best[side] = price
+
+    def apply_delta_message(self, message: dict) -> None:
+        """Applies a websocket `orderbook_delta` message."""
+        self.apply_delta(message["side"], message["price"], message["delta"])
+
+    @staticmethod
+    def _check_price(price: int) -> None:
+        if not 1 <= price < NUM_PRICES:
+            raise ValueError(f"Price {price} is outside 1-99 cents")
+
+    # Queries. Prices are in cents and 0 means there is no such order.
+
+    def best_bid(self, side: str | int) -> int:
+        return int(self.best[side_index(side)])
+
+    def best_ask(self, side: str | int) -> int:
+        opposite_bid = self.best[1 - side_index(side)]
+        return int(NUM_PRICES - opposite_bid) if opposite_bid > 0 else 0
+
+    def depth_at(self, side: str | int, price: int) -> int:
+        """Quantity bid on `side` at exactly `price`."""
+        return int(self.levels[side_index(side), price])
+
+    def cumulative_depth(self, side: str | int, price: int) -> int:
+        """Quantity bid on `side` at `price` or better (higher)."""
+        return int(self.levels[side_index(side), price:].sum())
+
+    def cumulative_ask_depth(self, side: str | int, price: int) -> int:
+        """Quantity that can be bought on `side` paying at most `price`."""
+        opposite = 1 - side_index(side)
+        return int(self.levels[opposite, NUM_PRICES - price :].sum())
+
+
+class BookManager:
+    """
+    Holds many `OrderBook`s in one contiguous (capacity, 2, 100) quantity
+    array and a (capacity, 2) best-bid array, so that scans across markets
+    are single vectorized numpy operations over the first `len(self)` rows.
+
+    Parameters
+    ----------
+    capacity : int
+        Initial number of rows. The arrays double in size when full.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.levels = np.zeros((capacity, 2, NUM_PRICES), np.int64)
+        self.best = np.zeros((capacity, 2), np.int64)
+        self.tickers: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.books: dict[str, OrderBook] = {}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.books
+
+    def __getitem__(self, ticker: str) -> OrderBook:
+        return self.books[ticker]
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self.levels)
+        levels = np.zeros((capacity, 2, NUM_PRICES), np.int64)
+        best = np.zeros((capacity, 2), np.int64)
+        levels[: len(self)] = self.levels[: len(self)]
+        best[: len(self)] = self.best[: len(self)]
+        self.levels, self.best = levels, best
+        for ticker, row in self.rows.items():
+            self.books[ticker].levels = self.levels[row]
+            self.books[ticker].best = self.best[row]
+
+    def add(self, ticker: str, snapshot: Optional[dict] = None) -> OrderBook:
+        """Adds an empty book for `ticker`, or reloads it if it exists."""
+        if ticker not in self.books:
+            if len(self) == len(self.levels):
+                self._grow()
+            row = len(self)
+            self.rows[ticker] = row
+            self.tickers.append(ticker)
+            self.books[ticker] = OrderBook(
+                ticker=ticker, levels=self.levels[row], best=self.best[row]
+            )
+        book = self.books[ticker]
+        if snapshot is not None:
+            book.load_snapshot(snapshot)
+        return book
+
+    def load_snapshots(self, snapshots: dict[str, dict]) -> None:
+        """Seeds books from a ticker to `get_orderbook` response mapping."""
+        for ticker, snapshot in snapshots.items():
+            self.add(ticker, snapshot)
+
+    def apply_message(self, message: dict[str, Any]) -> None:
+        """
+        Applies a websocket `orderbook_snapshot` or `orderbook_delta`
+        message (the "msg" payload), creating the book on a snapshot.
+        """
+        ticker = message["market_ticker"]
+        if "delta" in message:
+            self.books[ticker].apply_delta_message(message)
+        else:
+            self.add(ticker, message)
+
+    def apply_messages(self, messages: Iterable[dict[str, Any]]) -> None:
+        for message in messages:
+            self.apply_message(message)
+
+    # Vectorized queries over all books, row i belongs to self.tickers[i].
+
+    def best_bids(self) -> np.ndarray:
+        """(n, 2) best yes and no bid prices, 0 where a side is empty."""
+        return self.best[: len(self)]
+
+    def best_asks(self) -> np.ndarray:
+        """(n, 2) best yes and no ask prices, 0 where a side is empty."""
+        opposite_bids = self.best[: len(self), ::-1]
+        return np.where(opposite_bids > 0, NUM_PRICES - opposite_bids, 0)
+
+    def spreads(self) -> np.ndarray:
+        """(n,) yes ask minus yes bid, 0 where either side is empty."""
+        bids = self.best[: len(self)]
+        has_both = (bids[:, YES] > 0) & (bids[:, NO] > 0)
+        return np.where(has_both, NUM_PRICES - bids[:, NO] - bids[:, YES], 0)
+
+    def depth_at(self, side: str | int, price: int) -> np.ndarray:
+        """(n,) quantity bid on `side` at `price`."""
+        return self.levels[: len(self), side_index(side), price]
+
+    def cumulative_depth(self, side: str | int) -> np.ndarray:
+        """(n, 100) quantity bid on `side` at each price or better."""
+        levels = self.levels[: len(self), side_index(side), ::-1]
+        return levels.cumsum(axis=-1)[:, ::-1]
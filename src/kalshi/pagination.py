@@ -0,0 +1,145 @@
+"""
+Streaming iterators over Kalshi's cursor-paginated endpoints.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+
+def _page_limit(page_size: Optional[int], remaining: Optional[int]) -> Optional[int]:
+    if remaining is None:
+        return page_size
+    if page_size is None:
+        return remaining
+    return min(page_size, remaining)
+
+
+def paginate(
+    fetch: Callable[..., Any],
+    key: str,
+    page_size: Optional[int] = None,
+    max_records: Optional[int] = None,
+    prefetch: bool = True,
+    **params: Any,
+) -> Iterator[dict]:
+    """
+    Lazily yields the records of a cursor-paginated endpoint.
+
+    Only the page being consumed and, with `prefetch`, the page after it are
+    held in memory. The next page is requested on a background thread as soon
+    as the current one arrives, so the network round trip overlaps with the
+    caller's processing. Breaking out of the loop (or closing the generator)
+    stops pagination.
+
+    Parameters
+    ----------
+    fetch : Callable[..., Any]
+        An endpoint method such as `ExchangeClient.get_trades`. It is called
+        with `cursor=` and `limit=` on top of `params`.
+    key : str
+        The key of the record list in each response, e.g. "trades".
+    page_size : Optional[int]
+        The `limit` requested per page. Defaults to the endpoint's default.
+    max_records : Optional[int]
+        Stop after yielding this many records.
+    prefetch : bool
+        Request the next page while the current one is consumed.
+    **params : Any
+        Filters passed through to `fetch` on every page.
+    """
+    remaining = max_records
+
+    def fetch_page(cursor: Optional[str]):
+        return fetch(cursor=cursor, limit=_page_limit(page_size, remaining), **params)
+
+    if remaining is not None and remaining <= 0:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    next_page = None
+    try:
+        page = fetch_page(None)
+        while True:
+            records = page.get(key) or []
+            cursor = page.get("cursor")
+            del page
+
+            if remaining is not None:
+                records = records[:remaining]
+                remaining -= len(records)
+            has_more = bool(cursor) and bool(records)
+            has_more = has_more and (remaining is None or remaining > 0)
+
+            if has_more and executor is not None:
+                next_page = executor.submit(fetch_page, cursor)
+
+            yield from records
+            del records
+
+            if not has_more:
+                return
+            if next_page is not None:
+                page = next_page.result()
+                next_page = None
+            else:
+                page = fetch_page(cursor)
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+async def apaginate(
+    fetch: Callable[..., Any],
+    key: str,
+    page_size: Optional[int] = None,
+    max_records: Optional[int] = None,
+    prefetch: bool = True,
+    **params: Any,
+) -> AsyncIterator[dict]:
+    """
+    The asyncio counterpart to `paginate`. `fetch` returns an awaitable,
+    e.g. an `AsyncExchangeClient` endpoint method, and the next page is
+    prefetched as a task on the running loop.
+    """
+    remaining = max_records
+
+    def fetch_page(cursor: Optional[str]):
+        return fetch(cursor=cursor, limit=_page_limit(page_size, remaining), **params)
+
+    if remaining is not None and remaining <= 0:
+        return
+
+    next_page: Optional[asyncio.Future] = None
+    try:
+        page = await fetch_page(None)
+        while True:
+            records = page.get(key) or []
+            cursor = page.get("cursor")
+            del page
+
+            if remaining is not None:
+                records = records[:remaining]
+                remaining -= len(records)
+            has_more = bool(cursor) and bool(records)
+            has_more = has_more and (remaining is None or remaining > 0)
+
+            if has_more and prefetch:
+                next_page = asyncio.ensure_future(fetch_page(cursor))
+
+            for record in records:
+                yield record
+            del records
+
+            if not has_more:
+                return
+            if next_page is not None:
+                page = await next_page
+                next_page = None
+            else:
+                page = await fetch_page(cursor)
+    finally:
+        if next_page is not None:
+            next_page.cancel()
@@ -0,0 +1,375 @@
+"""
+A local ledger of our positions and resting orders, kept in sync with the
+exchange incrementally.
+"""
+
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from .api_client import ExchangeClient
+from .models import Fill
+
+# Order statuses that can still trade
+RESTING_STATUSES = frozenset({"resting", "pending"})
+
+
+@dataclass(slots=True)
+class Position:
+    """
+    A position in one market, in yes contracts: positive is long yes and
+    negative is long no. `cost` is what was paid for the open contracts and
+    `realized_pnl` what closed contracts made, both in cents.
+    """
+
+    ticker: str
+    position: int = 0
+    cost: float = 0.0
+    realized_pnl: float = 0.0
+
+    def apply(self, yes_delta: int, yes_price: int) -> None:
+        """Buys `yes_delta` yes contracts (sells if negative) at `yes_price`."""
+        if yes_delta == 0:
+            return
+        direction = 1 if yes_delta > 0 else -1
+        quantity = abs(yes_delta)
+        # Buying yes at p closes long no at 100 - p, and vice versa
+        open_price = yes_price if direction > 0 else 100 - yes_price
+
+        if self.position * direction < 0:
+            closed = min(quantity, abs(self.position))
+            average = self.cost / abs(self.position)
+            self.realized_pnl += closed * ((100 - open_price) - average)
+            self.cost -= closed * average
+            self.position += direction * closed
+            quantity -= closed
+            if self.position == 0:
+                self.cost = 0.0
+
+        self.position += direction * quantity
+        self.cost += quantity * open_price
+
+
+def fill_yes_delta(fill: Fill) -> int:
+    """The change in yes contracts from a fill."""
+    buys_yes = (fill.side == "yes") == (fill.action == "buy")
+    return fill.count if buys_yes else -fill.count
+
+
+class PortfolioLedger:
+    """
+    Our positions and resting orders, held in memory.
+
+    `sync()` fetches only the fills and orders created since the last sync,
+    using `min_ts` watermarks, and applies fills to positions locally. Every
+    `reconcile_interval` seconds it instead replaces the local state with a
+    full fetch of positions and resting orders, which also picks up
+    settlements and cancels made outside this process. Lookups never make a
+    request, and the lock they share with updates is only held to apply
+    fetched data, never during a fetch.
+
+    Orders created or canceled by this process can be passed to
+    `record_order` and `remove_order` so the ledger does not wait for the
+    next reconcile to see them.
+
+    Parameters
+    ----------
+    client : ExchangeClient
+    reconcile_interval : float
+        Seconds between full reconciles. `sync()` reconciles on first use.
+    """
+
+    def __init__(self, client: ExchangeClient, reconcile_interval: float = 300.0):
+        self.client = client
+        self.reconcile_interval = reconcile_interval
+        self.lock = threading.RLock()
+
+        self.positions: dict[str, Position] = {}
+        self.orders: dict[str, dict] = {}
+        self.orders_by_ticker: dict[str, dict[str, dict]] = {}
+        self.total_cost = 0.0
+
+        # min_ts is inclusive, so fills at the watermark second are fetched
+        # again and deduplicated by trade id
+        self.fills_watermark: Optional[int] = None
+        self.fills_at_watermark: set[str] = set()
+        self.orders_watermark: Optional[int] = None
+        self.last_reconcile: Optional[float] = None
+        self.reconciled_at: Optional[float] = None
+
+        # Set by `Checkpointer.register` to log changes between snapshots
+        self.journal: Optional[Callable[[str, tuple], None]] = None
+
+        self.num_fills = 0
+        self.num_syncs = 0
+        self.num_reconciles = 0
+
+    # Lookups
+
+    def position(self, ticker: str) -> int:
+        position = self.positions.get(ticker)
+        return position.position if position is not None else 0
+
+    def exposure(self, ticker: str) -> float:
+        """Cents paid for the open contracts in `ticker`."""
+        position = self.positions.get(ticker)
+        return position.cost if position is not None else 0.0
+
+    def total_exposure(self) -> float:
+        return self.total_cost
+
+    def resting_orders(self, ticker: str) -> list[dict]:
+        return list(self.orders_by_ticker.get(ticker, {}).values())
+
+    # Local updates
+
+    def _log(self, op: str, *args: Any) -> None:
+        # Must be called with the lock held
+        if self.journal is not None:
+            self.journal(op, args)
+
+    def record_order(self, order: dict) -> None:
+        """Adds or updates an order, removing it once it stops resting."""
+        order = order.get("order", order)
+        with self.lock:
+            self._record_order(order)
+            self._log("order", order)
+
+    def _record_order(self, order: dict) -> None:
+        if order.get("status") not in RESTING_STATUSES or (
+            order.get("remaining_count") == 0
+        ):
+            self._remove_order(order["order_id"])
+            return
+        self.orders[order["order_id"]] = order
+        self.orders_by_ticker.setdefault(order["ticker"], {})[order["order_id"]] = order
+
+    def remove_order(self, order_id: str) -> None:
+        with self.lock:
+            self._remove_order(order_id)
+            self._log("remove_order", order_id)
+
+    def _remove_order(self, order_id: str) -> None:
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return
+        by_ticker = self.orders_by_ticker.get(order["ticker"], {})
+        by_ticker.pop(order_id, None)
+        if not by_ticker:
+            self.orders_by_ticker.pop(order["ticker"], None)
+
+    def apply_fill(self, fill: dict | Fill) -> None:
+        if isinstance(fill, dict):
+            fill = Fill.from_dict(fill)
+        with self.lock:
+            self._apply_fill(fill)
+            self._log("fill", asdict(fill))
+
+    def _apply_fill(self, fill: Fill) -> None:
+        position = self.positions.get(fill.ticker)
+        if position is None:
+            position = self.positions[fill.ticker] = Position(fill.ticker)
+        self.total_cost -= position.cost
+        position.apply(fill_yes_delta(fill), fill.yes_price)
+        self.total_cost += position.cost
+        self.num_fills += 1
+
+        order = self.orders.get(fill.order_id)
+        if order is not None:
+            remaining = order.get("remaining_count", 0) - fill.count
+            if remaining <= 0:
+                self._remove_order(fill.order_id)
+            else:
+                order["remaining_count"] = remaining
+
+    def _apply_new_fill(self, fill: Fill, ts: int) -> None:
+        self._apply_fill(fill)
+        if self.fills_watermark is None or ts > self.fills_watermark:
+            self.fills_watermark = ts
+            self.fills_at_watermark = set()
+        self.fills_at_watermark.add(fill.trade_id)
+
+    def apply_fills(self, fills: Iterable[dict]) -> int:
+        """
+        Applies new fills oldest first, skipping ones already applied.
+        Returns how many were applied.
+        """
+        parsed = sorted(
+            (Fill.from_dict(fill) for fill in fills),
+            key=lambda fill: fill.created_time.timestamp() if fill.created_time else 0,
+        )
+        applied = 0
+        with self.lock:
+            for fill in parsed:
+                ts = int(fill.created_time.timestamp()) if fill.created_time else 0
+                if self.fills_watermark is not None and (
+                    ts < self.fills_watermark
+                    or (
+                        ts == self.fills_watermark
+                        and fill.trade_id in self.fills_at_watermark
+                    )
+                ):
+                    continue
+                self._apply_new_fill(fill, ts)
+                self._log("new_fill", asdict(fill), ts)
+                applied += 1
+        return applied
+
+    # Syncing with the exchange
+
+    def sync(self, force_reconcile: bool = False) -> int:
+        """
+        Brings the ledger up to date. Returns the number of new fills
+        applied, or -1 if it reconciled instead.
+        """
+        now = time.monotonic()
+        if (
+            force_reconcile
+            or self.last_reconcile is None
+            or now - self.last_reconcile >= self.reconcile_interval
+        ):
+            self.reconcile()
+            return -1
+
+        with self.lock:
+            fills_min_ts = self.fills_watermark
+            orders_min_ts = self.orders_watermark
+        sync_start = int(time.time())
+
+        fills = list(self.client.iter_fills(min_ts=fills_min_ts))
+        orders = list(self.client.iter_orders(min_ts=orders_min_ts))
+
+        with self.lock:
+            applied = self.apply_fills(fills)
+            for order in orders:
+                self.record_order(order)
+            self.orders_watermark = sync_start
+            self._log("orders_watermark", sync_start)
+            self.num_syncs += 1
+        return applied
+
+    def reconcile(self, max_attempts: int = 3) -> None:
+        """
+        Replaces the local state with a full fetch from the exchange.
+
+        The fetched positions match the fill watermark only if no fill landed
+        while they were fetched, since it is then unknown whether they count
+        it. So the fills past the watermark are fetched again afterwards, and
+        the whole fetch is retried, up to `max_attempts` times, if there are
+        any. If fills keep landing, the last ones are taken as counted.
+        """
+        for _ in range(max(max_attempts, 1)):
+            sync_start = int(time.time())
+            fills_watermark, fills_at_watermark = self._latest_fills()
+            positions = list(self.client.iter_positions())
+            # Only resting orders, not the whole order history
+            orders = list(self.client.iter_orders(status="resting"))
+            landed_watermark, landed_at_watermark = self._latest_fills(fills_watermark)
+            if landed_watermark == fills_watermark and (
+                landed_at_watermark <= fills_at_watermark
+            ):
+                break
+        fills_watermark = landed_watermark
+        fills_at_watermark = landed_at_watermark
+
+        with self.lock:
+            self._set_positions(
+                Position(
+                    market_position["ticker"],
+                    position=int(market_position.get("position", 0)),
+                    cost=float(market_position.get("market_exposure", 0)),
+                    realized_pnl=float(market_position.get("realized_pnl", 0)),
+                )
+                for market_position in positions
+            )
+            self._set_orders(orders)
+
+            # Fills up to the watermark are counted in the fetched positions
+            if fills_watermark is not None:
+                self.fills_watermark = fills_watermark
+                self.fills_at_watermark = fills_at_watermark
+            self.orders_watermark = sync_start
+            self.last_reconcile = time.monotonic()
+            self.reconciled_at = time.time()
+            self.num_reconciles += 1
+            if self.journal is not None:
+                self._log("state", self.state_dict())
+
+    def _latest_fills(self, min_ts: Optional[int] = None) -> tuple[Optional[int], set]:
+        # The newest fill's timestamp, and the trade ids at that timestamp.
+        # Fills come newest first, so one page usually covers them and no
+        # other is prefetched
+        fills = self.client.iter_fills(min_ts=min_ts, prefetch=False)
+        latest, trade_ids = None, set()
+        for fill in map(Fill.from_dict, fills):
+            ts = int(fill.created_time.timestamp()) if fill.created_time else 0
+            if latest is None:
+                latest = ts
+            if ts < latest:
+                break
+            trade_ids.add(fill.trade_id)
+        if latest is None:
+            return min_ts, set()
+        return latest, trade_ids
+
+    def _set_positions(self, positions: Iterable[Position]) -> None:
+        self.positions = {}
+        self.total_cost = 0.0
+        for position in positions:
+            if position.position != 0:
+                self.positions[position.ticker] = position
+                self.total_cost += position.cost
+
+    def _set_orders(self, orders: Iterable[dict]) -> None:
+        self.orders = {}
+        self.orders_by_ticker = {}
+        for order in orders:
+            self._record_order(order)
+
+    # Checkpointing
+
+    def state_dict(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "positions": [
+                    (p.ticker, p.position, p.cost, p.realized_pnl)
+                    for p in self.positions.values()
+                ],
+                "orders": [dict(order) for order in self.orders.values()],
+                "fills_watermark": self.fills_watermark,
+                "fills_at_watermark": sorted(self.fills_at_watermark),
+                "orders_watermark": self.orders_watermark,
+                "reconciled_at": self.reconciled_at,
+            }
+
+    def load_state_dict(self, state: dict[str, Any]) -> None:
+        with self.lock:
+            self._set_positions(Position(*fields) for fields in state["positions"])
+            self._set_orders(state["orders"])
+            self.fills_watermark = state["fills_watermark"]
+            self.fills_at_watermark = set(state["fills_at_watermark"])
+            self.orders_watermark = state["orders_watermark"]
+            self.reconciled_at = state["reconciled_at"]
+            # Carry on the reconcile schedule of the process that saved this
+            if self.reconciled_at is None:
+                self.last_reconcile = None
+            else:
+                self.last_reconcile = time.monotonic() - (
+                    time.time() - self.reconciled_at
+                )
+
+    def replay(self, op: str, args: tuple) -> None:
+        with self.lock:
+            if op == "order":
+                self._record_order(*args)
+            elif op == "remove_order":
+                self._remove_order(*args)
+            elif op == "fill":
+                self._apply_fill(Fill(**args[0]))
+            elif op == "new_fill":
+                self._apply_new_fill(Fill(**args[0]), args[1])
+            elif op == "orders_watermark":
+                self.orders_watermark = args[0]
+            elif op == "state":
+                self.load_state_dict(args[0])
@@ -0,0 +1,156 @@
+"""
+Token-bucket rate limiting for the Kalshi API.
+"""
+
+import asyncio
+import threading
+import time
+from enum import Enum
+
+
+class RateLimitTier(Enum):
+    """Kalshi API access tiers as (reads per second, writes per second)."""
+
+    BASIC = (20, 10)
+    ADVANCED = (30, 30)
+    PREMIER = (100, 100)
+    PRIME = (400, 400)
+
+    @property
+    def reads_per_second(self) -> int:
+        return self.value[0]
+
+    @property
+    def writes_per_second(self) -> int:
+        return self.value[1]
+
+
+class TokenBucket:
+    """
+    A token bucket on the monotonic clock.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers
+    reserve tokens under a lock and are told how long to wait for them, so the
+    bucket can go into debt. This keeps the lock hold time tiny and lets the
+    same bucket be shared by threads (which sleep) and asyncio tasks (which
+    await) without either blocking the other.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second.
+    capacity : float | None
+        Maximum number of tokens, i.e. the largest burst allowed.
+        Defaults to `rate` (one second worth of requests).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        assert rate > 0
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        assert self.capacity >= 1
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.num_acquired = 0
+        self.num_waited = 0
+        self.total_wait = 0.0
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes `tokens` from the bucket and returns how many seconds the caller
+        must wait before using them.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            self.tokens -= tokens
+            wait = max(0.0, -self.tokens / self.rate)
+
+            self.num_acquired += 1
+            if wait > 0:
+                self.num_waited += 1
+                self.total_wait += wait
+        return wait
+
+    def release(self, tokens: float = 1) -> None:
+        """Gives back reserved `tokens` that were not used."""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Blocks until `tokens` are available. Returns the seconds waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """
+        Awaits until `tokens` are available. Returns the seconds waited. A
+        waiter cancelled before its turn gives its tokens back.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.release(tokens)
+                raise
+        return wait
+
+    def stats(self) -> dict[str, float]:
+        with self.lock:
+            return {
+                "num_acquired": self.num_acquired,
+                "num_waited": self.num_waited,
+                "total_wait": self.total_wait,
+            }
+
+
+class RateLimiter:
+    """
+    Separate read and write token buckets, matching how Kalshi budgets
+    market data requests and order placement.
+
+    Parameters
+    ----------
+    reads_per_second : float
+        Refill rate of the read (GET) bucket.
+    writes_per_second : float
+        Refill rate of the write (POST/DELETE) bucket.
+    read_burst : float | None
+        Capacity of the read bucket. Defaults to `reads_per_second`.
+    write_burst : float | None
+        Capacity of the write bucket. Defaults to `writes_per_second`.
+    """
+
+    def __init__(
+        self,
+        reads_per_second: float = RateLimitTier.BASIC.reads_per_second,
+        writes_per_second: float = RateLimitTier.BASIC.writes_per_second,
+        read_burst: float | None = None,
+        write_burst: float | None = None,
+    ):
+        self.read = TokenBucket(reads_per_second, read_burst)
+        self.write = TokenBucket(writes_per_second, write_burst)
+
+    @classmethod
+    def from_tier(cls, tier: RateLimitTier) -> "RateLimiter":
+        return cls(tier.reads_per_second, tier.writes_per_second)
+
+    def bucket(self, method: str) -> TokenBucket:
+        return self.read if method.upper() == "GET" else self.write
+
+    def acquire(self, method: str = "GET") -> float:
+        return self.bucket(method).acquire()
+
+    async def acquire_async(self, method: str = "GET") -> float:
+        return await self.bucket(method).acquire_async()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {"read": self.read.stats(), "write": self.write.stats()}
@@ -0,0 +1,314 @@
+"""
+Retries with jittered exponential backoff and per-endpoint circuit breakers.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+import requests
+
+from .errors import CircuitOpenError, HttpError
+from .metrics import ClientMetrics, LatencyStats, endpoint_template
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an endpoint keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests are refused for `reset_timeout` seconds. Then a single trial
+    request is let through (half-open): success closes the circuit, failure
+    opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def before_request(self, endpoint: str) -> None:
+        """Raises `CircuitOpenError` if the request must not be sent."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0 or self.trial_in_flight:
+                raise CircuitOpenError(endpoint, max(0.0, retry_in))
+            self.trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Lets another trial through after one ended without an outcome,
+        e.g. cancelled, leaving the circuit's state as it was."""
+        with self.lock:
+            self.trial_in_flight = False
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is retried.
+
+    429 and 5xx responses, connection errors and timeouts are retried up to
+    `max_retries` times. The wait is the response's Retry-After when given,
+    up to `max_retry_after`, otherwise a uniformly jittered delay up to
+    `base_delay * 2**attempt`, capped at `max_delay`. A longer Retry-After
+    is not waited out: the error is raised instead. POSTs are only retried
+    when every order in the body carries a `client_order_id`, which makes
+    resubmission idempotent.
+
+    Each endpoint (path template) has its own `CircuitBreaker`. Retries and
+    the time spent backing off are recorded per endpoint in `backoff`, and
+    also in the `ClientMetrics` passed to `call`.
+
+    Parameters
+    ----------
+    max_retries : int
+        Retries after the first attempt. 0 disables retrying.
+    base_delay : float
+        Backoff scale in seconds.
+    max_delay : float
+        Longest single backoff in seconds without a Retry-After.
+    max_retry_after : float
+        Longest Retry-After in seconds that is waited out before retrying.
+    retry_statuses : Sequence[int]
+        HTTP statuses that are retried.
+    failure_threshold : int
+        Consecutive failures that open an endpoint's circuit.
+    reset_timeout : float
+        Seconds an open circuit refuses requests.
+    """
+
+    CONNECTION_ERRORS: tuple = (
+        requests.ConnectionError,
+        requests.Timeout,
+        ConnectionError,
+        TimeoutError,
+    )
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 5.0,
+        max_retry_after: float = 60.0,
+        retry_statuses: Sequence[int] = (429, 500, 502, 503, 504),
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = frozenset(retry_statuses)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.lock = threading.Lock()
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.backoff: dict[str, LatencyStats] = {}
+        self.short_circuited: dict[str, int] = {}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        with self.lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+                self.backoff[endpoint] = LatencyStats()
+                self.short_circuited[endpoint] = 0
+            return self.breakers[endpoint]
+
+    def is_retryable(self, error: BaseException, connection_errors: tuple = ()) -> bool:
+        if isinstance(error, HttpError):
+            return error.status in self.retry_statuses
+        return isinstance(error, self.CONNECTION_ERRORS + connection_errors)
+
+    @staticmethod
+    def is_idempotent(method: str, body: Optional[Any]) -> bool:
+        if method != "POST":
+            return True
+        try:
+            payload = json.loads(body) if isinstance(body, (str, bytes)) else body
+        except ValueError:
+            return False
+        if not isinstance(payload, dict):
+            return False
+        orders = payload.get("orders", [payload])
+        return bool(orders) and all(
+            isinstance(order, dict) and order.get("client_order_id") for order in orders
+        )
+
+    def delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """The backoff before retrying `error`, None if it must not be retried."""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _on_error(
+        self,
+        method: str,
+        path: str,
+        breaker: CircuitBreaker,
+        error: BaseException,
+        attempt: int,
+        can_retry: bool,
+        connection_errors: tuple = (),
+        metrics: Optional[ClientMetrics] = None,
+    ) -> Optional[float]:
+        # Returns the backoff before the next attempt, None to give up
+        retryable = self.is_retryable(error, connection_errors)
+        if retryable:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if not (retryable and can_retry and attempt < self.max_retries):
+            return None
+        delay = self.delay(attempt, error)
+        if delay is None:
+            return None
+        self.backoff[endpoint_template(path)].record(delay)
+        if metrics is not None:
+            metrics.record_retry(method, path, delay)
+        return delay
+
+    def _before(
+        self,
+        method: str,
+        path: str,
+        breaker: CircuitBreaker,
+        last_error: Optional[BaseException],
+        metrics: Optional[ClientMetrics] = None,
+    ) -> None:
+        endpoint = endpoint_template(path)
+        try:
+            breaker.before_request(endpoint)
+        except CircuitOpenError:
+            with self.lock:
+                self.short_circuited[endpoint] += 1
+            if metrics is not None:
+                metrics.record_short_circuit(method, path)
+            # If our own retries tripped the circuit, surface the real error
+            if last_error is not None:
+                raise last_error
+            raise
+
+    def call(
+        self,
+        method: str,
+        path: str,
+        body: Optional[Any],
+        fn: Callable[[], Any],
+        metrics: Optional[ClientMetrics] = None,
+    ) -> Any:
+        """
+        Runs `fn`, which sends the request, under this policy. Retries and
+        refused requests are also counted in `metrics`.
+        """
+        breaker = self.breaker(endpoint_template(path))
+        can_retry = self.is_idempotent(method, body)
+        attempt = 0
+        last_error: Optional[BaseException] = None
+        while True:
+            self._before(method, path, breaker, last_error, metrics)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._on_error(
+                    method, path, breaker, e, attempt, can_retry, metrics=metrics
+                )
+                if delay is None:
+                    raise
+                last_error = e
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Interrupted, not failed: free the half-open trial slot
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            return result
+
+    async def call_async(
+        self,
+        method: str,
+        path: str,
+        body: Optional[Any],
+        fn: Callable[[], Awaitable[Any]],
+        connection_errors: tuple = (),
+        metrics: Optional[ClientMetrics] = None,
+    ) -> Any:
+        """The asyncio counterpart to `call`. `fn` returns an awaitable."""
+        breaker = self.breaker(endpoint_template(path))
+        can_retry = self.is_idempotent(method, body)
+        attempt = 0
+        last_error: Optional[BaseException] = None
+        while True:
+            self._before(method, path, breaker, last_error, metrics)
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._on_error(
+                    method,
+                    path,
+                    breaker,
+                    e,
+                    attempt,
+                    can_retry,
+                    connection_errors,
+                    metrics,
+                )
+                if delay is None:
+                    raise
+                last_error = e
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled, e.g. by asyncio.wait_for: free the trial slot
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            return result
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per endpoint retries, seconds spent backing off and circuit state."""
+        with self.lock:
+            endpoints = list(self.breakers)
+        return {
+            endpoint: {
+                "retries": self.backoff[endpoint].count,
+                "backoff_time": self.backoff[endpoint].total,
+                "short_circuited": self.short_circuited[endpoint],
+                "circuit": self.breakers[endpoint].state,
+            }
+            for endpoint in endpoints
+        }
@@ -0,0 +1,158 @@
+"""
+RSA-PSS request signing, optionally on a worker pool.
+"""
+
+import asyncio
+import base64
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Literal, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from ..request_utils import load_private_key_from_file
+from .metrics import LatencyStats
+
+
+def sign_pss(private_key: rsa.RSAPrivateKey, text: str) -> str:
+    # Before signing, we need to hash our message.
+    # The hash is what we actually sign.
+    # Convert the text to bytes
+    message = text.encode("utf-8")
+    try:
+        signature = private_key.sign(
+            message,
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.DIGEST_LENGTH,
+            ),
+            hashes.SHA256(),
+        )
+        return base64.b64encode(signature).decode("utf-8")
+    except InvalidSignature as e:
+        raise ValueError("RSA sign PSS failed") from e
+
+
+# Process pool workers load the key once from PEM bytes, since key
+# objects cannot be pickled.
+_worker_key: Optional[rsa.RSAPrivateKey] = None
+
+
+def _init_worker(pem: bytes) -> None:
+    global _worker_key
+    _worker_key = serialization.load_pem_private_key(pem, password=None)  # type: ignore[assignment]
+
+
+def _timed_sign(private_key: Optional[rsa.RSAPrivateKey], text: str):
+    start = time.perf_counter()
+    signature = sign_pss(private_key or _worker_key, text)  # type: ignore[arg-type]
+    return signature, time.perf_counter() - start
+
+
+class RequestSigner:
+    """
+    Signs request messages with the client's RSA key.
+
+    With `workers=0` signing runs inline on the calling thread. Otherwise it
+    runs on a pool of `workers` threads or processes, so concurrent requests
+    sign in parallel and async callers do not block the event loop.
+
+    Two latencies are recorded per signature: `sign_time`, the time spent in
+    the RSA operation itself, and `total_time`, which also includes waiting
+    for a free worker.
+
+    Parameters
+    ----------
+    private_key : rsa.RSAPrivateKey
+        The key used to sign every request.
+    workers : int
+        Size of the signing pool. 0 signs inline.
+    executor : Literal["thread", "process"]
+        Kind of pool to use when `workers > 0`. A process pool sidesteps the
+        GIL at the cost of pickling the message and signature.
+    """
+
+    def __init__(
+        self,
+        private_key: rsa.RSAPrivateKey,
+        workers: int = 0,
+        executor: Literal["thread", "process"] = "thread",
+    ):
+        self.private_key = private_key
+        self.workers = workers
+        self.sign_time = LatencyStats()
+        self.total_time = LatencyStats()
+
+        self.pool: Optional[Executor] = None
+        if workers > 0 and executor == "thread":
+            self.pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="kalshi-signer"
+            )
+        elif workers > 0 and executor == "process":
+            pem = private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(pem,)
+            )
+        elif workers > 0:
+            raise ValueError(f"Unknown executor {executor}")
+
+    @classmethod
+    def from_file(cls, key_path: Path | str, **kwargs) -> "RequestSigner":
+        return cls(load_private_key_from_file(key_path), **kwargs)
+
+    def _worker_key_arg(self) -> Optional[rsa.RSAPrivateKey]:
+        # Process workers use their own copy of the key
+        return None if isinstance(self.pool, ProcessPoolExecutor) else self.private_key
+
+    def _record(self, sign_time: float, start: float) -> None:
+        self.sign_time.record(sign_time)
+        self.total_time.record(time.perf_counter() - start)
+
+    def submit(self, text: str) -> "Future[str]":
+        """Starts signing `text` and returns a future of the signature."""
+        start = time.perf_counter()
+        result: Future[str] = Future()
+        if self.pool is None:
+            signature, sign_time = _timed_sign(self.private_key, text)
+            self._record(sign_time, start)
+            result.set_result(signature)
+            return result
+
+        def done(future: Future) -> None:
+            try:
+                signature, sign_time = future.result()
+            except BaseException as e:
+                result.set_exception(e)
+                return
+            self._record(sign_time, start)
+            result.set_result(signature)
+
+        self.pool.submit(_timed_sign, self._worker_key_arg(), text).add_done_callback(
+            done
+        )
+        return result
+
+    def sign(self, text: str) -> str:
+        return self.submit(text).result()
+
+    async def sign_async(self, text: str) -> str:
+        if self.pool is None:
+            return self.sign(text)
+        return await asyncio.wrap_future(self.submit(text))
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        return {
+            "sign_time": self.sign_time.snapshot(),
+            "total_time": self.total_time.snapshot(),
+        }
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
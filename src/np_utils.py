@@ -1,5 +1,7 @@
-from typing import TypedDict, Sequence, Optional, Callable, Any, cast
-from inspect import signature
+from typing import TypedDict, Sequence, Optional, Callable, Any, Iterator, cast
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, wraps
+from inspect import Parameter, signature
 import numpy as np
 
 
@@ -9,10 +11,36 @@ class VectorizedInputReshapeOutput(TypedDict):
     was_batch: bool
 
 
+def _call_unwrapped(vectorized_func: Callable[..., Any], arguments: dict):
+    # Runs one chunk in a worker. Takes the decorated function, which pickles
+    # by name, and calls the function it wraps
+    return vectorized_func.__wrapped__(**arguments)
+
+
+def _assemble(results: Iterator[Any], num_rows: int, output_names):
+    """Copies chunk results into preallocated outputs of `num_rows` rows."""
+    names = [None] if output_names is None else list(output_names)
+    outputs: dict = {}
+    start = 0
+    for res in results:
+        parts = {None: res} if output_names is None else res
+        for name in names:
+            part = np.asarray(parts[name])
+            if name not in outputs:
+                outputs[name] = np.empty((num_rows, *part.shape[1:]), part.dtype)
+            outputs[name][start : start + len(part)] = part
+        start += len(part)
+    return outputs[None] if output_names is None else outputs
+
+
 def vectorized(
     arg_name: str | Sequence[str],
     row_ndim: int | dict[str, int],
     output_names: Optional[Sequence[str]] = None,
+    chunk_size: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    workers: Optional[int | Executor] = None,
+    processes: bool = False,
 ):
     """
     A decorator that standardizes input into
@@ -51,6 +79,25 @@ def vectorized(
         to output a dictionary. The names passed to this argument
         tell @vectorized which of these outputs were vectorized
         by the function.
+    chunk_size : Optional[int]
+        If passed, the flattened batch is processed `chunk_size`
+        rows at a time, and the outputs are copied into arrays
+        allocated once. Caps the memory of the function's
+        temporaries, which usually scale with the batch.
+    max_bytes : Optional[int]
+        Like `chunk_size`, but picks the rows per chunk so the
+        vectorized inputs of a chunk take at most `max_bytes`.
+    workers : Optional[int | Executor]
+        If passed, chunks are mapped over this many threads, or
+        processes with `processes=True`, created for each call.
+        Pass an `Executor` to reuse one. Off by default: only
+        worth it for functions that are not parallel already.
+        Matrix products and other BLAS calls use every core on
+        their own, and splitting them over threads makes them
+        slower. Processes need the decorated function to be
+        importable.
+    processes : bool
+        Use a process pool when `workers` is an int.
     """
 
     def reshape_res(
@@ -103,6 +150,17 @@ def vectorized(
     assert len(arg_name) > 0
     assert all(arg in row_ndim for arg in arg_name)
 
+    def num_chunk_rows(arguments: dict, num_rows: int) -> int:
+        rows = num_rows
+        if chunk_size is not None:
+            rows = min(rows, chunk_size)
+        if max_bytes is not None:
+            row_bytes = sum(
+                arguments[arg].nbytes // max(num_rows, 1) for arg in arg_name
+            )
+            rows = min(rows, max_bytes // max(row_bytes, 1))
+        return max(rows, 1)
+
     def decorator(func: Callable[..., Any]):
         function_sig = signature(func)
         assert all(arg in function_sig.parameters for arg in arg_name)
@@ -110,12 +168,66 @@ def vectorized(
         func.vectorized_argument = arg_name  # type: ignore[attr-defined]
         func.row_ndim = row_ndim  # type: ignore[attr-defined]
 
+        # Binding with the signature is slow, so for functions without
+        # *args, **kwargs or positional-only parameters it is done once per
+        # call shape (number of positional arguments, keyword names), and
+        # the parameter names it matched are reused
+        params = function_sig.parameters.values()
+        positional_names = tuple(
+            p.name for p in params if p.kind == Parameter.POSITIONAL_OR_KEYWORD
+        )
+        simple_signature = all(
+            p.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY)
+            for p in params
+        )
+        bindings: dict[tuple, tuple] = {}
+
+        def bind_arguments(args: tuple, kwargs: dict) -> dict:
+            key = (len(args), *kwargs)
+            names = bindings.get(key)
+            if names is None:
+                # Raises the usual TypeError for bad calls
+                arguments = function_sig.bind(*args, **kwargs).arguments
+                if not simple_signature:
+                    return dict(arguments)
+                names = bindings[key] = positional_names[: len(args)]
+            arguments = dict(zip(names, args))
+            arguments.update(kwargs)
+            return arguments
+
+        chunked = chunk_size is not None or max_bytes is not None
+
+        def run_chunked(arguments: dict):
+            num_rows = len(arguments[arg_name[0]])
+            rows = num_chunk_rows(arguments, num_rows)
+            if rows >= num_rows:
+                return func(**arguments)
+
+            chunks = (
+                {
+                    **arguments,
+                    **{arg: arguments[arg][start : start + rows] for arg in arg_name},
+                }
+                for start in range(0, num_rows, rows)
+            )
+            if workers is None:
+                return _assemble(
+                    (func(**chunk) for chunk in chunks), num_rows, output_names
+                )
+            call = partial(_call_unwrapped, vectorized_func)
+            if isinstance(workers, Executor):
+                return _assemble(workers.map(call, chunks), num_rows, output_names)
+            pool_type = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            with pool_type(workers) as pool:
+                return _assemble(pool.map(call, chunks), num_rows, output_names)
+
+        @wraps(func)
         def vectorized_func(*args, **kwargs):
-            bound_sig = function_sig.bind(*args, **kwargs)
+            arguments = bind_arguments(args, kwargs)
 
             reshape_input_results: dict[str, VectorizedInputReshapeOutput] = {}
             for arg in arg_name:
-                to_vect = bound_sig.arguments[arg]
+                to_vect = arguments[arg]
 
                 reshape_input_result = reshape_input(
                     to_vect=to_vect, row_ndim=row_ndim[arg]
@@ -127,19 +239,19 @@ def vectorized(
                 "original_batch_shape"
             ]
             was_batch = reshape_input_results[arg_name[0]]["was_batch"]
-            assert all(
+            assert len(arg_name) == 1 or all(
                 original_batch_shape
                 == reshape_input_results[arg]["original_batch_shape"]
                 for arg in arg_name
             )
-            assert all(
+            assert len(arg_name) == 1 or all(
                 was_batch == reshape_input_results[arg]["was_batch"] for arg in arg_name
             )
 
             # Update the function signature arguments
             for arg in arg_name:
-                bound_sig.arguments[arg] = reshape_input_results[arg]["to_vect"]
-            res = func(**bound_sig.arguments)
+                arguments[arg] = reshape_input_results[arg]["to_vect"]
+            res = run_chunked(arguments) if chunked else func(**arguments)
 
             if output_names is None:
                 # Assuming single output
@@ -204,16 +316,123 @@ def dec2bitarray(
     Expands integer array into binary array along last axis.
     """
     arr = cast(np.ndarray, arr)
-    shift_arr = np.arange(num_bits)[None]
-    if not little_endian:
-        shift_arr = shift_arr[:, ::-1]
-
-    res = (np.right_shift(arr[..., None], shift_arr) % 2).astype(dtype)
+    res = np.empty((len(arr), num_bits), dtype=dtype)
+    # One bit at a time, so temporaries are the size of `arr`, not of `res`
+    for bit in range(num_bits):
+        column = bit if little_endian else num_bits - 1 - bit
+        res[:, column] = np.right_shift(arr, bit) & 1
     return res
 
 
 def enumerate_binary_inputs(dimension: int, dtype=np.int8) -> np.ndarray:
     res = dec2bitarray(
-        np.arange(2**dimension, dtype=np.int32), num_bits=dimension, dtype=dtype
+        np.arange(2**dimension, dtype=np.int64), num_bits=dimension, dtype=dtype
+    )
+    return res
+
+
+# Largest dimension bit-packed scenarios support, one uint64 each
+MAX_PACKED_DIMENSION = 63
+
+
+def iter_packed_binary_inputs(
+    dimension: int, chunk_size: int = 2**20
+) -> Iterator[np.ndarray]:
+    """
+    Yields the rows of `enumerate_binary_inputs(dimension)` in order and
+    bit-packed, `chunk_size` at a time. Row i is the uint64 i: the last
+    column is bit 0 and the first column bit `dimension - 1`.
+    """
+    assert 0 <= dimension <= MAX_PACKED_DIMENSION
+    total = 2**dimension
+    for start in range(0, total, chunk_size):
+        yield np.arange(start, min(start + chunk_size, total), dtype=np.uint64)
+
+
+def iter_binary_inputs(
+    dimension: int, chunk_size: int = 2**16, dtype=np.int8
+) -> Iterator[np.ndarray]:
+    """
+    Yields `enumerate_binary_inputs(dimension)` in blocks of `chunk_size`
+    rows, so memory stays bounded for any dimension.
+    """
+    for codes in iter_packed_binary_inputs(dimension, chunk_size):
+        yield unpack_bits(codes, dimension, dtype=dtype)
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """
+    Packs binary rows along the last axis into uint64, the inverse of
+    `unpack_bits`.
+    """
+    num_bits = bits.shape[-1]
+    assert num_bits <= MAX_PACKED_DIMENSION
+    weights = np.left_shift(
+        np.uint64(1), np.arange(num_bits - 1, -1, -1, dtype=np.uint64)
     )
+    return (bits.astype(np.uint64) * weights).sum(axis=-1, dtype=np.uint64)
+
+
+def unpack_bits(codes: np.ndarray, num_bits: int, dtype=np.int8) -> np.ndarray:
+    """Expands packed rows into binary rows, first column most significant."""
+    return dec2bitarray(np.asarray(codes, dtype=np.uint64), num_bits, dtype=dtype)
+
+
+def bit_is_set(codes: np.ndarray, bit: int | np.ndarray) -> np.ndarray:
+    """Whether bit `bit` (0 is least significant) is set in each code."""
+    return (np.right_shift(codes, np.asarray(bit, dtype=np.uint64)) & 1).astype(bool)
+
+
+# Set bits of every byte value, for NumPy < 2.0 which has no bitwise_count
+_BYTE_POPCOUNT = np.array([bin(v).count("1") for v in range(256)], dtype=np.uint8)
+
+
+def _popcount_table(codes: np.ndarray) -> np.ndarray:
+    code_bytes = np.ascontiguousarray(codes.reshape(-1)).view(np.uint8)
+    counts = _BYTE_POPCOUNT[code_bytes.reshape(-1, 8)].sum(axis=1, dtype=np.uint8)
+    return counts.reshape(codes.shape)
+
+
+def popcount(codes: np.ndarray) -> np.ndarray:
+    """The number of set bits in each code."""
+    codes = np.asarray(codes, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(codes)
+    return _popcount_table(codes)
+
+
+def masked_sum(codes: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    `unpack_bits(codes, n) @ weights` without unpacking, with n the length
+    of `weights`' first axis. Looks up the sum of the weights of every byte
+    of the codes in a table of 256 partial sums per byte, so a scenario
+    costs n / 8 lookups and no (len(codes), n) temporary is made.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Packed rows, as from `iter_packed_binary_inputs`.
+    weights : np.ndarray
+        Shape (n,) or (n, k), the first row weighting the most significant
+        bit as in `enumerate_binary_inputs`.
+    """
+    weights = np.asarray(weights)
+    num_bits = weights.shape[0]
+    # Bit order, least significant first
+    weights = weights[::-1]
+    num_bytes = -(-num_bits // 8)
+    padded = np.zeros((num_bytes * 8, *weights.shape[1:]), dtype=weights.dtype)
+    padded[:num_bits] = weights
+    byte_bits = dec2bitarray(np.arange(256), 8, little_endian=True, dtype=weights.dtype)
+    # tables[b, v] is the sum of the weights of byte b's set bits for value v
+    tables = np.einsum(
+        "vi,bi...->bv...", byte_bits, padded.reshape(num_bytes, 8, *weights.shape[1:])
+    )
+
+    # Little-endian bytes, so byte b holds bits 8b to 8b + 7
+    codes = np.ascontiguousarray(codes, dtype="<u8")
+    code_bytes = codes.view(np.uint8).reshape(len(codes), 8)
+    res = np.zeros((len(codes), *weights.shape[1:]), dtype=tables.dtype)
+    for b in range(num_bytes):
+        res += tables[b][code_bytes[:, b]]
     return res
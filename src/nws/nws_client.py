@@ -24,10 +24,18 @@ class NWSClient:
     # Example: 2024-11-10T14:00:00-05:00
     DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
 
+    def __init__(self, session: requests.Session | None = None):
+        """
+        All of this client's NWS requests go through `session`, e.g. a
+        `RecordingSession` or `ReplaySession` from `src.recording`. Other
+        clients keep their own. Defaults to a new `requests.Session`.
+        """
+        self.session = session if session is not None else requests.Session()
+
     @cached(cache=TTLCache(maxsize=1024, ttl=3600))
     def get_location_info(self, lat: float, lon: float):
         url = NWS_POINTS / f"{lat},{lon}"
-        response = requests.get(url)
+        response = self.session.get(url)
         response.raise_for_status()
         return response.json()
 
@@ -41,7 +49,7 @@ class NWSClient:
 
     def get_forecast_data(self, lat: float, lon: float):
         forecast_url = self.get_forecast_url(lat, lon)
-        response = requests.get(forecast_url)
+        response = self.session.get(forecast_url)
         response.raise_for_status()
         res = response.json()
 
@@ -81,7 +89,7 @@ class NWSClient:
 
     def get_hourly_forecast_data(self, lat: float, lon: float):
         forecast_url = self.get_hourly_forecast_url(lat, lon)
-        response = requests.get(forecast_url)
+        response = self.session.get(forecast_url)
         response.raise_for_status()
         res = response.json()
 
@@ -101,10 +109,11 @@ class NWSClient:
         )
         return url
 
-    @staticmethod
-    def _request_cli_data(stationid: StationID, version: int = 1) -> requests.Response:
-        url = NWSClient.cli_url(stationid, version)
-        response = requests.get(url)
+    def _request_cli_data(
+        self, stationid: StationID, version: int = 1
+    ) -> requests.Response:
+        url = self.cli_url(stationid, version)
+        response = self.session.get(url)
         response.raise_for_status()
 
         return response
@@ -138,10 +147,11 @@ class NWSClient:
         cli_text = "\n".join(lines[match_start_i : match_end_i + 1])
         return parse_product_text(cli_text)
 
-    @staticmethod
+    # Cached per client (the key includes self), so responses from one
+    # client's session are never served to another
     @cached(cache=TTLCache(maxsize=1024, ttl=3600))
     def _request_observations_from_station(
-        stationid: StationID, start: datetime, end: datetime, radius: int = 0
+        self, stationid: StationID, start: datetime, end: datetime, radius: int = 0
     ) -> requests.Response:
         assert start.tzinfo is not None
         assert end.tzinfo is not None
@@ -154,7 +164,7 @@ class NWSClient:
             "vars": "air_temp,wind_speed,wind_direction,relative_humidity,air_temp_high_6_hour,air_temp_high_24_hour",
             "token": PUBLIC_TOKEN,
         }
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
 
         return response
@@ -267,10 +277,9 @@ class NWSClient:
             written_filepaths=written_fps, downloaded_filepaths=downloaded_fps
         )
 
-    @staticmethod
     @cached(cache=TTLCache(maxsize=1024, ttl=3600))
     def _request_one_minute_data(
-        stationid: StationID, start: datetime, end: datetime
+        self, stationid: StationID, start: datetime, end: datetime
     ) -> requests.Response:
         assert start.tzinfo is not None
         assert end.tzinfo is not None
@@ -285,7 +294,7 @@ class NWSClient:
             "tz": "UTC",
         }
         url = ONE_MINUTE_BASE.add_query(**params)
-        response = requests.get(url)
+        response = self.session.get(url)
         response.raise_for_status()
 
         return response
@@ -12,18 +12,25 @@ MODELS_DIR = PROJECT_DIR / "models"
 PLOTS_DIR = PROJECT_DIR / "plots"
 LOGS_DIR = PROJECT_DIR / "logs"
 TMP_DIR = PROJECT_DIR / "tmp"
+CACHE_DIR = PROJECT_DIR / "cache"
 PARAMS_DIR = PROJECT_DIR / "src/params"
 KEYS_DIR = PROJECT_DIR / "keys"
 
 KALSHI_KEY = KEYS_DIR / "kalshi_key.key"
 DEMO_KALSHI_KEY = KEYS_DIR / "demo_kalshi_key.key"
 LEGACY_DEMO_KALSHI_KEY = KEYS_DIR / "demo_kalshi_key.legacy.key"
+GATEWAY_AUTHKEY = KEYS_DIR / "gateway_authkey.key"
 
 # Data
 ONE_MINUTE_OBSERVATIONS = INPUTS_DIR / "one_minute"
 CLI_OBSERVATIONS = INPUTS_DIR / "cli"
 TEMP_OBSERVATIONS = INPUTS_DIR / "temp"
 STATION_SPECS = INPUTS_DIR / "station_specs.csv"
+KALSHI_HISTORY = INPUTS_DIR / "kalshi"
+
+# Caches
+KALSHI_METADATA_CACHE = CACHE_DIR / "kalshi_metadata"
+CHECKPOINT_DIR = CACHE_DIR / "checkpoint"
 
 PATH_DATE_FORMAT = "%Y-%m-%d"
 PATH_DATETIME_FORMAT = "%Y-%m-%dT%H-%M-%S"
@@ -82,4 +82,16 @@ SITE_ID = {
     StationID.HOU: "HGX",
 }
 
+# Kalshi series of daily high temperature markets settled on each station's
+# CLI report. Pierre has no market.
+HIGH_TEMP_SERIES = {
+    StationID.NYC: "HIGHNY",
+    StationID.AUS: "HIGHAUS",
+    StationID.MIA: "HIGHMIA",
+    StationID.MDW: "HIGHCHI",
+    StationID.DEN: "HIGHDEN",
+    StationID.PHL: "HIGHPHIL",
+    StationID.HOU: "HIGHHOU",
+}
+
 BASE_TZ = pytz.timezone("America/Chicago")
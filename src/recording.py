@@ -0,0 +1,171 @@
+"""
+Recording HTTP traffic to disk and replaying it without the network.
+
+Both sessions are drop-in `requests.Session`s, so anything that sends through
+a session (`KalshiClient(session=...)`, `NWSClient(session=...)`) can be
+recorded or replayed. Recordings are gzip-compressed JSONL files with one
+request/response pair per line, appended to as requests are made.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .file_utils import pathlike, safe_open_file
+
+
+def _request_key(method: str, url: str, body: Optional[str]) -> tuple:
+    # Headers are left out on purpose: Kalshi signatures change every request
+    return method, url, body or None
+
+
+def _decode_body(body: Any) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        return body.decode("utf-8", "surrogateescape")
+    return str(body)
+
+
+class ReplayMissError(requests.RequestException):
+    """Raised when a replayed request was never recorded."""
+
+
+class RecordingSession(requests.Session):
+    """
+    A session that sends requests normally and appends every
+    request/response pair to the recording at `path`.
+
+    Parameters
+    ----------
+    path : Path
+        The .jsonl.gz file to append to. Created if missing.
+    """
+
+    @pathlike("path")
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = safe_open_file(path)
+        self.lock = threading.Lock()
+        self.file = gzip.open(self.path, "at", encoding="utf-8")
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:  # type: ignore[override]
+        response = super().send(request, **kwargs)
+        record = {
+            "time": time.time(),
+            "method": request.method,
+            "url": request.url,
+            "body": _decode_body(request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "content": _decode_body(response.content),
+        }
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+        return response
+
+    def close(self) -> None:
+        super().close()
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+class ReplaySession(requests.Session):
+    """
+    A session that answers requests from a recording and never touches the
+    network.
+
+    Requests are matched on method, full URL (including the query) and body.
+    Repeated identical requests get their recorded responses in the order
+    they were recorded, and the last one again once those run out.
+
+    Parameters
+    ----------
+    path : Path
+        The recording written by `RecordingSession`.
+    speed : Optional[float]
+        None serves responses as fast as they are requested. Otherwise each
+        response is held back until its recorded offset from the first
+        response, divided by `speed`, has passed, e.g. `speed=100` replays a
+        morning in a few minutes.
+    """
+
+    @pathlike("path")
+    def __init__(self, path: Path, speed: Optional[float] = None):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.records: dict[tuple, deque] = defaultdict(deque)
+        self.last: dict[tuple, dict] = {}
+        self.first_recorded: Optional[float] = None
+        self.replay_start: Optional[float] = None
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = _request_key(record["method"], record["url"], record["body"])
+                self.records[key].append(record)
+                if self.first_recorded is None:
+                    self.first_recorded = record["time"]
+
+        self.num_served = 0
+        self.num_missed = 0
+
+    def _next_record(self, key: tuple) -> Optional[dict]:
+        with self.lock:
+            queue = self.records.get(key)
+            if queue:
+                self.last[key] = queue.popleft()
+            record = self.last.get(key)
+            if record is None:
+                self.num_missed += 1
+            else:
+                self.num_served += 1
+            if self.replay_start is None:
+                self.replay_start = time.monotonic()
+            return record
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:  # type: ignore[override]
+        key = _request_key(
+            request.method or "", request.url or "", _decode_body(request.body)
+        )
+        record = self._next_record(key)
+        if record is None:
+            raise ReplayMissError(
+                f"No recorded response for {request.method} {request.url}",
+                request=request,
+            )
+
+        if self.speed is not None and self.first_recorded is not None:
+            offset = (record["time"] - self.first_recorded) / self.speed
+            wait = self.replay_start + offset - time.monotonic()  # type: ignore[operator]
+            if wait > 0:
+                time.sleep(wait)
+
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record["reason"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response.encoding = record["encoding"]
+        response.url = record["url"]
+        response.request = request
+        content = record["content"]
+        response._content = (
+            content.encode("utf-8", "surrogateescape") if content is not None else b""
+        )
+        return response
@@ -0,0 +1,342 @@
+"""
+Kelly sizing across many legs at once.
+
+A bet is described by scenarios: `probs[s]` is the probability of scenario
+s and `returns[s, l]` the net return per dollar put on leg l if it happens,
+e.g. 1 / price - 1 for a yes contract that wins and -1 for one that loses.
+With a fraction f[l] of wealth on each leg, wealth is multiplied by
+1 + returns[s] @ f in scenario s, and the Kelly allocation maximizes the
+expected log of that.
+
+For a single binary bet this is the notebook formula
+f = p - (1 - p) / b with b the net odds.
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ..np_utils import vectorized
+
+# Wealth below this counts as ruin in the objective
+MIN_WEALTH = 1e-12
+
+
+@vectorized(arg_name="allocations", row_ndim=1)
+def expected_log_growth(
+    allocations: np.ndarray, probs: np.ndarray, returns: np.ndarray
+) -> np.ndarray:
+    """
+    Expected log2 wealth multiplier of each allocation, in one matrix
+    product over all of them.
+
+    Parameters
+    ----------
+    allocations : np.ndarray
+        (..., L) fractions of wealth per leg.
+    probs : np.ndarray
+        (S,) scenario probabilities.
+    returns : np.ndarray
+        (S, L) net return per dollar of each leg in each scenario.
+    """
+    wealth = 1 + allocations @ returns.T
+    return np.log2(np.maximum(wealth, MIN_WEALTH)) @ probs
+
+
+def _interior_point(
+    probs: np.ndarray,
+    returns: np.ndarray,
+    upper: np.ndarray,
+    A: np.ndarray,
+    b: np.ndarray,
+    tol: float,
+    max_iter: int,
+    warm: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray, int, bool]:
+    """
+    Maximizes `probs @ log(1 + returns @ f)` subject to 0 <= f <= upper and
+    A @ f <= b, with A >= 0, by a primal-dual interior point method.
+    Returns f, the duals of `A @ f <= b`, the iterations taken and whether
+    it converged to `tol` within `max_iter` iterations.
+    `warm`, a feasible allocation, is pulled slightly inside to start from.
+
+    Each Newton step solves one (L, L) system with the exact Hessian of the
+    log growth. Its R^T diag(d) R product over all scenarios dominates, and
+    is formed in float32 as the Gram matrix of R scaled by sqrt(d), which
+    numpy computes with a symmetric rank-k update.
+    """
+    num_legs = returns.shape[1]
+    finite = np.isfinite(upper)
+    upper_finite = upper[finite]
+    # A small equal fraction on every leg is strictly inside every cap
+    start = 0.5 * min(
+        np.min(upper_finite, initial=np.inf),
+        np.min(b / np.maximum(A.sum(axis=1), 1e-300)),
+        1 / num_legs,
+    )
+    f = np.full(num_legs, start)
+    mu = 1e-2
+    if warm is not None:
+        f = 0.9 * warm + 0.1 * f
+        mu = 1e-4
+    returns32 = returns.astype(np.float32)
+
+    # Slacks and duals of f >= 0, f <= upper and A @ f <= b
+    slack_lower, slack_upper, slack_caps = f.copy(), upper_finite - f[finite], b - A @ f
+    dual_lower, dual_upper, dual_caps = (
+        mu / slack_lower,
+        mu / slack_upper,
+        mu / slack_caps,
+    )
+    num_constraints = num_legs + len(upper_finite) + len(b)
+    sigma = 0.1
+
+    wealth = 1 + returns @ f
+    converged = False
+    # One more pass than steps, to check the last step for convergence
+    for iteration in range(max_iter + 1):
+        weights = probs / wealth
+        gradient = -(weights @ returns)
+        constraint_grad = A.T @ dual_caps - dual_lower
+        constraint_grad[finite] += dual_upper
+        mu = (
+            slack_lower @ dual_lower + slack_upper @ dual_upper + slack_caps @ dual_caps
+        ) / num_constraints
+        converged = (
+            num_constraints * mu < tol
+            and np.abs(gradient + constraint_grad).max() < tol
+        )
+        if converged or iteration == max_iter:
+            break
+
+        scaled = returns32 * np.sqrt(weights / wealth).astype(np.float32)[:, None]
+        hessian = (scaled.T @ scaled).astype(np.float64)
+        diagonal = dual_lower / slack_lower
+        diagonal[finite] += dual_upper / slack_upper
+        hessian[np.diag_indices(num_legs)] += diagonal
+        hessian += (A.T * (dual_caps / slack_caps)) @ A
+        barrier = A.T @ (1 / slack_caps) - 1 / slack_lower
+        barrier[finite] += 1 / slack_upper
+        step = np.linalg.solve(hessian, -(gradient + sigma * mu * barrier))
+
+        slack_steps = (step, -step[finite], -(A @ step))
+        slacks = (slack_lower, slack_upper, slack_caps)
+        duals = (dual_lower, dual_upper, dual_caps)
+        dual_steps = tuple(
+            (sigma * mu - dual * slack - dual * slack_step) / slack
+            for slack, dual, slack_step in zip(slacks, duals, slack_steps)
+        )
+        # Stay strictly inside: positive slacks, duals and wealth
+        alpha = 1.0
+        for value, change in zip(slacks + duals, slack_steps + dual_steps):
+            shrinking = change < 0
+            if shrinking.any():
+                ratio = np.min(-value[shrinking] / change[shrinking])
+                alpha = min(alpha, 0.99 * ratio)
+        wealth_step = returns @ step
+        while np.any(wealth + alpha * wealth_step <= 0):
+            alpha /= 2
+
+        f = f + alpha * step
+        wealth = wealth + alpha * wealth_step
+        slack_lower, slack_upper, slack_caps = (
+            slack + alpha * slack_step for slack, slack_step in zip(slacks, slack_steps)
+        )
+        dual_lower, dual_upper, dual_caps = (
+            dual + alpha * dual_step for dual, dual_step in zip(duals, dual_steps)
+        )
+    return f, dual_caps, iteration, converged
+
+
+@dataclass
+class KellyResult:
+    """
+    `fractions` of wealth to put on each leg: the Kelly allocation
+    `full_kelly` under the caps, scaled by the Kelly fraction.
+    `growth` is the expected log2 wealth multiplier of `fractions`.
+    `converged` is False when any solve ran out of iterations, in which
+    case `full_kelly` is only approximately optimal.
+    """
+
+    fractions: np.ndarray
+    full_kelly: np.ndarray
+    growth: float
+    status: str
+    converged: bool
+
+    @property
+    def total(self) -> float:
+        return float(self.fractions.sum())
+
+
+def kelly_allocation(
+    probs: np.ndarray,
+    returns: np.ndarray,
+    fraction: float = 1.0,
+    max_leg: Optional[float | np.ndarray] = None,
+    max_total: float = 1.0,
+    exposures: Optional[np.ndarray] = None,
+    exposure_caps: Optional[np.ndarray] = None,
+    tol: float = 1e-9,
+    max_iter: int = 100,
+) -> KellyResult:
+    """
+    Maximizes the expected log wealth over every leg jointly.
+
+    Parameters
+    ----------
+    probs : np.ndarray
+        (S,) scenario probabilities, summing to 1.
+    returns : np.ndarray
+        (S, L) net return per dollar of each leg in each scenario.
+    fraction : float
+        Fractional Kelly: the capped Kelly allocation is scaled by this,
+        e.g. 0.5 for half Kelly.
+    max_leg : Optional[float | np.ndarray]
+        Largest fraction of wealth on any leg, or per leg.
+    max_total : float
+        Largest fraction of wealth on all legs together.
+    exposures : Optional[np.ndarray]
+        (G, L) weights of each leg in G exposure groups, e.g. 1 for the
+        brackets of a city's markets and 0 elsewhere.
+    exposure_caps : Optional[np.ndarray]
+        (G,) largest fraction of wealth in each group.
+    tol : float
+        Tolerance on the optimality conditions.
+    max_iter : int
+        Most interior point iterations per solve. If they run out, the
+        result has `converged` False.
+    """
+    if max_iter < 0:
+        raise ValueError(f"max_iter must be non-negative, got {max_iter}")
+    probs = np.asarray(probs, dtype=np.float64)
+    returns = np.asarray(returns, dtype=np.float64)
+    num_legs = returns.shape[1]
+
+    upper = np.full(num_legs, np.inf)
+    if max_leg is not None:
+        upper[:] = max_leg
+    A = np.ones((1, num_legs))
+    b = np.array([max_total], dtype=np.float64)
+    if exposures is not None:
+        assert exposure_caps is not None
+        A = np.concatenate([A, np.asarray(exposures, dtype=np.float64)])
+        b = np.concatenate([b, np.asarray(exposure_caps, dtype=np.float64)])
+
+    # Legs capped at zero, alone or through a group, stay at zero. Groups
+    # capped at zero then constrain nothing else and are dropped, so every
+    # cap the solver sees is positive and it can start strictly inside them.
+    blocked = (upper <= 0) | ((A > 0) & (b[:, None] <= 0)).any(axis=0)
+    A, b = A[b > 0], b[b > 0]
+
+    # Legs are only optimized once their marginal growth exceeds what the
+    # caps they count against charge for it. Legs left out at the optimum
+    # over the others then satisfy the optimality conditions at zero, and
+    # most never enter.
+    full_kelly = np.zeros(num_legs)
+    status = "No leg has a positive expected return"
+    converged = True
+    num_solves = total_iterations = 0
+    marginal = probs @ returns
+    charge = np.zeros(num_legs)
+    working = np.zeros(num_legs, dtype=bool)
+    while True:
+        entering = ~working & ~blocked & (marginal - charge > tol)
+        if not entering.any():
+            break
+        working |= entering
+        allocation, cap_duals, iterations, solved = _interior_point(
+            probs,
+            returns[:, working],
+            upper[working],
+            A[:, working],
+            b,
+            tol,
+            max_iter,
+            full_kelly[working] if full_kelly.any() else None,
+        )
+        full_kelly[:] = 0
+        full_kelly[working] = allocation
+        # Every solve counts: the legs entering next are picked from the last
+        converged = converged and solved
+        num_solves += 1
+        total_iterations += iterations
+        status = "%s in %d iterations over %d solve%s on %d legs" % (
+            "Converged" if converged else "Did not converge",
+            total_iterations,
+            num_solves,
+            "" if num_solves == 1 else "s",
+            working.sum(),
+        )
+        marginal = (probs / (1 + returns @ full_kelly)) @ returns
+        charge = A.T @ cap_duals
+
+    full_kelly = np.clip(full_kelly, 0, upper)
+    fractions = full_kelly * fraction
+    return KellyResult(
+        fractions=fractions,
+        full_kelly=full_kelly,
+        growth=float(expected_log_growth(fractions, probs, returns)),
+        status=status,
+        converged=converged,
+    )
+
+
+def contract_returns(
+    outcomes: np.ndarray, prices: np.ndarray, fees: float | np.ndarray = 0.0
+) -> np.ndarray:
+    """
+    Net returns per dollar of contracts bought at `prices` dollars plus
+    `fees` dollars each, paying $1 in the scenarios where `outcomes` is 1.
+
+    Parameters
+    ----------
+    outcomes : np.ndarray
+        (S, L) 1 where a leg's contract pays out.
+    prices : np.ndarray
+        (L,) prices in dollars.
+    fees : float | np.ndarray
+        Fee per contract in dollars, e.g. `trading_fee(count, price) /
+        (100 * count)`.
+    """
+    cost = np.asarray(prices, dtype=np.float64) + fees
+    return outcomes / cost - 1
+
+
+def bracket_scenarios(
+    event_probs: Sequence[np.ndarray],
+    max_scenarios: int = 100_000,
+    num_samples: int = 20_000,
+    rng: Optional[np.random.Generator] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Joint outcomes of independent bracket events, e.g. the high temperature
+    brackets of several cities. Each event resolves exactly one of its
+    brackets yes.
+
+    Returns (probs, outcomes) with outcomes (S, total brackets), one column
+    per bracket in event order. Every joint outcome is listed when there
+    are at most `max_scenarios`, otherwise `num_samples` are drawn with
+    equal probabilities.
+    """
+    event_probs = [np.asarray(p, dtype=np.float64) for p in event_probs]
+    sizes = [len(p) for p in event_probs]
+    offsets = np.cumsum([0] + sizes[:-1])
+    if np.prod(sizes, dtype=np.float64) <= max_scenarios:
+        winners = np.array(list(product(*map(range, sizes))), dtype=np.int64)
+        winners = winners.reshape(-1, len(sizes))
+        probs = np.prod([p[winners[:, e]] for e, p in enumerate(event_probs)], axis=0)
+    else:
+        rng = rng if rng is not None else np.random.default_rng()
+        winners = np.stack(
+            [rng.choice(len(p), size=num_samples, p=p / p.sum()) for p in event_probs],
+            axis=1,
+        )
+        probs = np.full(num_samples, 1 / num_samples)
+
+    outcomes = np.zeros((len(winners), sum(sizes)), dtype=np.int8)
+    rows = np.arange(len(winners))[:, None]
+    outcomes[rows, winners + offsets] = 1
+    return probs, outcomes
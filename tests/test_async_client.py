@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import time
+
+import pytest
+import aiohttp
+from aiohttp import web
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from src.kalshi.async_client import AsyncExchangeClient
+from src.kalshi.errors import HttpError
+from src.kalshi.rate_limiter import RateLimiter
+from src.kalshi.signing import RequestSigner
+
+API_PREFIX = "/trade-api/v2"
+NUM_MARKETS = 23
+
+
+def verify(public_key: rsa.RSAPublicKey, request: web.Request) -> bool:
+    message = (
+        request.headers["KALSHI-ACCESS-TIMESTAMP"] + request.method + request.path
+    ).encode("utf-8")
+    try:
+        public_key.verify(
+            base64.b64decode(request.headers["KALSHI-ACCESS-SIGNATURE"]),
+            message,
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.DIGEST_LENGTH,
+            ),
+            hashes.SHA256(),
+        )
+    except InvalidSignature:
+        return False
+    return True
+
+
+def make_app(public_key: rsa.RSAPublicKey, requests: list) -> web.Application:
+    """A stub exchange that checks signatures and pages markets by cursor."""
+    markets = [{"ticker": f"STUB-{i}"} for i in range(NUM_MARKETS)]
+
+    async def get_markets(request: web.Request) -> web.Response:
+        requests.append((time.monotonic(), dict(request.query)))
+        if not verify(public_key, request):
+            return web.json_response({"error": "bad signature"}, status=401)
+        start = int(request.query.get("cursor") or 0)
+        limit = int(request.query.get("limit") or 10)
+        end = min(start + limit, len(markets))
+        cursor = str(end) if end < len(markets) else ""
+        return web.json_response({"markets": markets[start:end], "cursor": cursor})
+
+    async def get_orderbook(request: web.Request) -> web.Response:
+        requests.append((time.monotonic(), dict(request.query)))
+        if not verify(public_key, request):
+            return web.json_response({"error": "bad signature"}, status=401)
+        ticker = request.match_info["ticker"]
+        return web.json_response({"orderbook": {"yes": [[40, 10]], "ticker": ticker}})
+
+    app = web.Application()
+    app.router.add_get(API_PREFIX + "/markets", get_markets)
+    app.router.add_get(API_PREFIX + "/markets/{ticker}/orderbook", get_orderbook)
+    return app
+
+
+async def with_stub(test, **client_kwargs):
+    """Runs `test(client, requests)` against a stub on a free local port."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    requests: list = []
+    runner = web.AppRunner(make_app(private_key.public_key(), requests))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    client_kwargs.setdefault("retry_policy", None)
+    client = AsyncExchangeClient(
+        f"http://127.0.0.1:{port}{API_PREFIX}", "test-key", private_key, **client_kwargs
+    )
+    try:
+        return await test(client, requests)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def test_requests_are_signed():
+    async def test(client, requests):
+        # Query parameters are left out of the signed message
+        books = await client.get_orderbooks(["A", "B", "C"], depth=5)
+        assert [book["orderbook"]["ticker"] for book in books.values()] == list("ABC")
+        assert all(query == {"depth": "5"} for _, query in requests)
+
+    asyncio.run(with_stub(test))
+
+
+def test_wrong_key_is_rejected():
+    async def test(client, requests):
+        client.signer = RequestSigner(
+            rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        )
+        with pytest.raises(HttpError) as error:
+            await client.get_orderbook("A")
+        assert error.value.status == 401
+
+    asyncio.run(with_stub(test))
+
+
+def test_pagination_follows_cursors():
+    async def test(client, requests):
+        tickers = [m["ticker"] async for m in client.iter_markets(page_size=5)]
+        assert tickers == [f"STUB-{i}" for i in range(NUM_MARKETS)]
+        assert len(requests) == 5
+
+        requests.clear()
+        first = [m async for m in client.iter_markets(page_size=5, max_records=7)]
+        assert len(first) == 7
+        assert [query["limit"] for _, query in requests] == ["5", "2"]
+
+    asyncio.run(with_stub(test))
+
+
+def test_rate_limiter_spaces_reads():
+    reads_per_second = 20
+
+    async def test(client, requests):
+        await asyncio.gather(*(client.get_orderbook(f"T{i}") for i in range(10)))
+        return [t for t, _ in requests]
+
+    limiter = RateLimiter(reads_per_second, read_burst=1)
+    times = sorted(asyncio.run(with_stub(test, rate_limiter=limiter)))
+    # One token up front, then one every 1 / rate seconds
+    assert times[-1] - times[0] >= 9 / reads_per_second * 0.9
+    assert limiter.stats()["read"]["num_waited"] == 9
+
+
+def test_injected_session_must_be_aiohttp():
+    from requests import Session
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with pytest.raises(TypeError):
+        AsyncExchangeClient(
+            "http://127.0.0.1:1", "test-key", private_key, session=Session()
+        )
+
+    async def scenario():
+        session = aiohttp.ClientSession()
+
+        async def test(client, requests):
+            assert client.get_session() is session
+            await client.get_orderbook("A")
+            assert len(requests) == 1
+
+        await with_stub(test, session=session)
+        # The client owns the session it was given
+        assert session.closed
+
+    asyncio.run(scenario())
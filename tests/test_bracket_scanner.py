@@ -0,0 +1,206 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.arb import bracket_scanner
+from src.arb.bracket_scanner import BracketBooks, scan
+from src.gateway.stub_exchange import StubExchange
+from src.kalshi.api_client import ExchangeClient
+from src.kalshi.cache import MetadataCache
+from src.kalshi.fees import TAKER_FEE_BPS, trading_fee
+from src.kalshi.market_index import MarketIndex
+
+EVENTS = ["HIGHNY-24NOV10", "HIGHNY-24NOV11"]
+
+
+def test_fetch_skips_events_with_a_closed_bracket():
+    stub = StubExchange(
+        tickers=[f"{event}-B{70 + i}.5" for event in EVENTS for i in range(4)]
+    )
+    stub.start()
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = ExchangeClient(
+        stub.url, "stub", private_key, metadata_cache=MetadataCache()
+    )
+    try:
+        index = MarketIndex()
+        index.refresh(client, ["HIGHNY"])
+        closed = index.get(f"{EVENTS[1]}-B70.5")
+        index.add_markets([replace(closed, status="closed")])
+
+        books = BracketBooks.fetch(client, index, EVENTS)
+        assert books.event_tickers == EVENTS[:1]
+        assert books.num_markets == 4
+        # The stub's no bid at 55 is a yes ask at 45
+        assert (books.prices["yes"][0, :, 0] == 45).all()
+    finally:
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+
+
+def test_fetch_skips_events_with_an_unknown_strike_type():
+    stub = StubExchange(
+        tickers=[f"{event}-B{70 + i}.5" for event in EVENTS for i in range(4)]
+    )
+    stub.start()
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = ExchangeClient(
+        stub.url, "stub", private_key, metadata_cache=MetadataCache()
+    )
+    try:
+        index = MarketIndex()
+        index.refresh(client, ["HIGHNY"])
+        custom = index.get(f"{EVENTS[0]}-B71.5")
+        index.add_markets([replace(custom, strike_type="custom")])
+
+        assert index.brackets(EVENTS[0]).unbracketed == [index.get(custom.ticker)]
+        books = BracketBooks.fetch(client, index, EVENTS)
+        assert books.event_tickers == EVENTS[1:]
+    finally:
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+
+
+def random_events(rng, num_events=150, max_brackets=5, max_levels=4):
+    """Events of 1 to `max_brackets` brackets with ragged bid ladders, priced
+    near a fair split so both sides have arbitrages now and then."""
+    events = {}
+    for e in range(num_events):
+        k = int(rng.integers(1, max_brackets + 1))
+        books = {}
+        for b in range(k):
+            fair = 100 // k
+            book = {}
+            # Yes asks come from no bids, no asks from yes bids
+            for side, center in (("no", 100 - fair), ("yes", fair)):
+                n = int(rng.integers(0, max_levels + 1))
+                prices = rng.choice(
+                    np.arange(max(center - 12, 1), min(center + 12, 99)),
+                    size=n,
+                    replace=False,
+                )
+                sizes = rng.integers(1, 30, size=n)
+                book[side] = [[int(p), int(s)] for p, s in zip(prices, sizes)]
+            books[f"EV{e}-B{b}"] = {"orderbook": book}
+        events[f"EV{e}"] = books
+    return events
+
+
+def ask_ladder(book: dict, side: str, levels=None) -> list[tuple[int, int]]:
+    other = "no" if side == "yes" else "yes"
+    bids = sorted(book["orderbook"][other], key=lambda level: -level[0])[:levels]
+    return [(100 - price, size) for price, size in bids]
+
+
+def walk(ladder, sets, fee_bps):
+    # Cost, fees and worst price of buying `sets` contracts up the ladder
+    cost = fees = limit = 0
+    remaining = sets
+    for price, size in ladder:
+        take = min(size, remaining)
+        if take == 0:
+            break
+        cost += take * price
+        fees += int(trading_fee(take, price, fee_bps))
+        limit = price
+        remaining -= take
+    return cost, fees, limit
+
+
+def brute_force(events, fee_bps, min_edge, max_sets=None, levels=None, every=False):
+    """
+    The best arbitrage per event and side by a plain loop. Evaluates every
+    number of sets with `every`, otherwise only the ladder breakpoints.
+    """
+    arbs = {}
+    for event_ticker, books in events.items():
+        k = len(books)
+        if k < 2:
+            continue
+        for side, payout in (("yes", 100), ("no", (k - 1) * 100)):
+            ladders = [ask_ladder(book, side, levels) for book in books.values()]
+            depth = min(sum(size for _, size in ladder) for ladder in ladders)
+            if max_sets is not None:
+                depth = min(depth, max_sets)
+            if every:
+                candidates = range(depth + 1)
+            else:
+                cums = {
+                    min(int(c), depth)
+                    for ladder in ladders
+                    for c in np.cumsum([size for _, size in ladder])
+                }
+                candidates = sorted(cums | {depth})
+            best = None
+            for sets in candidates:
+                walks = [walk(ladder, sets, fee_bps) for ladder in ladders]
+                cost = sum(w[0] for w in walks)
+                fees = sum(w[1] for w in walks)
+                edge = sets * payout - cost - fees
+                if best is None or edge > best[0]:
+                    best = (edge, sets, cost, fees, [w[2] for w in walks])
+            edge, sets, cost, fees, limits = best
+            if sets > 0 and edge >= min_edge:
+                arbs[event_ticker, side] = (sets, cost, fees, limits)
+    return arbs
+
+
+def scanned(arbs):
+    return {
+        (arb.event_ticker, arb.side): (
+            arb.sets,
+            arb.cost,
+            arb.fees,
+            arb.limit_prices.tolist(),
+        )
+        for arb in arbs
+    }
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("max_sets", [None, 7])
+def test_scan_matches_brute_force(seed, max_sets):
+    events = random_events(np.random.default_rng(seed))
+    arbs = scan(BracketBooks(events), min_edge=1, max_sets=max_sets)
+    expected = brute_force(events, TAKER_FEE_BPS, 1, max_sets=max_sets)
+    assert {side for _, side in expected} == {"yes", "no"}
+    assert scanned(arbs) == expected
+    assert [arb.edge for arb in arbs] == sorted(
+        (arb.edge for arb in arbs), reverse=True
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_scan_is_optimal_over_every_size_without_fees(seed):
+    # Without fee rounding the edge is linear between breakpoints, so no
+    # number of sets beats the best breakpoint
+    events = random_events(np.random.default_rng(seed))
+    arbs = scan(BracketBooks(events), fee_bps=0, min_edge=1)
+    best = brute_force(events, 0, 1, every=True)
+    assert {(arb.event_ticker, arb.side): arb.edge for arb in arbs} == {
+        (event_ticker, side): sets * (100 if side == "yes" else (k - 1) * 100)
+        - cost
+        - fees
+        for (event_ticker, side), (sets, cost, fees, _) in best.items()
+        for k in [len(events[event_ticker])]
+    }
+
+
+def test_scan_keeps_only_the_best_levels():
+    events = random_events(np.random.default_rng(7))
+    arbs = scan(BracketBooks(events, levels=2))
+    assert scanned(arbs) == brute_force(events, TAKER_FEE_BPS, 1, levels=2)
+
+
+def test_scan_chunks_match_a_single_pass(monkeypatch):
+    events = random_events(np.random.default_rng(11), max_brackets=6, max_levels=6)
+    books = BracketBooks(events)
+    whole = scanned(scan(books))
+    monkeypatch.setattr(bracket_scanner, "MAX_SCAN_ELEMENTS", 1)
+    assert scanned(scan(books)) == whole
+    monkeypatch.setattr(bracket_scanner, "MAX_SCAN_ELEMENTS", 5 * 36**2)
+    assert scanned(scan(books)) == whole
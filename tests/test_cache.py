@@ -0,0 +1,51 @@
+import time
+
+from src.kalshi.cache import MetadataCache
+
+
+def market_response(ticker: str, close_ts: float) -> dict:
+    close_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(close_ts))
+    return {"market": {"ticker": ticker, "yes_bid": 40, "close_time": close_time}}
+
+
+def test_only_metadata_paths_are_cacheable():
+    assert MetadataCache.is_cacheable("/markets/KXHIGHNY-24NOV10-B70.5")
+    assert MetadataCache.is_cacheable("/events/KXHIGHNY-24NOV10")
+    assert MetadataCache.is_cacheable("/series/KXHIGHNY")
+    assert not MetadataCache.is_cacheable("/markets/trades")
+    assert not MetadataCache.is_cacheable("/markets/trades?ticker=KXHIGHNY")
+    assert not MetadataCache.is_cacheable("/markets/KXHIGHNY-24NOV10-B70.5/orderbook")
+    assert not MetadataCache.is_cacheable("/markets")
+    assert not MetadataCache.is_cacheable("/portfolio/orders")
+
+
+def test_disk_entries_expire(tmp_path, monkeypatch):
+    now = time.time()
+    cache = MetadataCache(path=tmp_path / "metadata")
+    cache.put("/markets/SOON", market_response("SOON", now + 2))
+    cache.put("/markets/LATER", market_response("LATER", now + 3600))
+    cache.close()
+
+    monkeypatch.setattr(time, "time", lambda: now + 5)
+    cache = MetadataCache(path=tmp_path / "metadata")
+    assert "/markets/SOON" not in cache.disk
+    assert cache.get("/markets/SOON", static_only=True) is None
+    assert cache.get("/markets/LATER", static_only=True) == {
+        "market": {
+            "ticker": "LATER",
+            "close_time": market_response("LATER", now + 3600)["market"]["close_time"],
+        }
+    }
+    cache.close()
+
+
+def test_disk_is_bounded(tmp_path):
+    now = time.time()
+    cache = MetadataCache(path=tmp_path / "metadata", disk_maxsize=10)
+    for i in range(25):
+        cache.put(f"/markets/M{i}", market_response(f"M{i}", now + 3600 * (25 - i)))
+        assert cache.disk_size == len(cache.disk) <= 10
+    # The soonest to close went first
+    assert "/markets/M0" in cache.disk
+    assert "/markets/M24" not in cache.disk
+    cache.close()
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.kalshi.coalesce import RequestCoalescer
+
+
+def wait_for_followers(coalescer: RequestCoalescer, num_followers: int) -> None:
+    deadline = time.monotonic() + 5
+    while coalescer.stats()["followers"] < num_followers:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_request():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 1}
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(coalescer.run, "key", fetch) for _ in range(4)]
+        wait_for_followers(coalescer, 3)
+        release.set()
+        results = [future.result(5) for future in futures]
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert coalescer.stats() == {"leaders": 1, "followers": 3, "fresh_hits": 0}
+
+
+def test_errors_reach_every_caller():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(coalescer.run, "key", fail) for _ in range(2)]
+        wait_for_followers(coalescer, 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(5)
+    # A failed request is not reused
+    assert coalescer.run("key", lambda: 2) == 2
+
+
+def test_fresh_results_are_reused():
+    coalescer = RequestCoalescer(freshness=60)
+    assert coalescer.run("key", lambda: 1) == 1
+    assert coalescer.run("key", lambda: 2) == 1
+    assert coalescer.stats()["fresh_hits"] == 1
+
+
+async def _start(coalescer: RequestCoalescer, fetch, num_callers: int):
+    tasks = [
+        asyncio.create_task(coalescer.run_async("key", fetch))
+        for _ in range(num_callers)
+    ]
+    # Let every caller join the in-flight request
+    await asyncio.sleep(0)
+    return tasks
+
+
+def test_async_calls_share_one_request():
+    async def test():
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return {"value": 1}
+
+        tasks = await _start(coalescer, fetch, 3)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+        async def fail():
+            raise ValueError("boom")
+
+        tasks = await _start(coalescer, fail, 2)
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            assert isinstance(result, ValueError)
+        assert not coalescer.inflight_async
+
+    asyncio.run(test())
+
+
+@pytest.mark.parametrize("cancelled", [0, 1])
+def test_async_cancelling_one_caller_spares_the_other(cancelled):
+    # 0 cancels the leader, 1 the follower
+    async def test():
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 1
+
+        tasks = await _start(coalescer, fetch, 2)
+        tasks[cancelled].cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await tasks[cancelled]
+        assert await tasks[1 - cancelled] == 1
+        assert not coalescer.inflight_async
+
+    asyncio.run(test())
@@ -0,0 +1,201 @@
+import os
+import stat
+import time
+import uuid
+from multiprocessing import AuthenticationError
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.gateway import GatewayClient, GatewayServer
+from src.gateway.server import ClientState, FairScheduler
+from src.gateway.stub_exchange import StubExchange
+from src.kalshi.api_client import ExchangeClient
+from src.kalshi.cache import MetadataCache
+from src.kalshi.errors import HttpError
+
+TICKER = "STUB-24NOV10-B70.5"
+
+
+@pytest.fixture
+def gateway(tmp_path):
+    """A gateway on a free local port in front of a stub exchange."""
+    stub = StubExchange()
+    stub.start()
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = ExchangeClient(
+        stub.url, "stub", private_key, metadata_cache=MetadataCache()
+    )
+    authkey_path = tmp_path / "gateway.key"
+    server = GatewayServer(client, ("127.0.0.1", 0), authkey_path=authkey_path)
+    server.start()
+    try:
+        yield server, authkey_path
+    finally:
+        server.close()
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+
+
+def place(gateway: GatewayClient, count: int = 5) -> dict:
+    return gateway.create_order(
+        TICKER, str(uuid.uuid4()), "yes", "buy", count, "limit", yes_price=40
+    )["order"]
+
+
+def test_authkey_is_generated_owner_only(gateway):
+    server, authkey_path = gateway
+    assert stat.S_IMODE(os.stat(authkey_path).st_mode) == 0o600
+    assert len(authkey_path.read_bytes()) >= 32
+
+    with pytest.raises(AuthenticationError):
+        GatewayClient(server.address, authkey=b"kalshi-gateway", timeout=5)
+    # The gateway keeps accepting clients with the right key
+    with GatewayClient(server.address, authkey_path=authkey_path, timeout=5) as client:
+        assert client.get_balance() == {"balance": 100_000}
+
+
+def test_place_list_and_cancel_orders(gateway):
+    server, authkey_path = gateway
+    with GatewayClient(server.address, authkey_path=authkey_path, timeout=5) as client:
+        orders = [place(client, count) for count in (3, 4, 5)]
+        resting = client.get_orders(status="resting")["orders"]
+        assert {o["order_id"] for o in resting} == {o["order_id"] for o in orders}
+
+        canceled = client.cancel_order(orders[0]["order_id"])
+        assert canceled["order"]["status"] == "canceled"
+        assert canceled["reduced_by"] == 3
+        with pytest.raises(HttpError) as error:
+            client.cancel_order(orders[0]["order_id"])
+        assert error.value.status == 404
+
+        ids = [order["order_id"] for order in orders[1:]]
+        batch = client.batch_cancel_orders(ids)["orders"]
+        assert [o["order_id"] for o in batch] == ids
+        assert [o["reduced_by"] for o in batch] == [4, 5]
+        assert client.get_orders(status="resting")["orders"] == []
+
+
+def test_scheduler_serves_clients_round_robin_by_weight():
+    scheduler = FairScheduler()
+    heavy = ClientState("heavy", None, weight=3)
+    light = ClientState("light", None, weight=1)
+    for i in range(9):
+        scheduler.put(heavy, {"id": i})
+    for i in range(3):
+        scheduler.put(light, {"id": i})
+
+    served = []
+    for _ in range(12):
+        client, _ = scheduler.get()
+        served.append(client.name[0])
+    assert "".join(served) == "hhhlhhhlhhhl"
+    assert not heavy.active and not light.active
+
+
+def test_flooding_client_only_delays_itself(tmp_path):
+    stub = StubExchange(latency=0.02)
+    stub.start()
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = ExchangeClient(
+        stub.url, "stub", private_key, metadata_cache=MetadataCache()
+    )
+    authkey_path = tmp_path / "gateway.key"
+    server = GatewayServer(
+        client, ("127.0.0.1", 0), authkey_path=authkey_path, workers=1
+    )
+    server.start()
+    try:
+        flood = GatewayClient(server.address, authkey_path=authkey_path, timeout=5)
+        other = GatewayClient(server.address, authkey_path=authkey_path, timeout=5)
+        served = []
+        futures = [flood.submit("get_balance") for _ in range(20)]
+        for future in futures:
+            future.add_done_callback(lambda _: served.append("flood"))
+        deadline = time.monotonic() + 5
+        while server.stats()["clients"][flood.name]["requests"] < 20:
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+
+        before = len(served)
+        future = other.submit("get_balance")
+        future.add_done_callback(lambda _: served.append("other"))
+        assert future.result(5) == {"balance": 100_000}
+        for future in futures:
+            future.result(5)
+        # Served after the flood's request in progress, not after its queue
+        assert served.index("other") <= before + 2
+        assert len(served) == 21
+        flood.close()
+        other.close()
+    finally:
+        server.close()
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+
+
+def test_identical_market_data_requests_are_sent_once(tmp_path):
+    stub = StubExchange(latency=0.2)
+    stub.start()
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    # Without the client's own coalescer, only the gateway's dedupes
+    client = ExchangeClient(
+        stub.url,
+        "stub",
+        private_key,
+        metadata_cache=MetadataCache(),
+        coalescer=None,
+    )
+    authkey_path = tmp_path / "gateway.key"
+    server = GatewayServer(client, ("127.0.0.1", 0), authkey_path=authkey_path)
+    server.start()
+    clients = [
+        GatewayClient(server.address, authkey_path=authkey_path, timeout=5)
+        for _ in range(4)
+    ]
+    try:
+        futures = [c.submit("get_orderbook", TICKER, depth=5) for c in clients]
+        books = [future.result(5) for future in futures]
+        assert all(book == books[0] for book in books)
+        path = f"/markets/{TICKER}/orderbook"
+        assert stub.num_requests[path] == 1
+        assert server.stats()["deduplicated"]["followers"] == 3
+    finally:
+        for c in clients:
+            c.close()
+        server.close()
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+
+
+def test_duplicate_client_order_id_is_rejected(gateway):
+    server, authkey_path = gateway
+    first = GatewayClient(server.address, authkey_path=authkey_path, timeout=5)
+    second = GatewayClient(server.address, authkey_path=authkey_path, timeout=5)
+    client_order_id = str(uuid.uuid4())
+    with first, second:
+        first.create_order(TICKER, client_order_id, "yes", "buy", 5, "limit", 40)
+        with pytest.raises(HttpError) as error:
+            second.create_order(TICKER, client_order_id, "yes", "buy", 5, "limit", 40)
+        assert error.value.status == 409
+        assert len(first.get_orders(status="resting")["orders"]) == 1
+
+        batch = second.batch_create_orders(
+            [
+                {
+                    "ticker": TICKER,
+                    "client_order_id": client_order_id,
+                    "side": "yes",
+                    "action": "buy",
+                    "count": 1,
+                    "type": "limit",
+                    "yes_price": 40,
+                }
+            ]
+        )["orders"]
+        assert batch[0]["client_order_id"] == client_order_id
+        assert batch[0]["order"] is None
+        assert batch[0]["error"]["code"] == "order_already_exists"
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+from src.kalshi.history import TRADES, HistoryDownloader, load_history
+from src.kalshi.pagination import paginate
+
+BASE_TS = 1_731_240_000
+
+
+def make_trade(trade_id: str, ts: int) -> dict:
+    return {
+        "trade_id": trade_id,
+        "ticker": "HIGHNY-24NOV10-B70.5",
+        "count": 1,
+        "yes_price": 40,
+        "no_price": 60,
+        "taker_side": "yes",
+        "created_time": datetime.fromtimestamp(ts, timezone.utc)
+        .isoformat()
+        .replace("+00:00", "Z"),
+    }
+
+
+class FakeClient:
+    """An exchange holding one market's trades, served newest first."""
+
+    def __init__(self):
+        self.trades: list[dict] = []
+        self.min_ts_seen: list = []
+
+    def iter_markets(self, **kwargs):
+        return iter([{"ticker": "HIGHNY-24NOV10-B70.5", "status": "active"}])
+
+    def paginate(self, fetch, key, **kwargs):
+        return paginate(fetch, key, prefetch=False, **kwargs)
+
+    def get_trades(self, ticker=None, limit=None, cursor=None, min_ts=None):
+        self.min_ts_seen.append(min_ts)
+        trades = sorted(
+            (
+                trade
+                for trade in self.trades
+                if min_ts is None
+                or datetime.fromisoformat(trade["created_time"]).timestamp() >= min_ts
+            ),
+            key=lambda trade: trade["created_time"],
+            reverse=True,
+        )
+        start = int(cursor or 0)
+        end = start + (limit or 100)
+        return {
+            "trades": trades[start:end],
+            "cursor": str(end) if end < len(trades) else "",
+        }
+
+
+def test_trades_resume_inside_the_watermark_second(tmp_path):
+    client = FakeClient()
+    client.trades = [
+        make_trade("t0", BASE_TS - 5),
+        make_trade("t1", BASE_TS),
+        make_trade("t2", BASE_TS),
+    ]
+    HistoryDownloader(client, tmp_path, page_size=2).download_series(
+        "HIGHNY", kinds=[TRADES]
+    )
+
+    # Another trade lands in the watermark second after the download
+    client.trades += [make_trade("t3", BASE_TS), make_trade("t4", BASE_TS + 10)]
+    (result,) = HistoryDownloader(client, tmp_path, page_size=2).download_series(
+        "HIGHNY", kinds=[TRADES]
+    )
+    assert client.min_ts_seen[-1] == BASE_TS
+    assert result.num_rows == 2
+
+    (result,) = HistoryDownloader(client, tmp_path).download_series(
+        "HIGHNY", kinds=[TRADES]
+    )
+    assert client.min_ts_seen[-1] == BASE_TS + 10
+    assert result.num_rows == 0
+
+    trades = load_history(tmp_path, TRADES, "HIGHNY")
+    assert sorted(trades["trade_id"]) == ["t0", "t1", "t2", "t3", "t4"]
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from scipy.optimize import minimize
+
+from src.sizing.kelly import (
+    bracket_scenarios,
+    contract_returns,
+    expected_log_growth,
+    kelly_allocation,
+)
+
+# A binary bet at even odds won 60% of the time: Kelly stakes 0.6 - 0.4 = 0.2
+PROBS = np.array([0.6, 0.4])
+RETURNS = contract_returns(np.array([[1], [0]]), [0.5])
+
+
+def test_single_bet_matches_formula():
+    result = kelly_allocation(PROBS, RETURNS)
+    assert result.converged
+    assert result.status.startswith("Converged")
+    assert result.full_kelly[0] == pytest.approx(0.2, abs=1e-6)
+
+
+def test_running_out_of_iterations_is_reported():
+    result = kelly_allocation(PROBS, RETURNS, max_iter=3)
+    assert not result.converged
+    assert result.status.startswith("Did not converge in 3 iterations")
+
+    result = kelly_allocation(PROBS, RETURNS, max_iter=0)
+    assert not result.converged
+    assert result.status.startswith("Did not converge in 0 iterations")
+
+    with pytest.raises(ValueError):
+        kelly_allocation(PROBS, RETURNS, max_iter=-1)
+
+
+def test_no_positive_edge():
+    result = kelly_allocation(np.array([0.4, 0.6]), RETURNS)
+    assert result.converged
+    assert result.total == 0
+
+
+def reference_solve(probs, returns, max_leg, max_total, exposures, exposure_caps):
+    """The same problem through a general purpose solver."""
+    num_legs = returns.shape[1]
+    A = np.vstack([np.ones(num_legs), exposures])
+    b = np.concatenate([[max_total], exposure_caps])
+    result = minimize(
+        lambda f: -float(expected_log_growth(f, probs, returns)),
+        np.zeros(num_legs),
+        jac=lambda f: -(probs / (1 + returns @ f)) @ returns / np.log(2),
+        method="SLSQP",
+        bounds=[(0, max_leg)] * num_legs,
+        constraints=[{"type": "ineq", "fun": lambda f: b - A @ f, "jac": lambda f: -A}],
+        options={"ftol": 1e-15, "maxiter": 1000},
+    )
+    assert result.success, result.message
+    return result.x
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_capped_legs_match_reference_solver(seed):
+    rng = np.random.default_rng(seed)
+    cities, brackets = 3, 5
+    true = [rng.dirichlet(np.full(brackets, 2.0)) for _ in range(cities)]
+    prices = np.concatenate(
+        [np.clip(q * rng.uniform(0.7, 1.3, brackets), 0.01, 0.99) for q in true]
+    )
+    probs, outcomes = bracket_scenarios(true)
+    returns = contract_returns(outcomes, prices)
+    exposures = np.kron(np.eye(cities), np.ones(brackets))
+    caps = dict(
+        max_leg=0.1, max_total=0.4, exposures=exposures, exposure_caps=[0.2] * cities
+    )
+
+    result = kelly_allocation(probs, returns, **caps)
+    assert result.converged
+    reference = reference_solve(probs, returns, **caps)
+    reference_growth = float(expected_log_growth(reference, probs, returns))
+    assert result.growth == pytest.approx(reference_growth, abs=1e-8)
+    assert result.full_kelly.max() <= 0.1 + 1e-9
+    assert (exposures @ result.full_kelly).max() <= 0.2 + 1e-9
+
+
+def test_zero_caps_keep_legs_out():
+    rng = np.random.default_rng(0)
+    true = [rng.dirichlet(np.full(4, 2.0)) for _ in range(2)]
+    prices = np.concatenate([0.8 * q for q in true])
+    probs, outcomes = bracket_scenarios(true)
+    returns = contract_returns(outcomes, prices)
+
+    result = kelly_allocation(probs, returns, max_leg=0.0)
+    assert result.converged
+    assert (result.full_kelly == 0).all()
+
+    exposures = np.kron(np.eye(2), np.ones(4))
+    result = kelly_allocation(
+        probs, returns, exposures=exposures, exposure_caps=[0.0, 0.3]
+    )
+    assert result.converged
+    assert np.isfinite(result.full_kelly).all()
+    assert (result.full_kelly[:4] == 0).all()
+    assert result.full_kelly[4:].sum() > 0
@@ -0,0 +1,46 @@
+from dataclasses import replace
+from datetime import date
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.gateway.stub_exchange import StubExchange
+from src.kalshi.api_client import ExchangeClient
+from src.kalshi.cache import MetadataCache
+from src.kalshi.market_index import MarketIndex
+from src.params import StationID
+
+TICKERS = [f"HIGHNY-24NOV10-B{70 + i}.5" for i in range(4)]
+
+
+@pytest.fixture
+def index():
+    stub = StubExchange(tickers=TICKERS)
+    stub.start()
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = ExchangeClient(
+        stub.url, "stub", private_key, metadata_cache=MetadataCache()
+    )
+    index = MarketIndex()
+    try:
+        assert index.refresh(client, [StationID.NYC]) == len(TICKERS)
+        yield index
+    finally:
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+
+
+def test_closing_between_keeps_trading_markets(index):
+    closing = index.closing_between(0, float("inf"))
+    assert sorted(market.ticker for market in closing) == TICKERS
+
+    index.add_markets([replace(index.get(TICKERS[0]), status="closed")])
+    closing = index.closing_between(0, float("inf"))
+    assert sorted(market.ticker for market in closing) == TICKERS[1:]
+    assert len(index.closing_between(0, float("inf"), status=None)) == len(TICKERS)
+
+
+def test_find_bracket(index):
+    market = index.find_bracket(StationID.NYC, date(2024, 11, 10), 72)
+    assert market is not None and market.ticker == "HIGHNY-24NOV10-B72.5"
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from src.kalshi.errors import HttpError
+from src.kalshi.metrics import ClientMetrics, Histogram, NullMetrics, endpoint_template
+
+
+def test_endpoint_template():
+    assert (
+        endpoint_template("/trade-api/v2/markets/ABC-24/orderbook?depth=5")
+        == "/trade-api/v2/markets/{ticker}/orderbook"
+    )
+    assert endpoint_template("/markets/trades?ticker=A") == "/markets/trades"
+    assert endpoint_template("/portfolio/orders/batched") == "/portfolio/orders/batched"
+    assert (
+        endpoint_template("/portfolio/orders/abc/cancel")
+        == "/portfolio/orders/{order_id}/cancel"
+    )
+
+
+def test_histogram_quantiles_interpolate_inside_buckets():
+    histogram = Histogram([1.0, 2.0, 4.0])
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.record(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == pytest.approx(4.0)
+    histogram.record(10.0)
+    assert histogram.quantile(1.0) == 4.0
+
+
+def test_prometheus_text():
+    metrics = ClientMetrics()
+    metrics.record(
+        "GET",
+        "/markets/A/orderbook",
+        latency=0.003,
+        sign_time=0.001,
+        rate_limit_wait=0.5,
+        decode_time=0.0002,
+        response_bytes=100,
+    )
+    metrics.record("GET", "/markets/B/orderbook?depth=5", latency=0.2)
+    metrics.record_error("GET", "/markets/C/orderbook", HttpError("Bad", 502))
+    metrics.record_error("POST", "/portfolio/orders", TimeoutError())
+    metrics.record_retry("GET", "/markets/C/orderbook", 0.25)
+
+    lines = metrics.to_prometheus().splitlines()
+    labels = 'method="GET",endpoint="/markets/{ticker}/orderbook"'
+    buckets = [
+        line
+        for line in lines
+        if line.startswith("kalshi_request_latency_seconds_bucket{" + labels)
+    ]
+    # Cumulative counts per upper bound, ending with +Inf
+    assert (
+        buckets[0] == f'kalshi_request_latency_seconds_bucket{{{labels},le="0.001"}} 0'
+    )
+    assert f'kalshi_request_latency_seconds_bucket{{{labels},le="0.005"}} 1' in buckets
+    assert f'kalshi_request_latency_seconds_bucket{{{labels},le="0.25"}} 2' in buckets
+    assert (
+        buckets[-1] == f'kalshi_request_latency_seconds_bucket{{{labels},le="+Inf"}} 2'
+    )
+    assert f"kalshi_request_latency_seconds_count{{{labels}}} 2" in lines
+    assert f"kalshi_request_latency_seconds_sum{{{labels}}} 0.203" in lines
+    assert f"kalshi_rate_limit_wait_seconds_total{{{labels}}} 0.5" in lines
+    assert f"kalshi_response_bytes_total{{{labels}}} 100" in lines
+    assert f'kalshi_request_errors_total{{{labels},status="502"}} 1' in lines
+    assert (
+        'kalshi_request_errors_total{method="POST",endpoint="/portfolio/orders",'
+        'status="TimeoutError"} 1'
+    ) in lines
+    assert f"kalshi_retries_total{{{labels}}} 1" in lines
+    assert f"kalshi_backoff_seconds_total{{{labels}}} 0.25" in lines
+
+    # Every sample belongs to a declared metric family
+    families = {line.split()[2] for line in lines if line.startswith("# TYPE")}
+    for line in lines:
+        if not line.startswith("#"):
+            name = line.split("{")[0]
+            assert any(name == f or name.startswith(f + "_") for f in families), line
+
+
+def test_dump_picks_the_format_by_suffix(tmp_path):
+    metrics = ClientMetrics()
+    metrics.record("GET", "/markets/A", latency=0.01)
+    prom = metrics.dump(tmp_path / "metrics.prom")
+    assert prom.read_text() == metrics.to_prometheus()
+    snapshot = json.loads(metrics.dump(tmp_path / "metrics.json").read_text())
+    assert snapshot["GET /markets/{ticker}"]["latency"]["count"] == 1
+
+
+def test_null_metrics_record_nothing():
+    metrics = NullMetrics()
+    metrics.record("GET", "/markets/A", latency=0.01)
+    metrics.record_error("GET", "/markets/A", TimeoutError())
+    metrics.record_retry("GET", "/markets/A", 0.1)
+    assert metrics.snapshot() == {}
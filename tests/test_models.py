@@ -0,0 +1,158 @@
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.kalshi.models import (
+    FILL_SCHEMA,
+    MARKET_SCHEMA,
+    TRADE_SCHEMA,
+    Fill,
+    Market,
+    OrderBookLevels,
+    Trade,
+    concat_columns,
+    fills_to_columns,
+    markets_to_columns,
+    trades_to_columns,
+)
+
+START = datetime(2024, 11, 10, 12, tzinfo=timezone.utc)
+
+
+def timestamp(rng) -> str:
+    when = START + timedelta(microseconds=int(rng.integers(0, 10**11)))
+    return when.isoformat().replace("+00:00", "Z")
+
+
+def trades(rng, n: int) -> list[dict]:
+    return [
+        {
+            "trade_id": f"t{i}",
+            "ticker": f"HIGHNY-24NOV10-B{70 + i % 4}.5",
+            "count": int(rng.integers(1, 1000)),
+            "yes_price": (p := int(rng.integers(1, 100))),
+            "no_price": 100 - p,
+            "taker_side": "yes" if i % 2 else "no",
+            "created_time": timestamp(rng),
+        }
+        for i in range(n)
+    ]
+
+
+def markets(rng, n: int) -> list[dict]:
+    records = []
+    for i in range(n):
+        record = {
+            "ticker": f"HIGHNY-24NOV10-B{70 + i}.5",
+            "event_ticker": "HIGHNY-24NOV10",
+            "status": "active",
+            "strike_type": "between",
+            "floor_strike": 70 + i,
+            "cap_strike": 71 + i,
+            "yes_bid": int(rng.integers(1, 50)),
+            "yes_ask": int(rng.integers(50, 100)),
+            "no_bid": int(rng.integers(1, 50)),
+            "no_ask": int(rng.integers(50, 100)),
+            "last_price": int(rng.integers(1, 100)),
+            "volume": int(rng.integers(0, 10**6)),
+            "volume_24h": int(rng.integers(0, 10**6)),
+            "open_interest": int(rng.integers(0, 10**6)),
+            "liquidity": int(rng.integers(0, 10**8)),
+            "open_time": timestamp(rng),
+            "close_time": timestamp(rng),
+        }
+        # Open-ended brackets and fields the API leaves out
+        if i % 3 == 0:
+            record["strike_type"] = "greater"
+            del record["cap_strike"]
+        if i % 4 == 0:
+            del record["last_price"], record["open_time"]
+        records.append(record)
+    return records
+
+
+def fills(rng, n: int) -> list[dict]:
+    return [
+        {
+            "trade_id": f"t{i}",
+            "order_id": f"o{i % 3}",
+            "ticker": "HIGHNY-24NOV10-B70.5",
+            "side": "yes",
+            "action": "buy" if i % 2 else "sell",
+            "count": int(rng.integers(1, 100)),
+            "yes_price": (p := int(rng.integers(1, 100))),
+            "no_price": 100 - p,
+            "is_taker": bool(i % 2),
+            "created_time": timestamp(rng),
+        }
+        for i in range(n)
+    ]
+
+
+def as_column_value(value, dtype):
+    """A dataclass field's value as its column would hold it."""
+    if isinstance(dtype, str):
+        if value is None:
+            return np.datetime64("NaT")
+        return np.datetime64(value.astimezone(timezone.utc).replace(tzinfo=None), "us")
+    if value is None:
+        return np.nan if np.issubdtype(dtype, np.floating) else ""
+    return value
+
+
+@pytest.mark.parametrize(
+    "make, decode, cls, schema",
+    [
+        (trades, trades_to_columns, Trade, TRADE_SCHEMA),
+        (markets, markets_to_columns, Market, MARKET_SCHEMA),
+        (fills, fills_to_columns, Fill, FILL_SCHEMA),
+    ],
+    ids=["trades", "markets", "fills"],
+)
+def test_columns_match_the_dict_path(make, decode, cls, schema):
+    records = make(np.random.default_rng(0), 50)
+    columns = decode({cls.__name__.lower() + "s": records})
+    assert set(columns) == set(schema)
+    assert all(len(column) == len(records) for column in columns.values())
+    for i, record in enumerate(records):
+        obj = cls.from_dict(record)
+        for field in fields(obj):
+            if field.name not in schema:
+                continue
+            expected = as_column_value(getattr(obj, field.name), schema[field.name])
+            actual = columns[field.name][i]
+            if isinstance(expected, float) and np.isnan(expected):
+                assert np.isnan(actual), field.name
+            elif isinstance(expected, np.datetime64) and np.isnat(expected):
+                assert np.isnat(actual), field.name
+            else:
+                assert actual == expected, field.name
+
+
+def test_decoders_accept_pages_and_lists():
+    records = trades(np.random.default_rng(1), 10)
+    from_page = trades_to_columns({"trades": records})
+    from_list = trades_to_columns(records)
+    for field in TRADE_SCHEMA:
+        np.testing.assert_array_equal(from_page[field], from_list[field])
+
+
+def test_concat_columns():
+    records = trades(np.random.default_rng(2), 10)
+    joined = concat_columns(
+        [trades_to_columns(records[:4]), trades_to_columns(records[4:])]
+    )
+    whole = trades_to_columns(records)
+    for field in TRADE_SCHEMA:
+        np.testing.assert_array_equal(joined[field], whole[field])
+    assert concat_columns([]) == {}
+
+
+def test_orderbook_levels():
+    book = OrderBookLevels.from_dict(
+        {"orderbook": {"yes": [[40, 10], [41, 5]], "no": None}}, ticker="A"
+    )
+    assert book.yes.tolist() == [[40, 10], [41, 5]]
+    assert book.no.shape == (0, 2)
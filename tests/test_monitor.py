@@ -0,0 +1,96 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src.arb.monitor import ArbMonitor, WarmProgram
+from src.arb.solver import AllOf, ExactlyOne, Independent, Leg, solve
+
+from tests.test_solver import worst_case_profit
+
+STILL_OPTIMAL = "Previous optimum still optimal"
+
+
+def structure(spread: float) -> list:
+    """Legs priced `spread` above fair on both sides, with capped depth."""
+
+    def leg(name, fair):
+        return Leg(name, fair + spread, 1 - fair + spread, max_yes=5.0, max_no=5.0)
+
+    return [
+        Independent([leg("i0", 0.5)]),
+        ExactlyOne([leg(f"e{i}", 0.25) for i in range(4)]),
+        AllOf([leg("a0", 0.8), leg("a1", 0.8)], leg("c", 0.64)),
+    ]
+
+
+def repriced(components, yes_ask, no_ask, max_yes, max_no) -> list:
+    """The same structure as `components` with new asks and caps per leg."""
+    values = iter(zip(yes_ask, no_ask, max_yes, max_no))
+
+    def leg(old):
+        yes, no, cap_yes, cap_no = next(values)
+        return replace(old, yes_ask=yes, no_ask=no, max_yes=cap_yes, max_no=cap_no)
+
+    result = []
+    for component in components:
+        if isinstance(component, AllOf):
+            legs = [leg(old) for old in component.legs]
+            result.append(AllOf(legs, leg(component.combined)))
+        else:
+            result.append(replace(component, legs=[leg(old) for old in component.legs]))
+    return result
+
+
+@pytest.mark.parametrize("spread", [0.02, -0.01])
+@pytest.mark.parametrize("seed", range(3))
+def test_warm_updates_match_a_cold_solve(seed, spread):
+    rng = np.random.default_rng(seed)
+    components = structure(spread)
+    warm = WarmProgram(components, budget=10.0)
+    n = warm.num_legs
+    yes_ask = warm.program.costs[:n].copy()
+    no_ask = warm.program.costs[n:].copy()
+    max_yes = np.full(n, 5.0)
+    max_no = np.full(n, 5.0)
+    statuses = []
+    for _ in range(60):
+        # Small moves of a few legs' asks, and now and then of their caps
+        legs = rng.choice(n, size=2, replace=False)
+        yes_ask[legs] = np.clip(yes_ask[legs] + rng.normal(0, 0.01, 2), 0.01, 0.99)
+        no_ask[legs] = np.clip(no_ask[legs] + rng.normal(0, 0.01, 2), 0.01, 0.99)
+        if rng.random() < 0.2:
+            max_yes[legs] = rng.integers(1, 8, size=2)
+            max_no[legs] = rng.integers(1, 8, size=2)
+
+        result = warm.update(yes_ask, no_ask, max_yes, max_no)
+        current = repriced(components, yes_ask, no_ask, max_yes, max_no)
+        cold = solve(current, budget=10.0)
+        statuses.append(result.status)
+
+        assert result.guaranteed_profit == pytest.approx(
+            cold.guaranteed_profit, abs=1e-6
+        )
+        # The kept optimum is a real allocation at the new prices
+        assert result.cost <= 10.0 + 1e-6
+        assert np.all(result.yes <= max_yes + 1e-6)
+        assert np.all(result.no <= max_no + 1e-6)
+        assert worst_case_profit(current, result.yes, result.no) >= (
+            result.guaranteed_profit - 1e-6
+        )
+
+    if spread > 0:
+        # Without an arbitrage some ticks keep the empty optimum
+        assert STILL_OPTIMAL in statuses
+    assert warm.stats()["skipped"] == statuses.count(STILL_OPTIMAL)
+
+
+def test_monitor_ticks_only_structures_quoted():
+    monitor = ArbMonitor()
+    monitor.watch("brackets", [ExactlyOne([Leg("a", 0.55, 0.5), Leg("b", 0.5, 0.55)])])
+    monitor.watch("single", [Independent([Leg("c", 0.55, 0.5)])])
+
+    results = monitor.tick({"a": (0.4, 0.65)})
+    assert list(results) == ["brackets"]
+    assert results["brackets"].guaranteed_profit == pytest.approx(0.1 / 0.9)
+    assert monitor.stats()["single"]["ticks"] == 1
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from src.np_utils import _popcount_table, pack_bits, popcount, vectorized
+
+
+def test_popcount_matches_unpacked_bits():
+    rng = np.random.default_rng(0)
+    bits = rng.integers(0, 2, size=(3, 100, 63), dtype=np.int8)
+    codes = pack_bits(bits)
+    expected = bits.sum(axis=-1)
+    assert (popcount(codes) == expected).all()
+    assert (_popcount_table(codes) == expected).all()
+    assert _popcount_table(np.uint64(2**64 - 1)) == 64
+
+
+def test_vectorized_binding_and_chunking():
+    def scale(x, factor, offset=0.0):
+        return x * factor + offset
+
+    fn = vectorized("x", row_ndim=1)(scale)
+    chunked = vectorized("x", row_ndim=1, chunk_size=3)(scale)
+    x = np.arange(24.0).reshape(2, 4, 3)
+    expected = x * 2 + 1
+    for _ in range(2):
+        # The second time round, each call shape's binding is cached
+        assert (fn(x, 2, 1) == expected).all()
+        assert (fn(x, factor=2, offset=1) == expected).all()
+        assert (fn(offset=1, x=x, factor=2) == expected).all()
+        assert (chunked(x, 2, offset=1) == expected).all()
+        assert (fn(x[0, 0], 2) == x[0, 0] * 2).all()
+        with pytest.raises(TypeError):
+            fn(x, 2, factor=3)
+        with pytest.raises(TypeError):
+            fn(x)
@@ -0,0 +1,34 @@
+from src.nws.nws_client import NWSClient
+
+
+class FakeResponse:
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, name: str):
+        self.name = name
+        self.urls: list = []
+
+    def get(self, url, **kwargs) -> FakeResponse:
+        self.urls.append(str(url))
+        return FakeResponse({"properties": {"session": self.name}})
+
+
+def test_sessions_are_per_client():
+    live = NWSClient()
+    replay_session = FakeSession("replay")
+    replay = NWSClient(session=replay_session)
+    assert live.session is not replay_session
+    assert NWSClient().session is not replay_session
+
+    info = replay.get_location_info(40.78, -73.97)
+    assert info["properties"]["session"] == "replay"
+    assert replay_session.urls == ["https://api.weather.gov/points/40.78,-73.97"]
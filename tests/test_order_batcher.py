@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+
+from src.kalshi.errors import HttpError
+from src.kalshi.order_batcher import BatchOrderError, OrderBatcher
+
+
+class FakeClient:
+    """Answers batched requests, in reverse order, rejecting ticker "BAD"."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.create_batches: list = []
+        self.cancel_batches: list = []
+        self.fail_with = None
+
+    def batch_create_orders(self, orders: list) -> dict:
+        with self.lock:
+            self.create_batches.append(orders)
+        if self.fail_with is not None:
+            raise self.fail_with
+        items = []
+        for order in reversed(orders):
+            if order["ticker"] == "BAD":
+                error = {"code": "invalid_order", "message": "bad ticker"}
+                items.append(
+                    {
+                        "client_order_id": order["client_order_id"],
+                        "order": None,
+                        "error": error,
+                    }
+                )
+            else:
+                items.append({"order": {**order, "order_id": "id-" + order["ticker"]}})
+        return {"orders": items}
+
+    def batch_cancel_orders(self, order_ids: list) -> dict:
+        with self.lock:
+            self.cancel_batches.append(order_ids)
+        items = [
+            {"order_id": order_id, "order": {"order_id": order_id}, "reduced_by": 1}
+            for order_id in reversed(order_ids)
+        ]
+        return {"orders": items}
+
+
+def create(batcher: OrderBatcher, ticker: str):
+    return batcher.submit_create(
+        ticker=ticker, side="yes", action="buy", count=1, type="limit", yes_price=40
+    )
+
+
+def test_intents_are_batched_and_matched_by_id():
+    client = FakeClient()
+    with OrderBatcher(client, max_latency=0.05) as batcher:  # type: ignore[arg-type]
+        futures = {ticker: create(batcher, ticker) for ticker in "ABCDE"}
+        bad = create(batcher, "BAD")
+        cancels = {order_id: batcher.submit_cancel(order_id) for order_id in "xyz"}
+
+        for ticker, future in futures.items():
+            assert future.result(5)["order_id"] == "id-" + ticker
+        with pytest.raises(BatchOrderError) as error:
+            bad.result(5)
+        assert error.value.error["code"] == "invalid_order"
+        for order_id, future in cancels.items():
+            assert future.result(5)["order_id"] == order_id
+
+    assert len(client.create_batches) == 1
+    assert len(client.create_batches[0]) == 6
+    assert client.cancel_batches == [list("xyz")]
+
+
+def test_full_batch_is_sent_without_waiting():
+    client = FakeClient()
+    batcher = OrderBatcher(
+        client, max_batch_size=3, max_latency=60  # type: ignore[arg-type]
+    )
+    futures = [create(batcher, ticker) for ticker in "ABC"]
+    # Far sooner than max_latency
+    assert [f.result(5)["order_id"] for f in futures] == ["id-A", "id-B", "id-C"]
+
+    # A partial batch waits for close, which flushes it
+    pending = create(batcher, "D")
+    assert not pending.done()
+    batcher.close()
+    assert pending.result(0)["order_id"] == "id-D"
+    assert [len(batch) for batch in client.create_batches] == [3, 1]
+
+
+def test_request_failure_reaches_every_order():
+    client = FakeClient()
+    client.fail_with = HttpError("Too Many Requests", 429)
+    with OrderBatcher(client) as batcher:  # type: ignore[arg-type]
+        futures = [create(batcher, ticker) for ticker in "AB"]
+        for future in futures:
+            with pytest.raises(HttpError):
+                future.result(5)
+
+
+def test_submit_after_close_raises():
+    batcher = OrderBatcher(FakeClient())  # type: ignore[arg-type]
+    batcher.close()
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        create(batcher, "A")
+    with pytest.raises(RuntimeError):
+        batcher.submit_cancel("x")
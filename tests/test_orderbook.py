@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from src.kalshi.orderbook import NUM_PRICES, BookManager, OrderBook
+
+
+class DictBook:
+    """The naive reference: a {price: quantity} dict per side."""
+
+    def __init__(self, snapshot: dict):
+        self.levels = {
+            side: {price: qty for price, qty in snapshot.get(side) or [] if qty > 0}
+            for side in ("yes", "no")
+        }
+
+    def apply_delta(self, side: str, price: int, delta: int) -> None:
+        quantity = self.levels[side].get(price, 0) + delta
+        if quantity:
+            self.levels[side][price] = quantity
+        else:
+            self.levels[side].pop(price, None)
+
+    def best_bid(self, side: str) -> int:
+        return max(self.levels[side], default=0)
+
+    def best_ask(self, side: str) -> int:
+        opposite = self.best_bid("no" if side == "yes" else "yes")
+        return NUM_PRICES - opposite if opposite else 0
+
+    def cumulative_depth(self, side: str, price: int) -> int:
+        return sum(q for p, q in self.levels[side].items() if p >= price)
+
+
+def synthetic_feed(rng: random.Random, tickers: list, num_deltas: int):
+    """Snapshots for every ticker followed by deltas that never go negative."""
+    resting = {}
+    for ticker in tickers:
+        snapshot = {
+            side: [[p, rng.randint(1, 50)] for p in rng.sample(range(1, 100), 5)]
+            for side in ("yes", "no")
+        }
+        resting[ticker] = {
+            side: dict(map(tuple, levels)) for side, levels in snapshot.items()
+        }
+        yield {"market_ticker": ticker, **snapshot}
+    for _ in range(num_deltas):
+        ticker = rng.choice(tickers)
+        side = rng.choice(["yes", "no"])
+        levels = resting[ticker][side]
+        price = rng.choice(list(levels)) if levels and rng.random() < 0.5 else None
+        if price is not None:
+            # Often take a level out entirely, to move the best bid down
+            delta = (
+                -levels[price] if rng.random() < 0.5 else -rng.randint(0, levels[price])
+            )
+        else:
+            price, delta = rng.randint(1, 99), rng.randint(1, 50)
+        levels[price] = levels.get(price, 0) + delta
+        if levels[price] == 0:
+            del levels[price]
+        yield {"market_ticker": ticker, "side": side, "price": price, "delta": delta}
+
+
+def test_delta_feed_matches_dict_book():
+    rng = random.Random(0)
+    tickers = [f"T{i}" for i in range(20)]
+    # Start small so the manager has to grow its arrays
+    manager = BookManager(capacity=4)
+    reference: dict[str, DictBook] = {}
+    for message in synthetic_feed(rng, tickers, num_deltas=5000):
+        manager.apply_message(message)
+        ticker = message["market_ticker"]
+        if "delta" in message:
+            reference[ticker].apply_delta(
+                message["side"], message["price"], message["delta"]
+            )
+        else:
+            reference[ticker] = DictBook(message)
+
+        book, expected = manager[ticker], reference[ticker]
+        for side in ("yes", "no"):
+            assert book.best_bid(side) == expected.best_bid(side)
+            assert book.best_ask(side) == expected.best_ask(side)
+
+    assert len(manager) == len(tickers)
+    for ticker, expected in reference.items():
+        book = manager[ticker]
+        row = manager.rows[ticker]
+        for s, side in enumerate(("yes", "no")):
+            depth = manager.cumulative_depth(side)
+            for price in range(1, NUM_PRICES):
+                total = expected.cumulative_depth(side, price)
+                assert book.cumulative_depth(side, price) == total
+                assert depth[row, price] == total
+            assert manager.best_bids()[row, s] == expected.best_bid(side)
+            assert manager.best_asks()[row, s] == expected.best_ask(side)
+
+
+def test_negative_quantity_is_rejected():
+    book = OrderBook.from_snapshot({"orderbook": {"yes": [[40, 5]], "no": None}})
+    assert book.best_bid("yes") == 40
+    assert book.best_ask("no") == 60
+    assert book.best_ask("yes") == 0
+    with pytest.raises(ValueError):
+        book.apply_delta("yes", 40, -6)
@@ -0,0 +1,124 @@
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from src.kalshi.portfolio import PortfolioLedger
+
+BASE_TS = 1_731_240_000
+
+
+def make_fill(trade_id: str, ts: int, count: int = 3) -> dict:
+    return {
+        "trade_id": trade_id,
+        "order_id": "o1",
+        "ticker": "A",
+        "side": "yes",
+        "action": "buy",
+        "count": count,
+        "yes_price": 40,
+        "no_price": 60,
+        "created_time": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+    }
+
+
+class FakeClient:
+    """
+    An exchange whose positions are the sum of its fills. Notes whether the
+    ledger's lock was free while each page was being fetched, and can land
+    fills just before or after the positions are read.
+    """
+
+    def __init__(self):
+        self.ledger = None
+        self.order_filters: list = []
+        self.lock_free_during_fetch: list = []
+        self.fills = [make_fill("t1", BASE_TS)]
+        self.orders = [
+            {"order_id": "o2", "ticker": "A", "status": "resting", "remaining_count": 5}
+        ]
+        self.land_before_positions: list = []
+        self.land_after_positions: list = []
+
+    def _check_lock(self) -> None:
+        def try_lock() -> None:
+            acquired = self.ledger.lock.acquire(timeout=1)
+            if acquired:
+                self.ledger.lock.release()
+            self.lock_free_during_fetch.append(acquired)
+
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+
+    def iter_fills(self, min_ts=None, max_ts=None, max_records=None, **kwargs):
+        self._check_lock()
+        fills = [
+            fill
+            for fill in self.fills
+            if (min_ts is None or self._ts(fill) >= min_ts)
+            and (max_ts is None or self._ts(fill) <= max_ts)
+        ]
+        # Newest first, as the exchange returns them
+        fills.sort(key=self._ts, reverse=True)
+        return iter(fills[:max_records])
+
+    @staticmethod
+    def _ts(fill: dict) -> int:
+        return int(datetime.fromisoformat(fill["created_time"]).timestamp())
+
+    def iter_orders(self, **kwargs):
+        self._check_lock()
+        self.order_filters.append(kwargs)
+        return iter(self.orders)
+
+    def iter_positions(self, **kwargs):
+        self._check_lock()
+        self.fills += self.land_before_positions
+        self.land_before_positions = []
+        position = sum(fill["count"] for fill in self.fills)
+        self.fills += self.land_after_positions
+        self.land_after_positions = []
+        return iter(
+            [{"ticker": "A", "position": position, "market_exposure": 40 * position}]
+        )
+
+
+def make_ledger() -> tuple[FakeClient, PortfolioLedger]:
+    client = FakeClient()
+    ledger = client.ledger = PortfolioLedger(client)  # type: ignore[arg-type]
+    return client, ledger
+
+
+def test_reconcile_fetches_only_resting_orders():
+    client, ledger = make_ledger()
+    ledger.reconcile()
+    assert client.order_filters == [{"status": "resting"}]
+    assert ledger.position("A") == 3
+    assert [order["order_id"] for order in ledger.resting_orders("A")] == ["o2"]
+
+
+def test_fetches_run_without_the_lock():
+    client, ledger = make_ledger()
+    ledger.sync()
+    client.fills.append(make_fill("t2", BASE_TS + 1))
+    assert ledger.sync() == 1
+    assert ledger.position("A") == 6
+    assert client.lock_free_during_fetch and all(client.lock_free_during_fetch)
+
+
+@pytest.mark.parametrize("when", ["before", "after"])
+@pytest.mark.parametrize("delay", [0, 1])
+def test_fill_landing_during_reconcile_is_counted_once(when, delay):
+    client, ledger = make_ledger()
+    landing = [make_fill("t2", BASE_TS + delay, count=4)]
+    if when == "before":
+        client.land_before_positions = landing
+    else:
+        client.land_after_positions = landing
+
+    ledger.reconcile()
+    assert ledger.position("A") == 7
+    assert ledger.sync() == 0
+    assert ledger.position("A") == 7
+    assert ledger.exposure("A") == 40 * 7
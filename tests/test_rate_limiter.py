@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from src.kalshi.rate_limiter import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock that only moves when told to."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_reserve_goes_into_debt(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+    assert bucket.reserve() == pytest.approx(0.1)
+    assert bucket.reserve() == pytest.approx(0.2)
+    assert bucket.reserve(3) == pytest.approx(0.5)
+    assert bucket.stats() == {
+        "num_acquired": 8,
+        "num_waited": 3,
+        "total_wait": pytest.approx(0.8),
+    }
+
+
+def test_refill_is_continuous_and_capped(clock):
+    bucket = TokenBucket(rate=8, capacity=4)
+    for _ in range(4):
+        bucket.reserve()
+    clock[0] += 0.375
+    assert [bucket.reserve() for _ in range(3)] == [0.0] * 3
+    assert bucket.reserve() == 0.125
+
+    clock[0] += 60
+    assert [bucket.reserve() for _ in range(4)] == [0.0] * 4
+    assert bucket.reserve() == 0.125
+
+
+def test_limiter_buckets_reads_and_writes_apart(clock):
+    limiter = RateLimiter(reads_per_second=2, writes_per_second=1)
+    assert limiter.bucket("get") is limiter.read
+    assert limiter.bucket("DELETE") is limiter.write
+    assert limiter.write.reserve() == 0.0
+    assert limiter.write.reserve() == pytest.approx(1.0)
+    assert limiter.read.reserve() == 0.0
+
+
+def test_acquire_async_waits_for_its_token():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    async def scenario():
+        start = time.monotonic()
+        waits = await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+        return waits, time.monotonic() - start
+
+    waits, elapsed = asyncio.run(scenario())
+    assert sorted(waits) == [
+        0.0,
+        pytest.approx(0.02, abs=0.005),
+        pytest.approx(0.04, abs=0.005),
+    ]
+    assert elapsed >= 0.035
+
+
+def test_cancelled_async_waiter_gives_its_token_back():
+    bucket = TokenBucket(rate=10, capacity=1)
+
+    async def scenario():
+        bucket.reserve()
+        waiter = asyncio.ensure_future(bucket.acquire_async())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # Next in line for the token after the first, not after the waiter
+        return bucket.reserve()
+
+    assert asyncio.run(scenario()) < 0.1
@@ -0,0 +1,57 @@
+import gzip
+import json
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.gateway.stub_exchange import StubExchange
+from src.kalshi.api_client import ExchangeClient
+from src.recording import RecordingSession, ReplayMissError, ReplaySession
+
+TICKER = "STUB-24NOV10-B70.5"
+
+
+def session_calls(client: ExchangeClient) -> list:
+    # The same request twice, with an order placed in between
+    return [
+        client.get_market(TICKER),
+        client.get_orderbook(TICKER, depth=5),
+        client.get_orders(status="resting"),
+        client.create_order(TICKER, "coid-1", "yes", "buy", 3, "limit", yes_price=40)[
+            "order"
+        ]["client_order_id"],
+        len(client.get_orders(status="resting")["orders"]),
+    ]
+
+
+def test_record_and_replay_round_trip(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    stub = StubExchange()
+    stub.start()
+    try:
+        client = ExchangeClient(
+            stub.url, "stub", private_key, session=RecordingSession(path)
+        )
+        recorded = session_calls(client)
+        client.close()
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 5
+    assert [record["method"] for record in records] == ["GET"] * 3 + ["POST", "GET"]
+    assert records[3]["status"] == 201
+
+    # The stub is gone, so everything comes from the recording
+    session = ReplaySession(path)
+    client = ExchangeClient(stub.url, "stub", private_key, session=session)
+    assert session_calls(client) == recorded
+    assert recorded[2]["orders"] == [] and recorded[4] == 1
+    assert session.num_served == 5
+    with pytest.raises(ReplayMissError):
+        client.get_market("STUB-24NOV10-B99.5")
+    assert session.num_missed == 1
+    client.close()
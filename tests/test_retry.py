@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+
+from src.kalshi.errors import CircuitOpenError, HttpError
+from src.kalshi.metrics import ClientMetrics
+from src.kalshi.retry import RetryPolicy
+
+
+def fail():
+    raise HttpError("Service Unavailable", 503)
+
+
+def test_cancelled_trial_releases_half_open_circuit():
+    policy = RetryPolicy(max_retries=0, failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(HttpError):
+        policy.call("GET", "/markets/A", None, fail)
+    assert policy.breaker("/markets/{ticker}").state == "open"
+
+    async def scenario():
+        await asyncio.sleep(0.06)
+        # The half-open trial hangs and is cancelled by a timeout
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                policy.call_async("GET", "/markets/A", None, asyncio.Event().wait),
+                timeout=0.01,
+            )
+
+        async def ok():
+            return "ok"
+
+        return await policy.call_async("GET", "/markets/A", None, ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert policy.breaker("/markets/{ticker}").state == "closed"
+
+
+def test_interrupted_sync_trial_releases_circuit():
+    policy = RetryPolicy(max_retries=0, failure_threshold=1, reset_timeout=0.0)
+    with pytest.raises(HttpError):
+        policy.call("GET", "/markets/A", None, fail)
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        policy.call("GET", "/markets/A", None, interrupt)
+    # Another trial is let through rather than refused forever
+    with pytest.raises(HttpError):
+        policy.call("GET", "/markets/A", None, fail)
+
+
+def test_open_circuit_refuses_requests():
+    policy = RetryPolicy(max_retries=0, failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(HttpError):
+            policy.call("GET", "/markets/A", None, fail)
+    with pytest.raises(CircuitOpenError):
+        policy.call("GET", "/markets/B", None, lambda: "never sent")
+
+
+def test_retry_after_is_honored_beyond_max_delay():
+    policy = RetryPolicy(max_delay=5.0)
+    error = HttpError("Too Many Requests", 429, retry_after=30.0)
+    assert policy.delay(0, error) == 30.0
+    assert policy.delay(10, HttpError("Bad Gateway", 502)) <= 5.0
+
+
+def test_retry_after_beyond_limit_is_raised():
+    policy = RetryPolicy(max_retry_after=10.0)
+    calls = []
+
+    def throttled():
+        calls.append(1)
+        raise HttpError("Too Many Requests", 429, retry_after=3600.0)
+
+    start = time.monotonic()
+    with pytest.raises(HttpError) as info:
+        policy.call("GET", "/markets/A", None, throttled)
+    assert info.value.retry_after == 3600.0
+    assert len(calls) == 1
+    assert time.monotonic() - start < 1.0
+    assert policy.stats()["/markets/{ticker}"]["retries"] == 0
+
+
+def test_retries_are_exported_to_client_metrics():
+    policy = RetryPolicy(max_retries=2, base_delay=0.001, failure_threshold=3)
+    metrics = ClientMetrics()
+    with pytest.raises(HttpError):
+        policy.call("GET", "/markets/A", None, fail, metrics=metrics)
+    with pytest.raises(CircuitOpenError):
+        policy.call("GET", "/markets/B", None, fail, metrics=metrics)
+
+    first = metrics.snapshot()["GET /markets/{ticker}"]
+    assert first["retries"] == 2
+    assert first["backoff_time"] == pytest.approx(
+        policy.stats()["/markets/{ticker}"]["backoff_time"]
+    )
+    assert first["short_circuited"] == 1
+    text = metrics.to_prometheus()
+    assert 'kalshi_retries_total{method="GET",endpoint="/markets/{ticker}"} 2' in text
+    assert (
+        'kalshi_short_circuited_total{method="GET",endpoint="/markets/{ticker}"} 1'
+        in text
+    )
+
+
+def test_clients_get_their_own_policy():
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    from src.kalshi.api_client import ExchangeClient
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    first = ExchangeClient("http://127.0.0.1:1", "a", key)
+    second = ExchangeClient("http://127.0.0.1:2", "b", key)
+    assert first.retry_policy is not second.retry_policy
+    assert (
+        ExchangeClient("http://127.0.0.1:3", "c", key, retry_policy=None).retry_policy
+        is None
+    )
@@ -0,0 +1,56 @@
+import asyncio
+import base64
+
+import pytest
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from src.kalshi.signing import RequestSigner
+
+MESSAGES = [f"1731240000000GET/trade-api/v2/markets/M{i}" for i in range(8)]
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def verify(private_key, text: str, signature: str) -> None:
+    # Raises InvalidSignature if it does not match
+    private_key.public_key().verify(
+        base64.b64decode(signature),
+        text.encode("utf-8"),
+        padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.DIGEST_LENGTH,
+        ),
+        hashes.SHA256(),
+    )
+
+
+@pytest.mark.parametrize(
+    "workers, executor", [(0, "thread"), (2, "thread"), (2, "process")]
+)
+def test_signatures_verify_with_the_public_key(private_key, workers, executor):
+    signer = RequestSigner(private_key, workers=workers, executor=executor)
+    try:
+        futures = [signer.submit(text) for text in MESSAGES]
+        for text, future in zip(MESSAGES, futures):
+            verify(private_key, text, future.result(10))
+        with pytest.raises(InvalidSignature):
+            verify(private_key, MESSAGES[1], futures[0].result())
+
+        async def sign_all():
+            return await asyncio.gather(*map(signer.sign_async, MESSAGES))
+
+        for text, signature in zip(MESSAGES, asyncio.run(sign_all())):
+            verify(private_key, text, signature)
+        assert signer.metrics()["sign_time"]["count"] == 2 * len(MESSAGES)
+    finally:
+        signer.close()
+
+
+def test_unknown_executor_is_refused(private_key):
+    with pytest.raises(ValueError):
+        RequestSigner(private_key, workers=1, executor="fiber")
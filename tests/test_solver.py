@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from src.arb.solver import (
+    AllOf,
+    ExactlyOne,
+    Independent,
+    Leg,
+    component_legs,
+    scenario_matrix,
+    solve,
+    solve_brute_force,
+)
+
+
+def random_legs(rng, prefix: str, n: int, fair: float, capped: bool) -> list[Leg]:
+    legs = []
+    for i in range(n):
+        # Asks around the fair yes price, sometimes crossing it
+        yes_ask = float(np.clip(fair + rng.normal(0, 0.08), 0.01, 0.99))
+        no_ask = float(np.clip(1 - fair + rng.normal(0, 0.08), 0.01, 0.99))
+        legs.append(
+            Leg(
+                f"{prefix}{i}",
+                round(yes_ask, 2),
+                round(no_ask, 2),
+                max_yes=float(rng.integers(1, 5)) if capped else None,
+                max_no=float(rng.integers(1, 5)) if capped else None,
+            )
+        )
+    return legs
+
+
+def random_structure(rng, capped: bool = False) -> list:
+    n = int(rng.integers(2, 5))
+    return [
+        Independent(random_legs(rng, "I", int(rng.integers(1, 3)), 0.5, capped)),
+        ExactlyOne(random_legs(rng, "E", n, 1 / n, capped)),
+        ExactlyOne(random_legs(rng, "N", n, 0.8 / n, capped), exhaustive=False),
+        AllOf(
+            random_legs(rng, "A", 3, 0.7, capped),
+            random_legs(rng, "C", 1, 0.7**3, capped)[0],
+        ),
+    ]
+
+
+def worst_case_profit(components, yes: np.ndarray, no: np.ndarray) -> float:
+    """The smallest profit of an allocation over every enumerated scenario."""
+    legs = [leg for component in components for leg in component_legs(component)]
+    scenarios = scenario_matrix(components)
+    payoff = scenarios @ yes + (1 - scenarios) @ no
+    cost = yes @ [leg.yes_ask for leg in legs] + no @ [leg.no_ask for leg in legs]
+    return float(payoff.min() - cost)
+
+
+@pytest.mark.parametrize("capped", [False, True])
+@pytest.mark.parametrize("seed", range(10))
+def test_solve_matches_brute_force(seed, capped):
+    components = random_structure(np.random.default_rng(seed), capped)
+    result = solve(components, budget=10.0)
+    expected = solve_brute_force(components, budget=10.0)
+    assert result.guaranteed_profit == pytest.approx(
+        expected.guaranteed_profit, abs=1e-7
+    )
+    # The allocation earns its profit in every scenario, within budget
+    assert result.cost <= 10.0 + 1e-7
+    assert worst_case_profit(components, result.yes, result.no) >= (
+        result.guaranteed_profit - 1e-7
+    )
+
+
+@pytest.mark.parametrize(
+    "components",
+    [
+        [Independent([Leg("a", 0.45, 0.5)])],
+        [ExactlyOne([Leg("a", 0.3, 0.7), Leg("b", 0.3, 0.7), Leg("c", 0.3, 0.7)])],
+        [
+            ExactlyOne(
+                [Leg("a", 0.35, 0.7), Leg("b", 0.3, 0.6)],
+                exhaustive=False,
+            )
+        ],
+        [AllOf([Leg("a", 0.8, 0.25), Leg("b", 0.8, 0.25)], Leg("ab", 0.4, 0.7))],
+    ],
+    ids=["independent", "exactly-one", "at-most-one", "all-of"],
+)
+def test_each_component_finds_its_arbitrage(components):
+    result = solve(components)
+    expected = solve_brute_force(components)
+    assert result.guaranteed_profit > 0
+    assert result.guaranteed_profit == pytest.approx(
+        expected.guaranteed_profit, abs=1e-7
+    )
+    assert worst_case_profit(components, result.yes, result.no) == pytest.approx(
+        result.guaranteed_profit, abs=1e-7
+    )
+
+
+def test_no_arbitrage_buys_nothing():
+    components = [
+        ExactlyOne([Leg("a", 0.55, 0.5), Leg("b", 0.5, 0.55)]),
+        AllOf([Leg("c", 0.75, 0.3)], Leg("d", 0.75, 0.3)),
+    ]
+    result = solve(components)
+    assert solve_brute_force(components).guaranteed_profit == 0
+    assert result.guaranteed_profit == 0
+    assert result.allocation() == {}